@@ -2,6 +2,11 @@ import streamlit as st
 import os
 import sys
 import logging
+import uuid
+from contextlib import nullcontext
+
+# Make the project packages importable however the app is started
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +35,8 @@ if "sidebar_rendered" not in st.session_state:
     st.session_state["sidebar_rendered"] = False
 if "notifications" not in st.session_state:
     st.session_state["notifications"] = []
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
 
 # Function to change pages
 def set_page(page_name):
@@ -37,7 +44,14 @@ def set_page(page_name):
     logger.info(f"Page changed to: {page_name}")
 
 # Now import your views - AFTER defining set_page
-from views import login_view, dashboard_view, metrics_view, rewards_view
+from views import login_view, dashboard_view, metrics_view, rewards_view, admin_view
+from utils.instrumentation import timed
+from utils.profiling import profiled
+from utils.session_memory import enforce_budgets, record_session
+from utils.metrics_server import start_metrics_server
+
+# Serve performance counters for scraping; only the first run in this process starts it
+start_metrics_server()
 
 # Handle redirection from login page
 if "redirect_to_dashboard" in st.session_state and st.session_state["redirect_to_dashboard"]:
@@ -54,9 +68,12 @@ with st.sidebar:
         st.markdown(f"Ward: **{st.session_state['user'].get('ward', 'Koramangala')}**")
         
         # Navigation for authenticated users
+        nav_options = ["Dashboard", "Metrics", "Rewards", "Logout"]
+        if admin_view.is_admin(st.session_state["user"]):
+            nav_options.insert(3, "Admin")
         page = st.radio(
             "Navigation",
-            ["Dashboard", "Metrics", "Rewards", "Logout"],
+            nav_options,
             key="sidebar_nav_auth"
         )
         
@@ -66,6 +83,8 @@ with st.sidebar:
             st.session_state["page"] = "metrics"
         elif page == "Rewards":
             st.session_state["page"] = "rewards"
+        elif page == "Admin":
+            st.session_state["page"] = "admin"
         elif page == "Logout":
             # Handle logout
             st.session_state.pop("user", None)
@@ -99,12 +118,31 @@ with st.sidebar:
     st.caption("© 2025 Bruhat Bengaluru Mahanagara Palike")
     st.caption("Version 1.0.5")
 
+# Keep this session's cached results within budget and note its size for the Admin page
+enforce_budgets(st.session_state)
+record_session(st.session_state["session_id"], st.session_state)
+
+# Profile this render if an admin asked for it with ?profile=1 or from the Admin page
+profile_render = admin_view.is_admin(st.session_state.get("user")) and (
+    st.query_params.get("profile") == "1"
+    or (st.session_state["page"] != "admin" and st.session_state.pop("profile_next_render", False))
+)
+if "profile" in st.query_params:
+    del st.query_params["profile"]
+
 # Render the appropriate view based on session state
-if st.session_state["page"] == "login":
-    login_view.render()
-elif st.session_state["page"] == "dashboard":
-    dashboard_view.render()
-elif st.session_state["page"] == "metrics":
-    metrics_view.render()
-elif st.session_state["page"] == "rewards":
-    rewards_view.render()
\ No newline at end of file
+with timed(f"render.{st.session_state['page']}"), \
+        (profiled(st.session_state["page"]) if profile_render else nullcontext()) as profile:
+    if st.session_state["page"] == "login":
+        login_view.render()
+    elif st.session_state["page"] == "dashboard":
+        dashboard_view.render()
+    elif st.session_state["page"] == "metrics":
+        metrics_view.render()
+    elif st.session_state["page"] == "rewards":
+        rewards_view.render()
+    elif st.session_state["page"] == "admin":
+        admin_view.render()
+
+if profile_render and profile.path:
+    admin_view.render_profile_summary(profile.path)
@@ -0,0 +1,112 @@
+"""
+Report where app startup spends its time importing modules
+
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --top 40 --output imports.json
+
+Runs the imports a fresh worker does before its first page (streamlit, then every
+view) in a new interpreter with -X importtime. The report gives the cumulative cost of
+each top-level package and the slowest individual modules, separating what streamlit
+itself imports from what the app adds on top.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+# What a worker imports before serving its first page
+STARTUP_IMPORTS = [
+    "streamlit",
+    "views.login_view",
+    "views.dashboard_view",
+    "views.metrics_view",
+    "views.rewards_view",
+    "views.admin_view",
+]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def import_times(modules):
+    """(module, self_us, cumulative_us, depth) for every module a fresh interpreter imports for these"""
+    code = "import sys; sys.path.insert(0, '.')\n" + "\n".join(f"import {module}" for module in modules)
+    stderr = _python(code, "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match[4], int(match[1]), int(match[2]), len(match[3]) // 2))
+    return rows
+
+
+def cold_start():
+    """Seconds a fresh interpreter takes to import STARTUP_IMPORTS, and its peak RSS in KiB"""
+    code = (
+        "import sys, time, resource, json; sys.path.insert(0, '.'); start = time.perf_counter()\n"
+        + "\n".join(f"import {module}" for module in STARTUP_IMPORTS)
+        + "\nprint(json.dumps([time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))"
+    )
+    seconds, max_rss = json.loads(_python(code).stdout.strip().splitlines()[-1])
+    return seconds, max_rss
+
+
+def profile(top):
+    rows = import_times(STARTUP_IMPORTS)
+    streamlit_modules = {module for module, *_ in import_times(["streamlit"])}
+
+    packages = {}
+    for module, self_us, _, _ in rows:
+        package = module.split(".")[0]
+        entry = packages.setdefault(package, {"package": package, "modules": 0, "ms": 0.0})
+        entry["modules"] += 1
+        entry["ms"] += self_us / 1000
+
+    app_rows = [row for row in rows if row[0] not in streamlit_modules]
+    return {
+        "total_ms": sum(self_us for _, self_us, _, _ in rows) / 1000,
+        "streamlit_ms": sum(self_us for module, self_us, _, _ in rows if module in streamlit_modules) / 1000,
+        "app_ms": sum(self_us for _, self_us, _, _ in app_rows) / 1000,
+        "packages": sorted(packages.values(), key=lambda p: p["ms"], reverse=True)[:top],
+        "slowest_app_modules": [
+            {"module": module, "cumulative_ms": cumulative / 1000, "self_ms": self_us / 1000, "depth": depth}
+            for module, self_us, cumulative, depth in sorted(app_rows, key=lambda r: r[2], reverse=True)[:top]
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app startup imports")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="also write the report to a JSON file")
+    args = parser.parse_args(argv)
+
+    report = profile(args.top)
+    print(f"{report['total_ms']:.0f} ms importing: {report['streamlit_ms']:.0f} ms for streamlit, "
+          f"{report['app_ms']:.0f} ms added by the app")
+    print(f"\n{'package':<30} {'modules':>8} {'ms':>9}")
+    for package in report["packages"]:
+        print(f"{package['package']:<30} {package['modules']:>8} {package['ms']:>9.1f}")
+    print(f"\n{'module (not imported by streamlit)':<50} {'cumulative':>11} {'self':>9}")
+    for module in report["slowest_app_modules"]:
+        print(f"{'  ' * min(module['depth'], 4) + module['module']:<50} "
+              f"{module['cumulative_ms']:>9.1f}ms {module['self_ms']:>7.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Drive app.py with many simulated sessions at once, in-process, using Streamlit's AppTest
+
+    python benchmarks/load_test.py --sessions 8 --iterations 3
+    python benchmarks/load_test.py --sessions 32 --db /path/to/generated.db --output load.json
+
+Each session runs in its own thread and logs in, then repeats
+dashboard -> metrics -> rewards -> calendar month change --iterations times. Every
+step is one script rerun; the report gives the latency distribution of each step and
+the reruns per second that this worker sustained across all sessions. The app runs
+against a temporary copy of the database so the load never changes the original.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARKS_DIR)
+APP_PATH = os.path.join(PROJECT_ROOT, "app.py")
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, "data", "database.db")
+
+DEFAULT_SESSIONS = 4
+DEFAULT_ITERATIONS = 2
+# Seconds a single rerun may take before AppTest gives up
+RERUN_TIMEOUT = 120
+
+STEPS = ["open", "login", "dashboard", "metrics", "rewards", "calendar"]
+CALENDAR_MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+                   "August", "September", "October", "November", "December"]
+
+
+class SessionResult:
+    def __init__(self):
+        # (step, seconds, failed) per rerun
+        self.reruns = []
+        self.error = None
+
+    def timed_step(self, step, rerun):
+        """Run one rerun of an AppTest and note its latency and whether the page raised"""
+        start = time.perf_counter()
+        at = rerun()
+        self.reruns.append((step, time.perf_counter() - start, bool(at.exception)))
+        return at
+
+
+def run_session(session_index, iterations, username, password, start_barrier):
+    """One simulated resident; returns a SessionResult"""
+    from streamlit.testing.v1 import AppTest
+
+    result = SessionResult()
+    start_barrier.wait()
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT)
+        at = result.timed_step("open", at.run)
+        at.text_input(key="login_username").input(username)
+        at.text_input(key="login_password").input(password)
+        at = result.timed_step("login", at.button(key="login_button").click().run)
+        if "user" not in at.session_state:
+            raise RuntimeError(f"login as {username} failed")
+
+        for iteration in range(iterations):
+            for step, page in (("dashboard", "Dashboard"), ("metrics", "Metrics"), ("rewards", "Rewards")):
+                at = result.timed_step(step, at.radio(key="sidebar_nav_auth").set_value(page).run)
+            month = CALENDAR_MONTHS[(session_index + iteration) % len(CALENDAR_MONTHS)]
+            at = result.timed_step("calendar", at.selectbox(key="calendar_month_selector").set_value(month).run)
+    except Exception as e:
+        result.error = f"session {session_index}: {e!r}"
+    return result
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def summarize(results, wall_seconds):
+    reruns = [rerun for result in results for rerun in result.reruns]
+    steps = {}
+    for step in STEPS:
+        samples = [seconds for name, seconds, _ in reruns if name == step]
+        if samples:
+            steps[step] = _percentiles(samples)
+            steps[step]["failed"] = sum(failed for name, _, failed in reruns if name == step)
+            steps[step]["per_second"] = len(samples) / wall_seconds
+    return {
+        "sessions": len(results),
+        "failed_sessions": [result.error for result in results if result.error],
+        "wall_seconds": wall_seconds,
+        "reruns": len(reruns),
+        "reruns_per_second": len(reruns) / wall_seconds,
+        "steps": steps,
+    }
+
+
+def run_load_test(sessions, iterations, username, password):
+    barrier = threading.Barrier(sessions)
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        start = time.perf_counter()
+        futures = [
+            pool.submit(run_session, index, iterations, username, password, barrier)
+            for index in range(sessions)
+        ]
+        results = [future.result() for future in futures]
+        wall_seconds = time.perf_counter() - start
+    return summarize(results, wall_seconds)
+
+
+def print_report(report):
+    print(f"{report['sessions']} sessions, {report['reruns']} reruns in {report['wall_seconds']:.1f} s "
+          f"({report['reruns_per_second']:.2f} reruns/s)")
+    print(f"{'step':<10} {'count':>6} {'failed':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'/s':>7}")
+    for step, stats in report["steps"].items():
+        print(f"{step:<10} {stats['count']:>6} {stats['failed']:>6} {stats['mean_ms']:>9.0f} {stats['p50_ms']:>9.0f} "
+              f"{stats['p95_ms']:>9.0f} {stats['p99_ms']:>9.0f} {stats['max_ms']:>9.0f} {stats['per_second']:>7.2f}")
+    for error in report["failed_sessions"]:
+        print(f"FAILED {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with simulated sessions in threads")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--username", default="demo")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database to copy and run against")
+    parser.add_argument("--output", help="also write the report to a JSON file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No database at {args.db}; run data/init_db.py first")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix="swachit-load-") as directory:
+        # The models read SWACHIT_DB_PATH when first imported by the app
+        os.environ["SWACHIT_DB_PATH"] = shutil.copy(args.db, os.path.join(directory, "database.db"))
+        report = run_load_test(args.sessions, args.iterations, args.username, args.password)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed_sessions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Benchmark controllers, models and widgets at several data scales
+
+    python benchmarks/run_benchmarks.py                      # run and compare with benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline      # run and store the results as the new baseline
+    python benchmarks/run_benchmarks.py --scales 1 10 --only get_user
+
+Every benchmark is run at each scale (1x, 10x and 100x by default) and reports the
+median wall time over --repeat runs, plus the net memory allocated and the peak
+memory of one traced run. Worker cold start (importing streamlit and every view in a
+fresh interpreter, see import_profile.py) is tracked as "startup.cold_start", with the
+process's peak RSS as its peak memory. The run fails (exit status 1) when a benchmark is slower,
+or peaks higher, than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+# The app packages and this one import from the project root, whether run as a script or with -m
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.import_profile import cold_start
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_REPEAT = 5
+# Relative slowdown (or peak memory growth) over the baseline counted as a regression
+DEFAULT_THRESHOLD = 0.25
+# Differences below these are treated as noise whatever the ratio
+MIN_REGRESSION_MS = 0.5
+MIN_REGRESSION_KIB = 64
+
+# Data sizes at scale 1
+BASE_USERS = 1000
+BASE_DAYS = 30
+# Calls per run at scale 1 for functions that take no data size
+BASE_CALLS = 10
+# Model lookups per run
+LOOKUPS = 100
+
+
+def _create_database(directory, users):
+    """A throwaway database with users and rewards"""
+    path = os.path.join(directory, f"database-{users}.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            status TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE rewards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            points INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO users (id, username, password, status) VALUES (?, ?, ?, 'active')",
+        ((i, f"resident{i}", "password") for i in range(1, users + 1))
+    )
+    conn.executemany(
+        "INSERT INTO rewards (user_id, points) VALUES (?, ?)",
+        ((i, (i * 37) % 200) for i in range(1, users + 1))
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _repeat(func, calls):
+    def run():
+        for _ in range(calls):
+            func()
+    return run
+
+
+def _build_benchmarks(scale, directory):
+    """(name, callable) pairs for one scale; the database is switched to this scale's size"""
+    import models.db
+    from controllers.waste_controller import (
+        get_waste_stats, get_ward_cleanliness_scores, get_active_complaints, get_recycling_stats
+    )
+    from components.calendar_widget import generate_disposal_history
+    from views.rewards_view import generate_reward_data
+    from models.user_model import User
+    from models.rewards_model import Rewards
+
+    users = BASE_USERS * scale
+    models.db.DB_PATH = _create_database(directory, users)
+    rng = random.Random(scale)
+    usernames = [f"resident{rng.randint(1, users)}" for _ in range(LOOKUPS)]
+    user_ids = [rng.randint(1, users) for _ in range(LOOKUPS)]
+    calls = BASE_CALLS * scale
+
+    def lookup_users():
+        for username in usernames:
+            User.get_user(username)
+
+    def lookup_rewards():
+        for user_id in user_ids:
+            Rewards.get_rewards(user_id)
+
+    return [
+        ("waste_controller.get_waste_stats", lambda: get_waste_stats(user_id=1, days=BASE_DAYS * scale)),
+        ("waste_controller.get_ward_cleanliness_scores", _repeat(get_ward_cleanliness_scores, calls)),
+        ("waste_controller.get_active_complaints", _repeat(lambda: get_active_complaints("Koramangala"), calls)),
+        ("waste_controller.get_recycling_stats", _repeat(lambda: get_recycling_stats("Koramangala"), calls)),
+        ("calendar_widget.generate_disposal_history", lambda: generate_disposal_history(1, days=BASE_DAYS * scale)),
+        ("rewards_view.generate_reward_data", _repeat(lambda: generate_reward_data(1), calls)),
+        ("User.get_user", lookup_users),
+        ("Rewards.get_rewards", lookup_rewards),
+    ]
+
+
+def measure(func, repeat):
+    """Median/min/max wall time in ms, then net allocations and peak memory of one traced run"""
+    func()  # warm up caches and lazy imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+        "allocated_kib": (current - base_memory) / 1024,
+        "allocated_blocks": blocks,
+        "peak_kib": (peak - base_memory) / 1024,
+    }
+
+
+def measure_cold_start(repeat):
+    """Wall time and peak RSS of importing the app in fresh interpreters"""
+    runs = [cold_start() for _ in range(repeat)]
+    times = [seconds * 1000 for seconds, _ in runs]
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+        "allocated_kib": None,
+        "allocated_blocks": None,
+        "peak_kib": statistics.median(max_rss for _, max_rss in runs),
+    }
+
+
+def _print_stats(name, scale, stats):
+    allocated = "-" if stats["allocated_kib"] is None else f"{stats['allocated_kib']:.1f}"
+    print(f"{name:<45} {scale:>4}x {stats['median_ms']:>10.2f} ms "
+          f"{allocated:>10} KiB {stats['peak_kib']:>10.1f} KiB peak")
+
+
+def run(scales, repeat, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="swachit-bench-") as directory:
+        for scale in scales:
+            for name, func in _build_benchmarks(scale, directory):
+                if only and only not in name:
+                    continue
+                stats = measure(func, repeat)
+                results.setdefault(name, {})[str(scale)] = stats
+                _print_stats(name, scale, stats)
+
+    if not only or only in "startup.cold_start":
+        stats = measure_cold_start(repeat)
+        results["startup.cold_start"] = {"1": stats}
+        _print_stats("startup.cold_start", 1, stats)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Regressions of results against a baseline, as readable lines"""
+    regressions = []
+    for name, scales in results.items():
+        for scale, stats in scales.items():
+            old = baseline.get(name, {}).get(scale)
+            if old is None:
+                continue
+            slower = stats["median_ms"] - old["median_ms"]
+            if stats["median_ms"] > old["median_ms"] * (1 + threshold) and slower > MIN_REGRESSION_MS:
+                regressions.append(
+                    f"{name} {scale}x: {stats['median_ms']:.2f} ms vs {old['median_ms']:.2f} ms baseline"
+                )
+            grown = stats["peak_kib"] - old["peak_kib"]
+            if stats["peak_kib"] > old["peak_kib"] * (1 + threshold) and grown > MIN_REGRESSION_KIB:
+                regressions.append(
+                    f"{name} {scale}x: {stats['peak_kib']:.0f} KiB peak vs {old['peak_kib']:.0f} KiB baseline"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SwachIT at several data scales")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline JSON to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "repeat": args.repeat,
+        "results": run(args.scales, args.repeat, args.only),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report["results"], baseline["results"], args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import streamlit as st
+
+from controllers.map_controller import get_clustered_layer, viewport_bbox
+
+# Marker colour per clustered layer
+LAYER_COLORS = {"bins": "#2c3e50", "complaints": "#e74c3c"}
+LAYER_LABELS = {"bins": "bins", "complaints": "open complaints"}
+
+
+def _cluster_icon(count, color):
+    """Round badge showing the number of points in a cluster"""
+    import folium
+
+    size = 24 if count < 10 else 30 if count < 100 else 38
+    return folium.DivIcon(
+        icon_size=(size, size),
+        icon_anchor=(size // 2, size // 2),
+        html=f"""
+        <div style="background-color: {color}; color: white; border-radius: 50%; width: {size}px;
+                    height: {size}px; line-height: {size}px; text-align: center; font-size: 12px;
+                    font-weight: bold; opacity: 0.85;">{count}</div>
+        """
+    )
+
+
+def _point_label(layer, point):
+    if layer == "bins":
+        return f"{point['location']} ({point['capacity_litres']} L)"
+    return f"{point['type']} ({point['status']})"
+
+
+def render_cluster_map(ward_map_data, center, key, zoom=13, height=350):
+    """
+    Folium map of the wards with bins and open complaints clustered on the server
+    The map's last zoom level and bounds (returned by st_folium) choose which
+    pre-clustered level to draw and which clusters fall inside the view.
+    """
+    # folium and streamlit_folium take ~0.4 s to import and are only needed for this map
+    import folium
+    from streamlit_folium import st_folium
+
+    view = st.session_state.get(key) or {}
+    # The base map is built from fixed arguments so it is not re-created as the user pans;
+    # only the clustered feature group changes between reruns
+    m = folium.Map(location=center, zoom_start=zoom, tiles="OpenStreetMap")
+    zoom = view.get("zoom") or zoom
+    bounds = view.get("bounds") or {}
+    if bounds.get("_southWest") and bounds.get("_northEast"):
+        bbox = (
+            bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+            bounds["_northEast"]["lat"], bounds["_northEast"]["lng"]
+        )
+    else:
+        bbox = viewport_bbox(center[0], center[1], zoom, height_px=height)
+
+    for ward in ward_map_data:
+        folium.CircleMarker(
+            location=[ward['latitude'], ward['longitude']],
+            radius=10,
+            color=ward['color'],
+            fill=True,
+            fill_opacity=0.6,
+            tooltip=f"{ward['ward']}: {ward['score']}/100 ({ward['category']})"
+        ).add_to(m)
+
+    points = folium.FeatureGroup(name="Bins and complaints")
+    for layer, color in LAYER_COLORS.items():
+        for cluster in get_clustered_layer(layer, zoom, bbox):
+            location = [cluster['latitude'], cluster['longitude']]
+            if cluster['count'] > 1:
+                folium.Marker(
+                    location=location,
+                    icon=_cluster_icon(cluster['count'], color),
+                    tooltip=f"{cluster['count']} {LAYER_LABELS[layer]} - zoom in to see them"
+                ).add_to(points)
+            else:
+                folium.CircleMarker(
+                    location=location,
+                    radius=5,
+                    color=color,
+                    fill=True,
+                    fill_opacity=0.9,
+                    tooltip=_point_label(layer, cluster['point'])
+                ).add_to(points)
+
+    return st_folium(
+        m,
+        key=key,
+        height=height,
+        use_container_width=True,
+        feature_group_to_add=points,
+        returned_objects=["zoom", "bounds"]
+    )
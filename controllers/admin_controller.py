@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.db import get_connection
+from models.query_trace import (
+    get_query_stats, reset_query_stats, explain_query, is_explainable, SLOW_QUERY_MS, SLOW_QUERY_LOG_PATH
+)
+
+# Statements offered for EXPLAIN QUERY PLAN on the admin page
+TOP_OFFENDERS = 10
+
+
+def get_query_report():
+    """Traced statements, most total time first, with mean latency and rows per call"""
+    report = []
+    for stats in get_query_stats():
+        report.append({
+            "sql": stats["sql"],
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "mean_ms": stats["total_ms"] / stats["calls"],
+            "max_ms": stats["max_ms"],
+            "total_ms": stats["total_ms"],
+            "rows_per_call": stats["rows"] / stats["calls"],
+            "sites": ", ".join(stats["sites"])
+        })
+    return report
+
+
+def get_top_offenders(limit=TOP_OFFENDERS):
+    """Normalized SQL of the SELECT statements with the most total time"""
+    selects = [stats["sql"] for stats in get_query_stats() if is_explainable(stats["sql"])]
+    return selects[:limit]
+
+
+def explain_statement(normalized_sql):
+    """Query plan of a traced statement, re-run with the parameters it was last called with"""
+    for stats in get_query_stats():
+        if stats["sql"] == normalized_sql:
+            try:
+                conn = get_connection()
+                plan = explain_query(conn, stats["last_sql"], stats["last_params"])
+                conn.close()
+                return plan
+            except Exception as e:
+                print(f"Error explaining query: {e}")
+                return []
+    return []
+
+
+def get_slow_query_settings():
+    return {"threshold_ms": SLOW_QUERY_MS, "log_path": SLOW_QUERY_LOG_PATH}
+
+
+def reset_query_report():
+    reset_query_stats()
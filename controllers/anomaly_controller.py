@@ -0,0 +1,91 @@
+import sys
+import os
+import math
+from datetime import date, datetime, timedelta
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.alert_model import Alert
+from models.ward_stats_model import WardStats
+from utils.instrumentation import timed
+
+MONITORED_METRICS = ["waste_generated", "segregation_rate"]
+
+# Smoothing factor for the exponentially weighted mean and variance
+EWMA_ALPHA = 0.1
+# Observations per (ward, metric, weekday) before alerts are raised
+WARMUP_POINTS = 8
+Z_THRESHOLD = 3.0
+# Floor on the standard deviation so near-constant series do not alert on noise
+MIN_STD = {"waste_generated": 0.2, "segregation_rate": 1.0}
+
+
+def update_state(state, value, alpha=EWMA_ALPHA):
+    """
+    Score a new observation against the running EWMA state, then fold it in
+    Returns the z-score (None during warm-up). O(1) per observation.
+    """
+    n = state["n"]
+    if n == 0:
+        state["mean"], state["variance"], state["n"] = value, 0.0, 1
+        return None
+
+    deviation = value - state["mean"]
+    std = max(math.sqrt(state["variance"]), MIN_STD.get(state["metric"], 0.0))
+    z_score = deviation / std if n >= WARMUP_POINTS and std > 0 else None
+
+    state["mean"] += alpha * deviation
+    state["variance"] = (1 - alpha) * (state["variance"] + alpha * deviation ** 2)
+    state["n"] = n + 1
+    return z_score
+
+
+@timed()
+def process_new_points():
+    """
+    Feed rollup rows newer than each detector's last date through the detectors
+    Only unseen points are read, so history is never recomputed. Returns the number of new alerts.
+    """
+    states = Alert.get_states()
+    since = min((s["last_date"] for s in states.values()), default="0000-00-00")
+    rows = WardStats.get_rows_since(since)
+    if not rows:
+        return 0
+
+    changed = {}
+    alerts = []
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for row in rows:
+        weekday = datetime.strptime(row["date"], "%Y-%m-%d").weekday()
+        for metric in MONITORED_METRICS:
+            key = (row["ward"], metric, weekday)
+            state = states.get(key) or {
+                "ward": row["ward"], "metric": metric, "weekday": weekday,
+                "last_date": "0000-00-00", "n": 0, "mean": 0.0, "variance": 0.0
+            }
+            if row["date"] <= state["last_date"]:
+                continue
+            expected = state["mean"]
+            z_score = update_state(state, row[metric])
+            state["last_date"] = row["date"]
+            states[key] = changed[key] = state
+            if z_score is not None and abs(z_score) >= Z_THRESHOLD:
+                alerts.append({
+                    "ward": row["ward"],
+                    "metric": metric,
+                    "date": row["date"],
+                    "value": row[metric],
+                    "expected": expected,
+                    "z_score": z_score,
+                    "created_at": created_at
+                })
+
+    if changed:
+        Alert.save(list(changed.values()), alerts)
+    return len(alerts)
+
+
+@timed()
+def get_ward_alerts(ward, days=14, limit=10):
+    since = (date.today() - timedelta(days=days)).isoformat()
+    return Alert.get_recent(ward, since, limit)
@@ -0,0 +1,133 @@
+import sys
+import os
+import math
+
+import numpy as np
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from controllers.complaint_controller import get_complaint_points
+from utils.instrumentation import timed
+
+# Complaints that signal a missing or undersized community bin
+BIN_DEMAND_TYPES = ["Missing community bin", "Overflowing bin"]
+
+# Weighted reports (votes) one community bin is expected to absorb
+BIN_CAPACITY = 25
+MAX_BINS = 50
+
+# Residents are considered served by a bin within this walking distance
+SERVICE_RADIUS_M = 150
+
+METRES_PER_DEGREE = 111320.0
+
+
+def _project(lats, lons, origin):
+    """Project coordinates to metres on a local plane around origin (accurate at ward scale)"""
+    x = (np.asarray(lons) - origin[1]) * METRES_PER_DEGREE * math.cos(math.radians(origin[0]))
+    y = (np.asarray(lats) - origin[0]) * METRES_PER_DEGREE
+    return np.column_stack([x, y])
+
+
+def _unproject(xy, origin):
+    lats = xy[:, 1] / METRES_PER_DEGREE + origin[0]
+    lons = xy[:, 0] / (METRES_PER_DEGREE * math.cos(math.radians(origin[0]))) + origin[1]
+    return lats, lons
+
+
+def _squared_distances(points, centers):
+    """(points x centers) squared distances without materialising the difference tensor"""
+    return np.maximum(
+        (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :],
+        0
+    )
+
+
+def weighted_kmeans(points, weights, k, max_iter=30, tolerance_m=1.0, seed=0):
+    """
+    Weighted k-means with k-means++ seeding
+    Stops when no center moves more than tolerance_m. Returns (centers, labels).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(points)
+    k = min(k, n)
+    probabilities = weights / weights.sum()
+    centers = [points[rng.choice(n, p=probabilities)]]
+    closest = _squared_distances(points, np.array(centers))[:, 0]
+    for _ in range(1, k):
+        scores = closest * weights
+        if scores.sum() <= 0:
+            break
+        centers.append(points[rng.choice(n, p=scores / scores.sum())])
+        closest = np.minimum(closest, _squared_distances(points, centers[-1][None, :])[:, 0])
+    centers = np.array(centers)
+
+    labels = np.zeros(n, dtype=int)
+    for _ in range(max_iter):
+        labels = np.argmin(_squared_distances(points, centers), axis=1)
+        # Weighted centroid of each cluster in one pass
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        sums = np.column_stack([
+            np.bincount(labels, weights=weights * points[:, d], minlength=len(centers))
+            for d in range(points.shape[1])
+        ])
+        occupied = totals > 0
+        new_centers = centers.copy()
+        new_centers[occupied] = sums[occupied] / totals[occupied, None]
+        if np.abs(new_centers - centers).max() <= tolerance_m:
+            centers = new_centers
+            break
+        centers = new_centers
+    return centers, labels
+
+
+def snap_to_medoids(points, centers, labels):
+    """
+    Move each center onto the reported point in its cluster nearest to it,
+    so suggested sites are at real, reachable locations
+    """
+    snapped = centers.copy()
+    nearest = _squared_distances(points, centers)
+    for cluster in range(len(centers)):
+        members = np.flatnonzero(labels == cluster)
+        if len(members):
+            snapped[cluster] = points[members[np.argmin(nearest[members, cluster])]]
+    return snapped
+
+
+@timed()
+def suggest_bin_sites(ward, capacity=BIN_CAPACITY):
+    """
+    Suggest community bin sites for a ward from its bin-related complaint history
+    The number of sites follows the reported demand (votes) divided by bin capacity.
+    Returns a dict with the sites (latitude, longitude, demand) and coverage metrics,
+    or None when the ward has no geotagged bin complaints.
+    """
+    rows = get_complaint_points(ward, BIN_DEMAND_TYPES)
+    if not rows:
+        return None
+
+    data = np.array(rows, dtype=float)
+    weights = np.maximum(data[:, 2], 1)
+    origin = (data[:, 0].mean(), data[:, 1].mean())
+    points = _project(data[:, 0], data[:, 1], origin)
+
+    k = int(min(MAX_BINS, max(1, math.ceil(weights.sum() / capacity))))
+    centers, labels = weighted_kmeans(points, weights, k)
+    sites = snap_to_medoids(points, centers, labels)
+    labels = np.argmin(_squared_distances(points, sites), axis=1)
+    distances = np.sqrt(_squared_distances(points, sites)[np.arange(len(points)), labels])
+
+    lats, lons = _unproject(sites, origin)
+    demand = np.bincount(labels, weights=weights, minlength=len(sites))
+    covered = distances <= SERVICE_RADIUS_M
+    return {
+        "sites": [
+            {"latitude": float(lats[i]), "longitude": float(lons[i]), "demand": float(demand[i])}
+            for i in range(len(sites))
+        ],
+        "reports": len(rows),
+        "coverage": float(weights[covered].sum() / weights.sum() * 100),
+        "mean_distance_m": float(np.average(distances, weights=weights)),
+        "max_distance_m": float(distances.max())
+    }
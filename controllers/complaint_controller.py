@@ -0,0 +1,226 @@
+import sys
+import os
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.complaint_model import Complaint
+from models.db import DENSITY_RESOLUTIONS
+from models.data_version_model import DataVersion
+from controllers.waste_controller import get_active_complaints, get_ward_centroid
+from controllers.photo_controller import store_photo
+from controllers.upvote_controller import upvote_complaint, apply_pending_votes
+from utils.geo import cell_key, neighbor_cell_keys, haversine_m, normalize_location
+from utils.instrumentation import timed
+
+COMPLAINT_STATUSES = ["Pending", "In Progress", "Resolved", "Closed"]
+COMPLAINT_PRIORITIES = ["High", "Medium", "Low"]
+
+# Service-level agreement (hours to resolve) per complaint type
+SLA_HOURS = {
+    "Missed garbage collection": 24,
+    "Garbage not collected": 24,
+    "Overflowing bin": 24,
+    "Waste burning incident": 12,
+    "Burning of waste": 12,
+    "Drain blockage due to waste": 24,
+    "Black spot not cleared": 72,
+    "Black spot/dumping": 72,
+    "Commercial waste dumping": 72,
+    "Littering in public space": 72,
+    "Improper waste disposal": 72,
+    "Construction debris": 120,
+    "Improper segregation by neighbors": 120,
+    "Segregation not enforced": 120,
+    "Missing community bin": 168,
+}
+DEFAULT_SLA_HOURS = 72
+
+# Reports of the same type within this distance and time window are treated as duplicates
+DUPLICATE_RADIUS_M = 100
+DUPLICATE_WINDOW_DAYS = 7
+
+# Wards already checked for demo data in this process
+_seeded_wards = set()
+
+
+def compute_due_at(complaint_type, reported_at):
+    """SLA deadline for a complaint reported at the given datetime"""
+    hours = SLA_HOURS.get(complaint_type, DEFAULT_SLA_HOURS)
+    return (reported_at + timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _ensure_seeded(ward):
+    """
+    Populate a ward with demo complaints the first time it is viewed
+    In a real app, complaints would only come from citizen reports
+    """
+    if ward in _seeded_wards:
+        return
+    if Complaint.count(ward) == 0:
+        demo = get_active_complaints(ward)
+        centroid = get_ward_centroid(ward)
+        rng = random.Random(ward)
+        for complaint in demo:
+            complaint["ward"] = ward
+            reported_at = datetime.strptime(complaint["date_reported"], "%Y-%m-%d")
+            complaint["due_at"] = compute_due_at(complaint["type"], reported_at)
+            complaint["location_key"] = normalize_location(complaint["location"])
+            if centroid:
+                # Scatter demo complaints within roughly 1 km of the ward centre
+                complaint["latitude"] = centroid[0] + rng.uniform(-0.01, 0.01)
+                complaint["longitude"] = centroid[1] + rng.uniform(-0.01, 0.01)
+                complaint["cell_key"] = cell_key(complaint["latitude"], complaint["longitude"])
+        Complaint.insert_many(demo)
+    _seeded_wards.add(ward)
+
+
+def find_duplicate(ward, complaint_type, location, latitude=None, longitude=None, now=None):
+    """
+    Find an open complaint that a new report duplicates, or None
+    Geotagged reports are matched within DUPLICATE_RADIUS_M using the 3x3 block of grid
+    cells around the point; other reports are matched on their normalized address.
+    """
+    now = now or datetime.now()
+    since = (now - timedelta(days=DUPLICATE_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    if latitude is not None and longitude is not None:
+        candidates = Complaint.find_duplicate_candidates(
+            complaint_type, since, cell_keys=neighbor_cell_keys(latitude, longitude)
+        )
+        nearby = [
+            (haversine_m(latitude, longitude, c["latitude"], c["longitude"]), c)
+            for c in candidates
+            if c["latitude"] is not None and c["longitude"] is not None
+        ]
+        nearby = [item for item in nearby if item[0] <= DUPLICATE_RADIUS_M]
+        return min(nearby, key=lambda item: item[0])[1] if nearby else None
+
+    location_key = normalize_location(location)
+    if not location_key:
+        return None
+    candidates = Complaint.find_duplicate_candidates(
+        complaint_type, since, ward=ward, location_key=location_key
+    )
+    return max(candidates, key=lambda c: c["votes"]) if candidates else None
+
+
+@timed()
+def submit_complaint(ward, complaint_type, location, description, priority="Low",
+                     latitude=None, longitude=None, user_id=None, photo=None):
+    """
+    Register a citizen report, merging it into an existing open complaint when it is a duplicate
+    Returns (complaint_id, merged)
+    """
+    _ensure_seeded(ward)
+    now = datetime.now()
+    photo_hash = store_photo(photo) if photo is not None else None
+
+    duplicate = find_duplicate(ward, complaint_type, location, latitude, longitude, now)
+    if duplicate:
+        if photo_hash:
+            Complaint.attach_photo(duplicate["id"], photo_hash)
+        # A repeat report counts as the reporter's upvote (at most once per user)
+        if user_id is not None:
+            upvote_complaint(user_id, duplicate["id"])
+        else:
+            Complaint.add_votes(duplicate["id"])
+        return duplicate["id"], True
+
+    complaint = {
+        "id": f"BBMP-WM-{uuid.uuid4().hex[:8].upper()}",
+        "ward": ward,
+        "type": complaint_type,
+        "location": location,
+        "description": description,
+        "status": "Pending",
+        "priority": priority,
+        "votes": 1,
+        "date_reported": now.strftime("%Y-%m-%d"),
+        "due_at": compute_due_at(complaint_type, now),
+        "location_key": normalize_location(location),
+        "photo_hash": photo_hash
+    }
+    if latitude is not None and longitude is not None:
+        complaint["latitude"] = latitude
+        complaint["longitude"] = longitude
+        complaint["cell_key"] = cell_key(latitude, longitude)
+    if not Complaint.insert_many([complaint]):
+        return None, False
+    return complaint["id"], False
+
+
+@timed()
+def count_complaints(ward, statuses=None, priorities=None, types=None):
+    _ensure_seeded(ward)
+    return Complaint.count(ward, statuses, priorities, types)
+
+
+@timed()
+def get_complaints_page(ward, statuses=None, priorities=None, types=None, page=1, page_size=20):
+    """Get one page (1-based) of complaints matching the filters"""
+    _ensure_seeded(ward)
+    offset = (max(1, page) - 1) * page_size
+    return apply_pending_votes(
+        Complaint.get_page(ward, statuses, priorities, types, limit=page_size, offset=offset)
+    )
+
+
+def get_page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+@timed()
+def get_urgent_complaints(ward, limit=10):
+    """Next open complaints to work on in a ward, ordered by SLA deadline"""
+    _ensure_seeded(ward)
+    return apply_pending_votes(Complaint.get_most_urgent(ward, limit))
+
+
+def get_complaint_types(ward):
+    _ensure_seeded(ward)
+    return Complaint.get_types(ward)
+
+
+@timed()
+def get_complaint_summary(ward):
+    _ensure_seeded(ward)
+    return Complaint.get_summary(ward)
+
+
+def get_open_complaint_points(ward):
+    """Open complaints in a ward that have coordinates (pickup points for collection routes)"""
+    _ensure_seeded(ward)
+    return Complaint.get_open_points(ward)
+
+
+def get_complaints_version():
+    """Change counter of the complaints table, for keying results derived from complaints"""
+    return DataVersion.get("complaints")
+
+
+def get_complaint_points(ward, types):
+    """Coordinates and votes of every geotagged complaint of the given types in a ward"""
+    _ensure_seeded(ward)
+    return Complaint.get_points_by_type(ward, types)
+
+
+@timed()
+def get_complaint_density(ward=None, resolution=0):
+    """
+    Complaint counts per grid cell (see models.db.DENSITY_RESOLUTIONS) with cell centre
+    coordinates, for one ward or (ward=None) the whole city
+    """
+    if ward is not None:
+        _ensure_seeded(ward)
+    cell_deg = DENSITY_RESOLUTIONS[resolution]
+    return [
+        {
+            "latitude": (row + 0.5) * cell_deg,
+            "longitude": (col + 0.5) * cell_deg,
+            "count": count
+        }
+        for row, col, count in Complaint.get_density(resolution, ward)
+    ]
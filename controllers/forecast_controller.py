@@ -0,0 +1,123 @@
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.ward_stats_model import WardStats
+from controllers.metrics_controller import refresh_ward_rollups, ROLLUP_DAYS
+from utils.instrumentation import timed, count
+
+MIN_HORIZON_DAYS = 7
+MAX_HORIZON_DAYS = 30
+# Two-sided 95% interval
+INTERVAL_Z = 1.96
+
+# Fitted models keyed by (metric, hour fitted)
+_model_cache = {}
+
+
+def _design_matrix(dates, origin, months):
+    """
+    Regressors for each date: intercept, linear trend (in years), day-of-week
+    dummies (Monday is the reference) and month dummies for the given months
+    """
+    day_numbers = np.array([(d - origin).days for d in dates], dtype=float)
+    weekdays = np.array([d.weekday() for d in dates])
+    month_numbers = np.array([d.month for d in dates])
+    columns = [np.ones(len(dates)), day_numbers / 365.0]
+    columns += [(weekdays == dow).astype(float) for dow in range(1, 7)]
+    columns += [(month_numbers == m).astype(float) for m in months]
+    return np.column_stack(columns)
+
+
+def fit_ward_models(metric="waste_generated", today=None):
+    """
+    Fit one seasonal linear model per ward with a single least-squares solve
+    All wards share the design matrix, so the fit is X⁺·Y for the (days x wards) matrix Y.
+    """
+    today = today or date.today()
+    refresh_ward_rollups(today)
+    start = today - timedelta(days=ROLLUP_DAYS)
+    rows = WardStats.get_daily_series(metric, start.isoformat(), today.isoformat())
+    if not rows:
+        return None
+
+    series = pd.DataFrame(rows, columns=["date", "ward", "value"]).pivot(index="date", columns="ward", values="value")
+    series = series.dropna()
+    dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in series.index]
+    origin = dates[0]
+
+    # Month dummies only for observed months, leaving the first as the reference
+    observed_months = sorted({d.month for d in dates})[1:]
+    X = _design_matrix(dates, origin, observed_months)
+    Y = series.to_numpy()
+
+    XtX_inv = np.linalg.pinv(X.T @ X)
+    coefficients = XtX_inv @ X.T @ Y
+    residuals = Y - X @ coefficients
+    dof = max(1, X.shape[0] - np.linalg.matrix_rank(X))
+    sigma = np.sqrt((residuals ** 2).sum(axis=0) / dof)
+
+    return {
+        "metric": metric,
+        "wards": list(series.columns),
+        "origin": origin,
+        "last_date": dates[-1],
+        "months": observed_months,
+        "coefficients": coefficients,
+        "XtX_inv": XtX_inv,
+        "sigma": sigma
+    }
+
+
+@timed()
+def get_ward_models(metric="waste_generated", now=None):
+    """Fitted ward models, refit at most once per hour"""
+    now = now or datetime.now()
+    cache_key = (metric, now.strftime("%Y-%m-%d %H"))
+    count("cache_requests", cache="ward_models", result="hit" if cache_key in _model_cache else "miss")
+    if cache_key not in _model_cache:
+        model = fit_ward_models(metric, now.date())
+        # Keep only the latest fit for each metric
+        for key in [k for k in _model_cache if k[0] == metric]:
+            del _model_cache[key]
+        _model_cache[cache_key] = model
+    return _model_cache[cache_key]
+
+
+def forecast_wards(horizon=14, metric="waste_generated", now=None):
+    """
+    Forecast every ward for the next `horizon` days (clamped to 7-30)
+    Returns a long DataFrame with date, ward, forecast, lower and upper bounds.
+    """
+    model = get_ward_models(metric, now)
+    if model is None:
+        return pd.DataFrame(columns=["date", "ward", "forecast", "lower", "upper"])
+
+    horizon = min(MAX_HORIZON_DAYS, max(MIN_HORIZON_DAYS, int(horizon)))
+    dates = [model["last_date"] + timedelta(days=i) for i in range(1, horizon + 1)]
+    X_new = _design_matrix(dates, model["origin"], model["months"])
+
+    forecast = X_new @ model["coefficients"]
+    # Prediction interval includes parameter uncertainty: sigma * sqrt(1 + x (X'X)^-1 x')
+    leverage = np.einsum("ij,jk,ik->i", X_new, model["XtX_inv"], X_new)
+    half_width = INTERVAL_Z * np.sqrt(1 + leverage)[:, None] * model["sigma"][None, :]
+
+    wards = model["wards"]
+    return pd.DataFrame({
+        "date": np.repeat(pd.to_datetime(dates), len(wards)),
+        "ward": np.tile(wards, len(dates)),
+        "forecast": forecast.ravel(),
+        "lower": (forecast - half_width).ravel(),
+        "upper": (forecast + half_width).ravel()
+    })
+
+
+@timed()
+def forecast_ward(ward, horizon=14, metric="waste_generated", now=None):
+    forecasts = forecast_wards(horizon, metric, now)
+    return forecasts[forecasts["ward"] == ward].reset_index(drop=True)
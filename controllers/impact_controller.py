@@ -0,0 +1,182 @@
+import sys
+import os
+from datetime import date
+
+import numpy as np
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.ward_stats_model import WardStats
+from controllers.waste_controller import get_waste_stats
+from controllers.metrics_controller import refresh_ward_rollups
+from utils.instrumentation import timed, count
+
+WASTE_TYPES = ["Wet", "Dry", "Hazardous", "E-waste", "Garden"]
+
+PRACTICES = [
+    "Organic Waste Composting",
+    "Plastic Recycling",
+    "Paper Recycling",
+    "Metal Recycling",
+    "Glass Recycling",
+    "E-waste Processing",
+    "Waste-to-Energy"
+]
+
+IMPACT_DIMENSIONS = ["carbon", "water", "land"]
+
+# Share of each waste type (rows) handled by each practice (columns); the rest is landfilled
+TREATMENT_SHARE = np.array([
+    # Compost Plastic Paper  Metal  Glass  E-waste WtE
+    [0.55,    0.00,   0.00,  0.00,  0.00,  0.00,   0.10],  # Wet
+    [0.00,    0.15,   0.20,  0.04,  0.05,  0.00,   0.10],  # Dry
+    [0.00,    0.00,   0.00,  0.00,  0.00,  0.00,   0.20],  # Hazardous
+    [0.00,    0.00,   0.00,  0.10,  0.00,  0.70,   0.00],  # E-waste
+    [0.70,    0.00,   0.00,  0.00,  0.00,  0.00,   0.10],  # Garden
+])
+
+# Impact avoided per tonne treated instead of landfilled:
+# tonnes CO2e, kilolitres of water, m² of landfill area
+PRACTICE_FACTORS = np.array([
+    [0.45, 0.2, 0.8],   # Organic Waste Composting
+    [1.40, 3.0, 1.5],   # Plastic Recycling
+    [0.90, 26.0, 1.2],  # Paper Recycling
+    [4.00, 2.5, 0.4],   # Metal Recycling
+    [0.30, 0.5, 0.6],   # Glass Recycling
+    [2.50, 1.0, 0.3],   # E-waste Processing
+    [0.60, 0.1, 1.1],   # Waste-to-Energy
+])
+
+# Tonnes CO2e emitted per tonne of each waste type sent to landfill
+LANDFILL_CARBON = np.array([0.70, 0.20, 0.30, 0.20, 0.50])
+
+# Estimated % health improvement per unit of realised benefit in each impact dimension
+HEALTH_METRICS = [
+    "Respiratory Conditions",
+    "Vector-borne Diseases",
+    "Water-borne Diseases",
+    "Allergic Reactions",
+    "Quality of Life Index"
+]
+HEALTH_COEFFICIENTS = np.array([
+    # carbon water land
+    [40.0, 0.0, 10.0],
+    [10.0, 20.0, 30.0],
+    [0.0, 50.0, 10.0],
+    [20.0, 5.0, 5.0],
+    [25.0, 20.0, 25.0],
+])
+
+# Paper recycling saves about 17 trees per tonne
+TREES_PER_TONNE_PAPER = 17
+SQ_METRES_PER_ACRE = 4046.86
+
+# Impact reports keyed by (day computed, year)
+_report_cache = {}
+
+
+def compute_impacts(tonnage):
+    """
+    Contract a (wards x months x types) tonnage tensor with the factor tables
+    Returns per-ward monthly baseline carbon, avoided impacts (wards x months x dimensions),
+    the share of the avoided impact contributed by each practice, and the fraction of the
+    achievable benefit realised in each dimension.
+    """
+    tonnage = np.asarray(tonnage, dtype=float)
+    baseline_carbon = np.einsum("wmt,t->wm", tonnage, LANDFILL_CARBON)
+    avoided = np.einsum("wmt,tp,pk->wmk", tonnage, TREATMENT_SHARE, PRACTICE_FACTORS, optimize=True)
+
+    # City-wide contribution of each practice in each dimension
+    tonnes_by_type = tonnage.sum(axis=(0, 1))
+    by_practice = np.einsum("t,tp,pk->pk", tonnes_by_type, TREATMENT_SHARE, PRACTICE_FACTORS)
+    totals = by_practice.sum(axis=0)
+    practice_share = np.divide(by_practice, totals, out=np.zeros_like(by_practice), where=totals > 0) * 100
+
+    # Benefit if every tonne were treated with the same practice mix and nothing landfilled
+    full_mix = TREATMENT_SHARE / np.maximum(TREATMENT_SHARE.sum(axis=1, keepdims=True), 1e-9)
+    achievable = np.einsum("t,tp,pk->k", tonnes_by_type, full_mix, PRACTICE_FACTORS)
+    realised = np.divide(totals, achievable, out=np.zeros_like(totals), where=achievable > 0)
+
+    return {
+        "baseline_carbon": baseline_carbon,
+        "avoided": avoided,
+        "practice_share": practice_share,
+        "realised": realised
+    }
+
+
+def build_tonnage_tensor(start, end):
+    """
+    Build the (wards x months x types) tonnage tensor from the ward rollups
+    Monthly ward totals are split by each ward's waste composition.
+    Also returns the number of days of data in each month.
+    """
+    monthly = WardStats.get_monthly_totals(start, end)
+    wards = sorted({row["ward"] for row in monthly})
+    months = sorted({row["month"] for row in monthly})
+    ward_index = {ward: i for i, ward in enumerate(wards)}
+    month_index = {month: i for i, month in enumerate(months)}
+
+    totals = np.zeros((len(wards), len(months)))
+    days = np.zeros(len(months))
+    for row in monthly:
+        totals[ward_index[row["ward"]], month_index[row["month"]]] = row["waste_generated"]
+        days[month_index[row["month"]]] = max(days[month_index[row["month"]]], row["days"])
+
+    composition = np.zeros((len(wards), len(WASTE_TYPES)))
+    for ward, i in ward_index.items():
+        by_type = get_waste_stats(None, ward)[0]["by_type"]
+        composition[i] = [by_type[t]["amount_kg"] for t in WASTE_TYPES]
+    composition /= composition.sum(axis=1, keepdims=True)
+
+    return wards, months, days, totals[:, :, None] * composition[:, None, :]
+
+
+@timed()
+def get_impact_report(year=None, today=None):
+    """
+    City-wide environmental impact for a year (defaults to the current year), cached per day
+    """
+    today = today or date.today()
+    year = year or today.year
+    cache_key = (today.isoformat(), year)
+    if cache_key in _report_cache:
+        count("cache_requests", cache="impact_report", result="hit")
+        return _report_cache[cache_key]
+    count("cache_requests", cache="impact_report", result="miss")
+
+    refresh_ward_rollups(today)
+    wards, months, days, tonnage = build_tonnage_tensor(f"{year}-01-01", f"{year}-12-31")
+    if not months:
+        return None
+    impacts = compute_impacts(tonnage)
+
+    # City totals per month
+    baseline = impacts["baseline_carbon"].sum(axis=0)
+    avoided = impacts["avoided"].sum(axis=0)
+    paper_index = PRACTICES.index("Paper Recycling")
+    paper_tonnes = np.einsum("wmt,t->m", tonnage, TREATMENT_SHARE[:, paper_index])
+
+    report = {
+        "wards": wards,
+        "months": months,
+        "days_per_month": days,
+        "monthly": {
+            "baseline_carbon": baseline,
+            "actual_carbon": baseline - avoided[:, 0],
+            "avoided_carbon": avoided[:, 0],
+            "water_saved_kl": avoided[:, 1],
+            "landfill_saved_acres": avoided[:, 2] / SQ_METRES_PER_ACRE,
+            "trees_saved": paper_tonnes * TREES_PER_TONNE_PAPER
+        },
+        "ward_avoided": impacts["avoided"].sum(axis=1),
+        "practice_share": {
+            practice: dict(zip(IMPACT_DIMENSIONS, impacts["practice_share"][i]))
+            for i, practice in enumerate(PRACTICES)
+        },
+        "health": dict(zip(HEALTH_METRICS, HEALTH_COEFFICIENTS @ impacts["realised"]))
+    }
+
+    _report_cache.clear()
+    _report_cache[cache_key] = report
+    return report
@@ -0,0 +1,158 @@
+import sys
+import os
+import math
+import random
+
+import numpy as np
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.bin_model import Bin
+from models.complaint_model import Complaint
+from models.data_version_model import DataVersion
+from controllers.waste_controller import get_ward_map_data
+from utils.instrumentation import timed, count
+
+# Below this zoom level a viewport covers several wards, so only ward summaries are drawn
+MIN_DETAIL_ZOOM = 13
+# Upper bound on markers of each kind sent to the browser for one viewport
+MAX_MAP_POINTS = 2000
+
+# Demo bins generated per ward when the bins table is empty
+DEMO_BINS_PER_WARD = 40
+
+TILE_SIZE_PX = 256
+
+# Points closer than this many screen pixels at a zoom level are drawn as one cluster
+CLUSTER_PX = 60
+# Zoom levels the clustered map layers are prepared for
+CLUSTER_ZOOMS = range(10, 19)
+# Upper bound on source points read when clustering a layer for the whole city
+MAX_CLUSTER_SOURCE_POINTS = 200000
+WORLD_BBOX = (-90, -180, 90, 180)
+
+# (layer, zoom) -> (data version, clusters) for the whole city
+_cluster_cache = {}
+
+
+def viewport_bbox(center_lat, center_lon, zoom, width_px=800, height_px=450):
+    """
+    (min_lat, min_lon, max_lat, max_lon) visible in a web-mercator map of the given size
+    centred on a point at a zoom level
+    """
+    degrees_per_px = 360.0 / (TILE_SIZE_PX * 2 ** zoom)
+    half_width = width_px / 2 * degrees_per_px
+    # Latitude degrees shrink by cos(latitude) on the mercator projection
+    half_height = height_px / 2 * degrees_per_px * math.cos(math.radians(center_lat))
+    return center_lat - half_height, center_lon - half_width, center_lat + half_height, center_lon + half_width
+
+
+def ensure_demo_bins():
+    """
+    Populate the bins table with demo bins around every ward centre if it is empty
+    In a real app, bins would come from the BBMP asset register
+    """
+    if Bin.count() > 0:
+        return
+    bins = []
+    for ward in get_ward_map_data():
+        rng = random.Random(f"bins:{ward['ward']}")
+        for number in range(1, DEMO_BINS_PER_WARD + 1):
+            bins.append({
+                "ward": ward["ward"],
+                "location": f"{ward['ward']} community bin {number}",
+                "latitude": float(ward["latitude"]) + rng.uniform(-0.012, 0.012),
+                "longitude": float(ward["longitude"]) + rng.uniform(-0.012, 0.012),
+                "capacity_litres": rng.choice([120, 240, 660, 1100])
+            })
+    Bin.insert_many(bins)
+
+
+@timed()
+def get_viewport_points(center_lat, center_lon, zoom, width_px=800, height_px=450):
+    """
+    Open complaints and bins inside the visible map area
+    Nothing is fetched below MIN_DETAIL_ZOOM. Each list is capped at MAX_MAP_POINTS;
+    "truncated" is True when a cap was reached.
+    """
+    if zoom < MIN_DETAIL_ZOOM:
+        return {"complaints": [], "bins": [], "truncated": False}
+    ensure_demo_bins()
+    bbox = viewport_bbox(center_lat, center_lon, zoom, width_px, height_px)
+    complaints = Complaint.get_in_bbox(*bbox, limit=MAX_MAP_POINTS)
+    bins = Bin.get_in_bbox(*bbox, limit=MAX_MAP_POINTS)
+    return {
+        "complaints": complaints,
+        "bins": bins,
+        "truncated": len(complaints) >= MAX_MAP_POINTS or len(bins) >= MAX_MAP_POINTS
+    }
+
+
+def cluster_points(points, zoom, cluster_px=CLUSTER_PX):
+    """
+    Grid-cluster points for display at a zoom level
+    Points falling in the same cell of roughly cluster_px screen pixels become one cluster
+    at their mean position. Returns clusters with latitude, longitude, count, and the
+    point itself for single-point clusters.
+    """
+    if not points:
+        return []
+    lats = np.array([p["latitude"] for p in points])
+    lons = np.array([p["longitude"] for p in points])
+    cell_deg = cluster_px * 360.0 / (TILE_SIZE_PX * 2 ** zoom)
+    cells = np.column_stack([np.floor(lats / cell_deg), np.floor(lons / cell_deg)])
+    _, labels = np.unique(cells, axis=0, return_inverse=True)
+    labels = labels.ravel()
+    counts = np.bincount(labels)
+    mean_lats = np.bincount(labels, weights=lats) / counts
+    mean_lons = np.bincount(labels, weights=lons) / counts
+    first = np.full(len(counts), -1)
+    first[labels[::-1]] = np.arange(len(points))[::-1]
+    return [
+        {
+            "latitude": float(mean_lats[i]),
+            "longitude": float(mean_lons[i]),
+            "count": int(counts[i]),
+            "point": points[first[i]] if counts[i] == 1 else None
+        }
+        for i in range(len(counts))
+    ]
+
+
+def _layer_points(layer):
+    if layer == "bins":
+        ensure_demo_bins()
+        return Bin.get_in_bbox(*WORLD_BBOX, limit=MAX_CLUSTER_SOURCE_POINTS)
+    return Complaint.get_in_bbox(*WORLD_BBOX, limit=MAX_CLUSTER_SOURCE_POINTS)
+
+
+def _layer_version(layer):
+    """Change counter of the layer's table; any insert, delete or move bumps it"""
+    if layer == "bins":
+        ensure_demo_bins()
+    return DataVersion.get(layer)
+
+
+@timed()
+def get_clustered_layer(layer, zoom, bbox=None):
+    """
+    Clusters of a map layer ("bins" or "complaints") at a zoom level, limited to bbox
+    The whole city is clustered once per zoom level and reused until the layer's data changes.
+    """
+    zoom = int(min(max(round(zoom), CLUSTER_ZOOMS[0]), CLUSTER_ZOOMS[-1]))
+    version = _layer_version(layer)
+    cached = _cluster_cache.get((layer, zoom))
+    if cached is None or version is None or cached[0] != version:
+        count("cache_requests", cache="clusters", result="miss")
+        cached = (version, cluster_points(_layer_points(layer), zoom))
+        _cluster_cache[(layer, zoom)] = cached
+    else:
+        count("cache_requests", cache="clusters", result="hit")
+    clusters = cached[1]
+    if bbox is None:
+        return clusters
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return [
+        c for c in clusters
+        if min_lat <= c["latitude"] <= max_lat and min_lon <= c["longitude"] <= max_lon
+    ]
@@ -1,5 +1,6 @@
 import os
 import sys
+from datetime import date, timedelta
 
 # Get the absolute path of the project
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,9 +11,117 @@ if project_root not in sys.path:
 
 # Now import using absolute path
 from models.waste_model import Waste
+from models.ward_stats_model import WardStats
+from controllers.waste_controller import get_waste_stats, get_ward_cleanliness_scores, get_neighboring_wards
+from controllers.complaint_controller import get_complaint_summary
+from controllers.anomaly_controller import process_new_points
+from utils.instrumentation import timed, count
+
+# Days of history kept in the ward rollups (a year, for the monthly impact reports)
+ROLLUP_DAYS = 365
+# KPIs compare the last KPI_PERIOD_DAYS days with the period before
+KPI_PERIOD_DAYS = 7
+# Ward comparisons average the rollups over this many days
+COMPARISON_DAYS = 30
+
+# City KPIs keyed by the day they were computed for
+_kpi_cache = {}
 
 def get_daily_waste_stats():
     return Waste.get_daily_stats()
 
 def get_cleanliness_score():
-    return Waste.get_cleanliness_score()
\ No newline at end of file
+    return Waste.get_cleanliness_score()
+
+@timed()
+def refresh_ward_rollups(today=None):
+    """
+    Rebuild the daily per-ward rollups if they are not current
+    In a real app, these rows would be written by the nightly collection data load
+    """
+    today = today or date.today()
+    earliest, latest = WardStats.get_date_range()
+    if latest == today.isoformat() and earliest <= (today - timedelta(days=ROLLUP_DAYS)).isoformat():
+        return False
+
+    rows = []
+    for ward in [w["ward"] for w in get_ward_cleanliness_scores()]:
+        _, ward_df = get_waste_stats(None, ward, days=ROLLUP_DAYS)
+        for record in ward_df.to_dict("records"):
+            rows.append({
+                "date": record["date"].isoformat(),
+                "ward": ward,
+                "waste_generated": record["waste_generated"],
+                "segregation_rate": record["segregation_rate"],
+                "collection_efficiency": record["collection_efficiency"],
+                "processing_rate": record["processing_rate"],
+                "recycling_rate": record["recycling_rate"]
+            })
+    if not WardStats.upsert_many(rows):
+        return False
+    # Score only the days the anomaly detectors have not seen yet
+    process_new_points()
+    return True
+
+@timed()
+def get_city_kpis(today=None):
+    """
+    City-wide KPIs with period-over-period deltas, computed once per day
+    Returns None if no rollup data is available
+    """
+    today = today or date.today()
+    cache_key = today.isoformat()
+    if cache_key in _kpi_cache:
+        count("cache_requests", cache="kpis", result="hit")
+        return _kpi_cache[cache_key]
+    count("cache_requests", cache="kpis", result="miss")
+
+    refresh_ward_rollups(today)
+    current_start = today - timedelta(days=KPI_PERIOD_DAYS - 1)
+    previous_start = current_start - timedelta(days=KPI_PERIOD_DAYS)
+    periods = WardStats.get_period_kpis(previous_start.isoformat(), current_start.isoformat(), today.isoformat())
+    if not periods or periods["current"]["daily_waste"] is None:
+        return None
+
+    current, previous = periods["current"], periods["previous"]
+    kpis = {}
+    for key, value in current.items():
+        before = previous.get(key)
+        # Waste is compared as a relative change, rates as a change in percentage points
+        if key == "daily_waste":
+            # No relative change against a missing or zero baseline
+            delta = (value - before) / before * 100 if before else None
+        else:
+            delta = None if before is None else value - before
+        kpis[key] = {"value": value, "delta": delta}
+
+    # Drop entries for earlier days so the cache stays at one entry
+    _kpi_cache.clear()
+    _kpi_cache[cache_key] = kpis
+    return kpis
+
+@timed()
+def get_ward_comparison(ward, k=3, today=None):
+    """
+    Compare a ward with its k geographically nearest wards
+    Returns (wards, rows) where wards lists the neighbours followed by the ward itself and
+    each row has ward, metric and value.
+    """
+    today = today or date.today()
+    refresh_ward_rollups(today)
+    wards = get_neighboring_wards(ward, k) + [ward]
+    scores = {w["ward"]: w["score"] for w in get_ward_cleanliness_scores()}
+    averages = WardStats.get_ward_averages(wards, (today - timedelta(days=COMPARISON_DAYS)).isoformat())
+
+    rows = []
+    for name in wards:
+        summary = get_complaint_summary(name)
+        values = {
+            "Cleanliness Score": scores.get(name),
+            "Segregation Rate": averages.get(name, {}).get("segregation_rate"),
+            "Collection Efficiency": averages.get(name, {}).get("collection_efficiency"),
+            "Complaint Resolution": summary["resolved"] / summary["total"] * 100 if summary["total"] else None
+        }
+        for metric, value in values.items():
+            rows.append({"ward": name, "metric": metric, "value": value})
+    return wards, rows
@@ -0,0 +1,109 @@
+import sys
+import os
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+PHOTO_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "photos")
+ORIGINALS_DIR = os.path.join(PHOTO_ROOT, "originals")
+THUMBNAILS_DIR = os.path.join(PHOTO_ROOT, "thumbs")
+
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = (320, 320)
+ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
+
+# Thumbnails are generated off the request path
+_thumbnail_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnailer")
+
+
+def _original_path(photo_hash):
+    # Fan out by hash prefix so no directory grows too large
+    return os.path.join(ORIGINALS_DIR, photo_hash[:2], photo_hash)
+
+
+def get_thumbnail_path(photo_hash):
+    """Path of a photo's thumbnail, or None while it is still being generated"""
+    if not photo_hash:
+        return None
+    path = os.path.join(THUMBNAILS_DIR, f"{photo_hash}.jpg")
+    return path if os.path.exists(path) else None
+
+
+@timed()
+def make_thumbnail(photo_hash):
+    """Decode an original once and write a small JPEG thumbnail next to it"""
+    source = _original_path(photo_hash)
+    target = os.path.join(THUMBNAILS_DIR, f"{photo_hash}.jpg")
+    if os.path.exists(target):
+        return target
+    tmp_path = None
+    try:
+        with Image.open(source) as image:
+            # Let the JPEG decoder downscale while decoding instead of inflating the full image
+            image.draft("RGB", THUMBNAIL_SIZE)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(THUMBNAIL_SIZE)
+            os.makedirs(THUMBNAILS_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=THUMBNAILS_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as out:
+                image.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+            os.replace(tmp_path, target)
+        return target
+    except Exception as e:
+        logger.warning(f"Could not create thumbnail for {photo_hash}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+
+@timed()
+def store_photo(uploaded_file):
+    """
+    Stream an uploaded photo to content-addressed storage and queue its thumbnail
+    Returns the photo's SHA-256 hash, or None if the upload is not an allowed image.
+    Identical uploads are stored once.
+    """
+    name = getattr(uploaded_file, "name", "") or ""
+    if name.rsplit(".", 1)[-1].lower() not in ALLOWED_EXTENSIONS:
+        return None
+
+    os.makedirs(ORIGINALS_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=ORIGINALS_DIR, suffix=".upload")
+    try:
+        # Copy in fixed-size chunks, hashing as we go
+        uploaded_file.seek(0)
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+
+        # Reject anything Pillow cannot identify as an image
+        with Image.open(tmp_path) as image:
+            image.verify()
+
+        photo_hash = digest.hexdigest()
+        target = _original_path(photo_hash)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+    except Exception as e:
+        logger.warning(f"Rejected photo upload {name!r}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    if get_thumbnail_path(photo_hash) is None:
+        _thumbnail_pool.submit(make_thumbnail, photo_hash)
+    return photo_hash
@@ -0,0 +1,216 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from controllers.waste_controller import get_ward_centroid
+from controllers.complaint_controller import get_open_complaint_points
+from models.data_version_model import DataVersion
+from utils.instrumentation import timed, count
+
+EARTH_RADIUS_KM = 6371.0
+
+# Default time allowed for improving routes after construction
+DEFAULT_TIME_BUDGET_SECONDS = 3.0
+
+# Smallest gain (km) that counts as an improvement. Distances are float32, so zero-gain moves
+# such as reversing a whole route can appear slightly negative and would otherwise cycle.
+IMPROVEMENT_EPSILON_KM = 1e-4
+
+# Vehicle load (in bin-lift units) needed to clear a pickup point of each complaint type
+PICKUP_LOAD = {
+    "Overflowing bin": 2,
+    "Black spot not cleared": 4,
+    "Black spot/dumping": 4,
+    "Commercial waste dumping": 3,
+    "Construction debris": 5,
+}
+DEFAULT_PICKUP_LOAD = 1
+
+# (ward, capacity) -> (complaints data version, routes), shared by every session in this process
+_plan_cache = {}
+
+
+def distance_matrix(lats, lons):
+    """Pairwise great-circle distances in km, computed in one vectorized pass"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    # float32 halves the memory of the matrix for large zones
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))).astype(np.float32)
+
+
+def route_length(route, dist):
+    """Length of a closed route (node indices, starting and ending at the depot)"""
+    route = np.asarray(route)
+    return float(dist[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbor_routes(dist, loads, capacity):
+    """
+    Build capacity-feasible routes from the depot (node 0) by repeatedly visiting
+    the nearest unvisited stop that still fits in the vehicle
+    """
+    n = dist.shape[0]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[0] = False
+    routes = []
+    while unvisited.any():
+        route = [0]
+        remaining = capacity
+        current = 0
+        while True:
+            candidates = unvisited & (loads <= remaining)
+            if not candidates.any():
+                break
+            row = np.where(candidates, dist[current], np.inf)
+            nxt = int(np.argmin(row))
+            route.append(nxt)
+            unvisited[nxt] = False
+            remaining -= loads[nxt]
+            current = nxt
+        if len(route) == 1:
+            # A single stop larger than the vehicle gets a dedicated trip
+            nxt = int(np.flatnonzero(unvisited)[0])
+            route.append(nxt)
+            unvisited[nxt] = False
+        route.append(0)
+        routes.append(route)
+    return routes
+
+
+def two_opt(route, dist, deadline):
+    """
+    Improve a closed route with 2-opt moves; for each edge all reversal partners
+    are evaluated at once with NumPy
+    """
+    route = np.asarray(route)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, len(route) - 2):
+            a, b = route[i - 1], route[i]
+            c = route[i + 1:-1]
+            d = route[i + 2:]
+            delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+            k = int(np.argmin(delta))
+            if delta[k] < -IMPROVEMENT_EPSILON_KM:
+                j = i + 1 + k
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return route
+
+
+def or_opt(route, dist, deadline, max_segment=3):
+    """
+    Improve a closed route by moving segments of 1-3 consecutive stops to their best
+    position elsewhere in the route, evaluating every insertion point at once
+    """
+    route = list(route)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length < len(route):
+                segment = route[i:i + length]
+                prev_node, next_node = route[i - 1], route[i + length]
+                first, last = segment[0], segment[-1]
+                removal_gain = dist[prev_node, first] + dist[last, next_node] - dist[prev_node, next_node]
+
+                rest = np.array(route[:i] + route[i + length:])
+                u, v = rest[:-1], rest[1:]
+                # Cost of inserting the segment (in either orientation) between u and v
+                forward = dist[u, first] + dist[last, v] - dist[u, v]
+                backward = dist[u, last] + dist[first, v] - dist[u, v]
+                costs = np.minimum(forward, backward)
+                costs[i - 1] = np.inf  # original position
+                k = int(np.argmin(costs))
+                if costs[k] < removal_gain - IMPROVEMENT_EPSILON_KM:
+                    if backward[k] < forward[k]:
+                        segment = segment[::-1]
+                    rest = list(rest)
+                    route = rest[:k + 1] + segment + rest[k + 1:]
+                    improved = True
+                else:
+                    i += 1
+                if time.perf_counter() >= deadline:
+                    return np.array(route)
+    return np.array(route)
+
+
+def plan_routes(depot, stops, capacity, time_budget=DEFAULT_TIME_BUDGET_SECONDS):
+    """
+    Plan collection routes from a depot over pickup points
+    depot is (latitude, longitude); stops is a list of dicts with "id", "latitude",
+    "longitude" and optional "load" (defaults to 1). Returns a list of routes, each with
+    the ordered stop IDs, the path coordinates (starting and ending at the depot),
+    distance in km and total load.
+    """
+    if not stops:
+        return []
+
+    lats = np.array([depot[0]] + [s["latitude"] for s in stops])
+    lons = np.array([depot[1]] + [s["longitude"] for s in stops])
+    loads = np.array([0.0] + [float(s.get("load", 1)) for s in stops])
+    dist = distance_matrix(lats, lons)
+
+    deadline = time.perf_counter() + time_budget
+    routes = nearest_neighbor_routes(dist, loads, capacity)
+    # Split the improvement budget evenly so every route gets some attention
+    per_route = time_budget / len(routes)
+    improved_routes = []
+    for route in routes:
+        route_deadline = min(deadline, time.perf_counter() + per_route)
+        route = two_opt(route, dist, route_deadline)
+        route = or_opt(route, dist, route_deadline)
+        improved_routes.append(route)
+
+    result = []
+    for number, route in enumerate(improved_routes, start=1):
+        nodes = [int(node) for node in route]
+        result.append({
+            "route": number,
+            "stop_ids": [stops[node - 1]["id"] for node in nodes[1:-1]],
+            "path": [(float(lats[node]), float(lons[node])) for node in nodes],
+            "distance_km": route_length(nodes, dist),
+            "load": float(loads[nodes].sum())
+        })
+    return result
+
+
+def get_planned_routes(ward, capacity):
+    """Routes last planned for a ward and capacity, or None if none were planned or complaints changed since"""
+    cached = _plan_cache.get((ward, capacity))
+    if cached is not None and cached[0] is not None and cached[0] == DataVersion.get("complaints"):
+        count("cache_requests", cache="route_plans", result="hit")
+        return cached[1]
+    count("cache_requests", cache="route_plans", result="miss")
+    return None
+
+
+@timed()
+def plan_ward_routes(ward, capacity, time_budget=DEFAULT_TIME_BUDGET_SECONDS):
+    """
+    Plan collection routes over a ward's open geotagged complaints, starting and
+    ending at the ward centre
+    The plan is kept for get_planned_routes until the complaints change.
+    """
+    # Read before the stops, so a change made while planning invalidates this plan
+    version = DataVersion.get("complaints")
+    depot = get_ward_centroid(ward)
+    if depot is None:
+        return []
+    stops = get_open_complaint_points(ward)
+    for stop in stops:
+        stop["load"] = PICKUP_LOAD.get(stop["type"], DEFAULT_PICKUP_LOAD)
+    routes = plan_routes(depot, stops, capacity, time_budget)
+    _plan_cache[(ward, capacity)] = (version, routes)
+    return routes
@@ -0,0 +1,134 @@
+import sys
+import os
+import atexit
+import threading
+import time
+from datetime import datetime
+
+# Use direct relative import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.complaint_model import Complaint
+from utils.instrumentation import timed
+
+# How often buffered votes are written to the database
+FLUSH_INTERVAL_SECONDS = 5.0
+# Flush early once this many votes are waiting
+MAX_PENDING_VOTES = 1000
+
+
+class UpvoteBuffer:
+    """
+    Collects upvotes in memory and writes them to SQLite in periodic batches,
+    so a burst of clicks on one complaint costs one short transaction instead
+    of one write lock per click
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL_SECONDS, max_pending=MAX_PENDING_VOTES):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # complaint ID -> set of user IDs
+        self._pending_total = 0
+        self._in_flight = {}  # votes taken by a flush that has not committed yet
+        self._flusher = None
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name="upvote-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _is_buffered(self, user_id, complaint_id):
+        return (user_id in self._pending.get(complaint_id, ())
+                or user_id in self._in_flight.get(complaint_id, ()))
+
+    def upvote(self, user_id, complaint_id):
+        """Buffer a vote; returns False if this user has already voted for the complaint"""
+        user_id = str(user_id)
+        with self._lock:
+            if self._is_buffered(user_id, complaint_id):
+                return False
+        # Primary-key lookup on complaint_votes; a read, so it never waits on the write lock
+        if complaint_id in Complaint.get_voted_ids(user_id, [complaint_id]):
+            return False
+        with self._lock:
+            if self._is_buffered(user_id, complaint_id):
+                return False
+            self._pending.setdefault(complaint_id, set()).add(user_id)
+            self._pending_total += 1
+            flush_now = self._pending_total >= self.max_pending
+            self._start_flusher()
+        if flush_now:
+            self.flush()
+        return True
+
+    def pending_votes(self, complaint_id):
+        """Votes for a complaint that are not yet in the database"""
+        with self._lock:
+            return len(self._pending.get(complaint_id, ())) + len(self._in_flight.get(complaint_id, ()))
+
+    def buffered_voters(self, user_id, complaint_ids):
+        """Which of the given complaints have a buffered vote from this user"""
+        user_id = str(user_id)
+        with self._lock:
+            return {cid for cid in complaint_ids if self._is_buffered(user_id, cid)}
+
+    def _committed(self):
+        # The batch is now counted in the database; stop adding it on top
+        with self._lock:
+            self._in_flight = {}
+
+    def flush(self):
+        """Write all buffered votes in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending, self._pending_total = self._pending, {}, 0
+                self._in_flight = batch
+            written = Complaint.apply_votes(
+                batch, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), on_commit=self._committed
+            )
+            with self._lock:
+                self._in_flight = {}
+                if not written:
+                    # Keep the votes for the next flush rather than dropping them
+                    for complaint_id, user_ids in batch.items():
+                        pending = self._pending.setdefault(complaint_id, set())
+                        before = len(pending)
+                        pending.update(user_ids)
+                        self._pending_total += len(pending) - before
+                    return 0
+            return sum(len(user_ids) for user_ids in batch.values())
+
+
+# Shared by every session served by this process
+_buffer = UpvoteBuffer()
+atexit.register(_buffer.flush)
+
+
+def upvote_complaint(user_id, complaint_id):
+    return _buffer.upvote(user_id, complaint_id)
+
+
+@timed()
+def flush_upvotes():
+    return _buffer.flush()
+
+
+def apply_pending_votes(complaints):
+    """Add buffered votes to complaint dicts so users see their own votes immediately"""
+    for complaint in complaints:
+        complaint["votes"] += _buffer.pending_votes(complaint["id"])
+    return complaints
+
+
+def get_voted_complaint_ids(user_id, complaint_ids):
+    """Complaints the user has voted for, whether flushed or still buffered"""
+    user_id = str(user_id)
+    return Complaint.get_voted_ids(user_id, complaint_ids) | _buffer.buffered_voters(user_id, complaint_ids)
@@ -1,8 +1,25 @@
 import pandas as pd
 import numpy as np
 import random
+import os
+import json
 from datetime import datetime, timedelta
 
+from utils.spatial import KDTree, PolygonIndex, project_to_plane, voronoi_cells
+from utils.instrumentation import timed
+
+# GeoJSON FeatureCollection of ward boundary polygons (a "ward" property per feature)
+WARD_BOUNDARIES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ward_boundaries.geojson")
+# Margin (degrees) around the ward centres for approximate boundaries
+WARD_BOUNDARY_MARGIN_DEG = 0.03
+# Grid cell size (degrees, ~1 km) of the ward point-in-polygon index
+WARD_INDEX_CELL_DEG = 0.01
+
+# Nearest wards for every ward, built once from the ward centroids
+_ward_neighbors = None
+# Point-in-polygon index over ward boundaries, built once
+_ward_polygon_index = None
+
 def get_ward_cleanliness_scores():
     """
     Generate ward-level cleanliness scores with realistic BBMP ward names
@@ -52,16 +69,159 @@ def get_ward_cleanliness_scores():
     
     return ward_scores
 
-def get_waste_stats(user_id=None, ward_name="Koramangala"):
+def get_ward_map_data():
+    """
+    Generate geospatial data for ward-level waste management performance
+    In a real app, this would use actual GIS data for BBMP wards
+    """
+    # For demo purposes, we'll create mock lat/long coordinates for Bangalore wards
+    bengaluru_center = [12.9716, 77.5946]  # Lat/Long for Bangalore
+
+    wards = [
+        "Koramangala", "Indiranagar", "Jayanagar", "JP Nagar", "HSR Layout", 
+        "Malleswaram", "Shivajinagar", "Hebbal", "Yelahanka", "Mahadevpura",
+        "Whitefield", "Electronic City"
+    ]
+
+    # Generate pseudo-random but consistent coordinates around Bangalore
+    random.seed(42)  # For consistent results
+
+    ward_data = []
+    for i, ward in enumerate(wards):
+        # Generate coordinates in a roughly circular pattern around Bangalore center
+        angle = (i / len(wards)) * 2 * np.pi
+        radius = random.uniform(0.01, 0.08)  # ~1-8km in degrees
+
+        lat = bengaluru_center[0] + radius * np.sin(angle)
+        lon = bengaluru_center[1] + radius * np.cos(angle)
+
+        # Generate a realistic score between 40-95
+        score = random.randint(40, 95)
+
+        # Determine category based on score
+        if score >= 80:
+            category = "Excellent"
+            color = "#2ecc71"
+        elif score >= 60:
+            category = "Good"
+            color = "#3498db"
+        elif score >= 40:
+            category = "Average"
+            color = "#f39c12"
+        else:
+            category = "Needs Improvement"
+            color = "#e74c3c"
+
+        # Generate waste data
+        waste_collected = random.uniform(5, 15)  # tonnes per day
+        segregation_rate = random.uniform(50, 95)  # percentage
+        collection_efficiency = random.uniform(70, 99)  # percentage
+
+        ward_data.append({
+            "ward": ward,
+            "latitude": lat,
+            "longitude": lon,
+            "score": score,
+            "category": category,
+            "color": color,
+            "waste_collected": round(waste_collected, 1),
+            "segregation_rate": round(segregation_rate, 1),
+            "collection_efficiency": round(collection_efficiency, 1)
+        })
+
+    return ward_data
+
+def get_ward_centroid(ward):
+    """
+    Get the (latitude, longitude) of a ward's centre, or None for unknown wards
+    """
+    for ward_data in get_ward_map_data():
+        if ward_data["ward"] == ward:
+            return float(ward_data["latitude"]), float(ward_data["longitude"])
+    return None
+
+def _build_ward_neighbors():
+    """Map each ward to the other wards ordered by distance between centroids"""
+    wards = get_ward_map_data()
+    lats = [w["latitude"] for w in wards]
+    points = project_to_plane(lats, [w["longitude"] for w in wards], float(np.mean(lats)))
+    tree = KDTree(points)
+    neighbors = {}
+    for i, ward in enumerate(wards):
+        indices, _ = tree.query(points[i], k=len(wards))
+        neighbors[ward["ward"]] = [wards[j]["ward"] for j in indices if j != i]
+    return neighbors
+
+def get_neighboring_wards(ward, k=3):
+    """
+    Get the k wards nearest to a ward, nearest first
+    The neighbour lists are computed once per process and reused.
+    """
+    global _ward_neighbors
+    if _ward_neighbors is None:
+        _ward_neighbors = _build_ward_neighbors()
+    return _ward_neighbors.get(ward, [])[:k]
+
+def _geometry_rings(geometry):
+    """Every ring (outer boundaries and holes) of a GeoJSON Polygon or MultiPolygon"""
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        raise ValueError(f"Unsupported ward boundary geometry: {geometry['type']}")
+    return [[(point[0], point[1]) for point in ring] for polygon in polygons for ring in polygon]
+
+def get_ward_boundaries():
+    """
+    Get ward boundaries as {ward: [ring, ...]}, each ring a list of (longitude, latitude)
+    Uses WARD_BOUNDARIES_PATH when present, where wards may be Polygons or MultiPolygons
+    with holes; otherwise each ward's boundary is approximated by the area closer to its
+    centre than to any other ward's.
+    """
+    if os.path.exists(WARD_BOUNDARIES_PATH):
+        with open(WARD_BOUNDARIES_PATH) as f:
+            features = json.load(f)["features"]
+        return {feature["properties"]["ward"]: _geometry_rings(feature["geometry"]) for feature in features}
+
+    wards = get_ward_map_data()
+    sites = [(float(w["longitude"]), float(w["latitude"])) for w in wards]
+    bbox = (
+        min(x for x, _ in sites) - WARD_BOUNDARY_MARGIN_DEG,
+        min(y for _, y in sites) - WARD_BOUNDARY_MARGIN_DEG,
+        max(x for x, _ in sites) + WARD_BOUNDARY_MARGIN_DEG,
+        max(y for _, y in sites) + WARD_BOUNDARY_MARGIN_DEG
+    )
+    return {w["ward"]: [cell] for w, cell in zip(wards, voronoi_cells(sites, bbox))}
+
+def _get_ward_polygon_index():
+    global _ward_polygon_index
+    if _ward_polygon_index is None:
+        _ward_polygon_index = PolygonIndex(get_ward_boundaries(), WARD_INDEX_CELL_DEG)
+    return _ward_polygon_index
+
+def assign_ward(latitude, longitude):
+    """Get the ward containing a coordinate, or None if it is outside every ward"""
+    return _get_ward_polygon_index().find(longitude, latitude)
+
+def assign_wards(latitudes, longitudes):
+    """Bulk ward assignment for imported datasets; returns a ward name (or None) per point"""
+    index = _get_ward_polygon_index()
+    matches = index.find_many(longitudes, latitudes)
+    names = np.array(index.names + [None], dtype=object)
+    return names[matches].tolist()
+
+@timed()
+def get_waste_stats(user_id=None, ward_name="Koramangala", days=30):
     """
     Generate or retrieve waste statistics for a specific ward or user
     """
     # In a real app, this would query a database
     # For demo purposes, generate realistic data
     
-    # Generate daily data for the last 30 days
+    # Generate daily data for the last `days` days
     end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=30)
+    start_date = end_date - timedelta(days=days)
     date_range = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
     
     # Seed with ward name and user_id to get consistent but different results
@@ -0,0 +1,307 @@
+"""
+Generate a deterministic synthetic city for benchmarks and load tests
+
+    python data/generate_dataset.py --output /tmp/city.db
+    python data/generate_dataset.py --households 50000 --years 1 --output /tmp/small.db
+
+Fills users and rewards (one account per household), ward daily waste statistics,
+complaints and monthly household disposal histories, covering --years up to
+--end-date. The same arguments always give the same data, whatever the number of workers.
+
+Households are generated in chunks by a pool of worker processes, each writing its
+chunk into its own scratch database. The chunks are then merged into the output with
+INSERT ... SELECT, and only then are the indexes, triggers, R*Tree and density tables
+built (models.db.ensure_schema), so the load itself never maintains an index.
+"""
+import argparse
+import calendar
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+
+import numpy as np
+
+# Make the project packages importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.db import create_tables, ensure_schema
+from controllers.waste_controller import get_ward_map_data
+from controllers.complaint_controller import SLA_HOURS
+from utils.geo import DEFAULT_CELL_DEG, normalize_location
+
+DEFAULT_HOUSEHOLDS = 1_000_000
+DEFAULT_WARDS = 243
+DEFAULT_YEARS = 3
+DEFAULT_SEED = 2025
+HOUSEHOLDS_PER_CHUNK = 50_000
+
+# Complaints filed per household per year
+COMPLAINTS_PER_HOUSEHOLD_YEAR = 0.2
+# Complaints older than this are mostly resolved
+OPEN_COMPLAINT_DAYS = 30
+# Chance a household disposes of segregated waste / misses a collection on a weekday and a weekend day
+DISPOSAL_RATE = {"weekday": 0.7, "weekend": 0.3}
+MISSED_RATE = {"weekday": 0.2, "weekend": 0.6}
+# Reward points per day of proper disposal
+POINTS_PER_DISPOSAL = 0.1
+# Waste per household per day (kg)
+WASTE_PER_HOUSEHOLD_KG = 2.0
+# Spread of complaint locations around a ward centre (degrees, ~700 m)
+WARD_SPREAD_DEG = 0.006
+STREETS = ["Main Road", "Cross Road", "Park", "Market", "Bus Stop",
+           "Residential Layout", "Commercial Complex", "School Area"]
+
+# Monthly disposal history per household: bit (day - 1) set on the days waste was
+# disposed of properly (disposed) or the collection was missed (missed)
+DISPOSALS_TABLE = """
+CREATE TABLE IF NOT EXISTS household_disposals (
+    user_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    disposed INTEGER NOT NULL,
+    missed INTEGER NOT NULL,
+    PRIMARY KEY (user_id, month)
+) WITHOUT ROWID
+"""
+
+TABLES = ["users", "rewards", "household_disposals", "complaints", "ward_daily_stats"]
+
+
+def build_wards(count, seed):
+    """Names, centres and relative sizes of the wards, starting with the wards the app already knows"""
+    known = get_ward_map_data()
+    rng = np.random.default_rng([seed, 0])
+    names = [w["ward"] for w in known][:count]
+    lats = [float(w["latitude"]) for w in known][:count]
+    lons = [float(w["longitude"]) for w in known][:count]
+    extra = count - len(names)
+    if extra > 0:
+        # Further wards spread over the city, ~15 km across
+        names += [f"Ward {i:03d}" for i in range(len(names) + 1, count + 1)]
+        lats += list(12.9716 + rng.uniform(-0.13, 0.13, extra))
+        lons += list(77.5946 + rng.uniform(-0.13, 0.13, extra))
+    weights = rng.lognormal(0, 0.4, count)
+    return {"names": names, "lats": np.array(lats), "lons": np.array(lons), "weights": weights / weights.sum()}
+
+
+def month_starts(first_day, last_day):
+    months = []
+    day = first_day.replace(day=1)
+    while day <= last_day:
+        months.append(day)
+        day = (day + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _open_scratch(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_tables(conn)
+    conn.execute(DISPOSALS_TABLE)
+    return conn
+
+
+def generate_households(task):
+    """Users, rewards, disposal histories and complaints for one chunk of households, written to a scratch database"""
+    chunk, first_id, count, config = task
+    rng = np.random.default_rng([config["seed"], 1, chunk])
+    wards = config["wards"]
+    first_day, last_day = config["first_day"], config["last_day"]
+    ids = np.arange(first_id, first_id + count)
+    household_ward = rng.choice(len(wards["names"]), size=count, p=wards["weights"])
+
+    conn = _open_scratch(config["scratch"] % chunk)
+    cursor = conn.cursor()
+
+    # Disposal history, one row per household and month
+    disposed_days = np.zeros(count, dtype=np.int64)
+    for month in month_starts(first_day, last_day):
+        days = calendar.monthrange(month.year, month.month)[1]
+        weekend = np.array([(month + timedelta(days=d)).weekday() >= 5 for d in range(days)])
+        # Days outside the generated period have no record
+        in_range = np.array([first_day <= month + timedelta(days=d) <= last_day for d in range(days)])
+        disposal_rate = np.where(weekend, DISPOSAL_RATE["weekend"], DISPOSAL_RATE["weekday"])
+        missed_rate = np.where(weekend, MISSED_RATE["weekend"], MISSED_RATE["weekday"])
+        draws = rng.random((count, days))
+        disposed = (draws < disposal_rate) & in_range
+        missed = (draws >= disposal_rate) & (draws < disposal_rate + missed_rate) & in_range
+        bits = np.left_shift(1, np.arange(days, dtype=np.int64))
+        disposed_days += disposed.sum(axis=1)
+        cursor.executemany(
+            "INSERT INTO household_disposals VALUES (?, ?, ?, ?)",
+            zip(ids.tolist(), [month.strftime("%Y-%m")] * count, (disposed @ bits).tolist(), (missed @ bits).tolist())
+        )
+
+    cursor.executemany(
+        "INSERT INTO users (id, username, password, status) VALUES (?, ?, 'password', 'active')",
+        ((i, f"household{i:07d}") for i in ids.tolist())
+    )
+    cursor.executemany(
+        "INSERT INTO rewards (id, user_id, points) VALUES (?, ?, ?)",
+        zip(ids.tolist(), ids.tolist(), (disposed_days * POINTS_PER_DISPOSAL).astype(int).tolist())
+    )
+
+    # Complaints, filed by random households of the chunk at random times
+    total_days = (last_day - first_day).days + 1
+    n = rng.poisson(COMPLAINTS_PER_HOUSEHOLD_YEAR * count * total_days / 365)
+    filer = rng.integers(0, count, n)
+    ward_index = household_ward[filer]
+    day_offset = np.sort(rng.integers(0, total_days, n))
+    seconds = rng.integers(6 * 3600, 22 * 3600, n)
+    types = config["types"]
+    type_index = rng.integers(0, len(types), n)
+    lats = wards["lats"][ward_index] + rng.normal(0, WARD_SPREAD_DEG, n)
+    lons = wards["lons"][ward_index] + rng.normal(0, WARD_SPREAD_DEG, n)
+    street = rng.integers(0, len(STREETS), n)
+    age = total_days - 1 - day_offset
+    resolved = rng.random(n) < np.where(age > OPEN_COMPLAINT_DAYS, 0.95, 0.4)
+    status = np.where(resolved, np.where(rng.random(n) < 0.5, "Resolved", "Closed"),
+                      np.where(rng.random(n) < 0.6, "Pending", "In Progress"))
+    priority = np.where(age > 7, "High", np.where(age > 3, "Medium", "Low"))
+    votes = rng.poisson(2, n) + 1
+
+    rows = []
+    for i in range(n):
+        ward = wards["names"][ward_index[i]]
+        location = f"{STREETS[street[i]]}, {ward}"
+        reported = datetime.combine(first_day, datetime.min.time()) + timedelta(
+            days=int(day_offset[i]), seconds=int(seconds[i])
+        )
+        complaint_type = types[type_index[i]]
+        lat, lon = float(lats[i]), float(lons[i])
+        rows.append((
+            f"BBMP-WM-S{chunk:03d}{i:06d}", ward, complaint_type, location, None, str(status[i]), str(priority[i]),
+            int(votes[i]), reported.strftime("%Y-%m-%d"),
+            (reported + timedelta(hours=SLA_HOURS[complaint_type])).strftime("%Y-%m-%d %H:%M:%S"),
+            lat, lon, f"{int(np.floor(lat / DEFAULT_CELL_DEG))}:{int(np.floor(lon / DEFAULT_CELL_DEG))}",
+            normalize_location(location), None
+        ))
+    cursor.executemany(
+        """
+        INSERT INTO complaints
+            (id, ward, type, location, description, status, priority, votes, date_reported, due_at,
+             latitude, longitude, cell_key, location_key, photo_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+    conn.commit()
+    conn.close()
+    return chunk
+
+
+def generate_ward_stats(config, households):
+    """Daily waste statistics per ward, in (date, ward) order"""
+    rng = np.random.default_rng([config["seed"], 2])
+    wards = config["wards"]
+    first_day, last_day = config["first_day"], config["last_day"]
+    days = [first_day + timedelta(days=d) for d in range((last_day - first_day).days + 1)]
+    tonnes = wards["weights"] * households * WASTE_PER_HOUSEHOLD_KG / 1000
+    order = np.argsort(wards["names"])
+    for day in days:
+        weekend = day.weekday() >= 5
+        generated = tonnes * rng.uniform(1.0, 1.4) * rng.normal(1.0, 0.08, len(tonnes)) * (1.2 if weekend else 1.0)
+        segregation = rng.uniform(70, 85, len(tonnes)) if weekend else rng.uniform(80, 95, len(tonnes))
+        collection = rng.uniform(85, 98, len(tonnes))
+        processing = rng.uniform(70, 85, len(tonnes))
+        recycling = rng.uniform(30, 50, len(tonnes))
+        for w in order:
+            yield (
+                day.isoformat(), wards["names"][w], round(float(generated[w]), 2), round(float(segregation[w]), 1),
+                round(float(collection[w]), 1), round(float(processing[w]), 1), round(float(recycling[w]), 1)
+            )
+
+
+def generate(output, households, ward_count, years, seed, workers, last_day):
+    timings = {}
+    start = time.perf_counter()
+    first_day = last_day - timedelta(days=365 * years - 1)
+    scratch_dir = tempfile.mkdtemp(prefix="swachit-dataset-", dir=os.path.dirname(os.path.abspath(output)))
+    config = {
+        "seed": seed,
+        "wards": build_wards(ward_count, seed),
+        "types": list(SLA_HOURS),
+        "first_day": first_day,
+        "last_day": last_day,
+        "scratch": os.path.join(scratch_dir, "chunk-%04d.db"),
+    }
+    tasks = [
+        (chunk, first_id + 1, min(HOUSEHOLDS_PER_CHUNK, households - first_id), config)
+        for chunk, first_id in enumerate(range(0, households, HOUSEHOLDS_PER_CHUNK))
+    ]
+
+    conn = sqlite3.connect(output)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_tables(conn)
+    conn.execute(DISPOSALS_TABLE)
+    conn.executemany(
+        "INSERT INTO ward_daily_stats VALUES (?, ?, ?, ?, ?, ?, ?)", generate_ward_stats(config, households)
+    )
+    conn.commit()
+
+    # Chunks are merged in order as they finish, so the output is the same for any number of workers
+    with Pool(workers) as pool:
+        for chunk in pool.imap(generate_households, tasks):
+            path = config["scratch"] % chunk
+            conn.execute("ATTACH DATABASE ? AS chunk", (path,))
+            for table in TABLES[:-1]:
+                conn.execute(f"INSERT INTO main.{table} SELECT * FROM chunk.{table}")
+            conn.commit()
+            conn.execute("DETACH DATABASE chunk")
+            os.remove(path)
+            print(f"Merged households {tasks[chunk][1]:,}-{tasks[chunk][1] + tasks[chunk][2] - 1:,}")
+    os.rmdir(scratch_dir)
+    timings["load_s"] = time.perf_counter() - start
+
+    # Account used by the load test; no administrator is created (see data/init_db.py)
+    conn.execute("INSERT INTO users (username, password, status) VALUES ('demo', 'password', 'active')")
+    conn.execute("INSERT INTO rewards (user_id, points) VALUES (last_insert_rowid(), 120)")
+    conn.commit()
+
+    index_start = time.perf_counter()
+    ensure_schema(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    timings["index_s"] = time.perf_counter() - index_start
+
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+    conn.close()
+    timings["total_s"] = time.perf_counter() - start
+    return counts, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic city database")
+    parser.add_argument("--output", required=True, help="database file to create")
+    parser.add_argument("--households", type=int, default=DEFAULT_HOUSEHOLDS)
+    parser.add_argument("--wards", type=int, default=DEFAULT_WARDS)
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="last day of generated history (YYYY-MM-DD, default today)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="replace an existing output file")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.output):
+        if not args.force:
+            print(f"{args.output} already exists; use --force to replace it")
+            return 1
+        os.remove(args.output)
+
+    counts, timings = generate(
+        args.output, args.households, args.wards, args.years, args.seed, args.workers, args.end_date
+    )
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>12,}")
+    print(f"Loaded in {timings['load_s']:.0f} s, indexed in {timings['index_s']:.0f} s, "
+          f"{timings['total_s']:.0f} s in total")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,12 @@
 import sqlite3
 import os
+import sys
 import datetime
 
+# Make the models package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.db import ensure_schema
+
 # Get path to the database
 db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.db")
 print(f"Creating database at {db_path}")
@@ -39,6 +44,9 @@ CREATE TABLE IF NOT EXISTS rewards (
 )
 """)
 
+# Create complaint tables and indexes used by the models
+ensure_schema(conn)
+
 # Add a demo user if it doesn't exist
 cursor.execute("SELECT id FROM users WHERE username = 'demo'")
 if not cursor.fetchone():
@@ -55,6 +63,26 @@ if not cursor.fetchone():
                   (user_id, 120))
     print("Demo rewards added")
 
+# Earlier versions seeded admin/admin; never leave that well-known account an administrator
+cursor.execute("UPDATE users SET status = 'active' WHERE username = 'admin' AND password = 'admin' AND status = 'admin'")
+if cursor.rowcount:
+    print("Default admin/admin account demoted")
+
+# Create or promote an administrator (can view the Admin performance pages) only from
+# credentials supplied by whoever deploys the app
+admin_username = os.environ.get("SWACHIT_ADMIN_USERNAME")
+admin_password = os.environ.get("SWACHIT_ADMIN_PASSWORD")
+if admin_username and admin_password:
+    cursor.execute("SELECT id FROM users WHERE username = ?", (admin_username,))
+    admin = cursor.fetchone()
+    if admin:
+        cursor.execute("UPDATE users SET password = ?, status = 'admin' WHERE id = ?", (admin_password, admin[0]))
+        print(f"User {admin_username} promoted to admin")
+    else:
+        cursor.execute("INSERT INTO users (username, password, status) VALUES (?, ?, ?)",
+                      (admin_username, admin_password, "admin"))
+        print(f"Admin user {admin_username} added")
+
 # Add mock waste metrics data for the past 7 days
 cursor.execute("DELETE FROM waste_metrics")  # Clear existing data
 today = datetime.datetime.now()
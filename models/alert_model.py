@@ -0,0 +1,71 @@
+from models.db import get_connection
+from utils.instrumentation import timed_methods
+
+STATE_COLUMNS = ["ward", "metric", "weekday", "last_date", "n", "mean", "variance"]
+ALERT_COLUMNS = ["ward", "metric", "date", "value", "expected", "z_score", "created_at"]
+
+
+@timed_methods
+class Alert:
+    @staticmethod
+    def get_states():
+        """All detector states keyed by (ward, metric, weekday)"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(STATE_COLUMNS)} FROM anomaly_state")
+            states = {(row[0], row[1], row[2]): dict(zip(STATE_COLUMNS, row)) for row in cursor.fetchall()}
+            conn.close()
+            return states
+        except Exception as e:
+            print(f"Error getting anomaly state: {e}")
+            return {}
+
+    @staticmethod
+    def save(states, alerts):
+        """Persist updated detector states and new alerts in one transaction"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                f"""
+                INSERT OR REPLACE INTO anomaly_state ({', '.join(STATE_COLUMNS)})
+                VALUES ({', '.join('?' for _ in STATE_COLUMNS)})
+                """,
+                [tuple(state[column] for column in STATE_COLUMNS) for state in states]
+            )
+            cursor.executemany(
+                f"""
+                INSERT INTO alerts ({', '.join(ALERT_COLUMNS)})
+                VALUES ({', '.join('?' for _ in ALERT_COLUMNS)})
+                """,
+                [tuple(alert[column] for column in ALERT_COLUMNS) for alert in alerts]
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error saving anomaly alerts: {e}")
+            return False
+
+    @staticmethod
+    def get_recent(ward, since, limit=10):
+        """Most recent alerts for a ward since a date"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT {', '.join(ALERT_COLUMNS)} FROM alerts
+                WHERE ward = ? AND date >= ?
+                ORDER BY date DESC, ABS(z_score) DESC
+                LIMIT ?
+                """,
+                (ward, since, limit)
+            )
+            alerts = [dict(zip(ALERT_COLUMNS, row)) for row in cursor.fetchall()]
+            conn.close()
+            return alerts
+        except Exception as e:
+            print(f"Error getting alerts: {e}")
+            return []
@@ -0,0 +1,66 @@
+from models.db import get_connection
+from utils.instrumentation import timed_methods
+
+BIN_COLUMNS = ["id", "ward", "location", "latitude", "longitude", "capacity_litres", "status"]
+
+
+@timed_methods
+class Bin:
+    @staticmethod
+    def insert_many(bins):
+        """Insert community bins in a single transaction"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO bins (ward, location, latitude, longitude, capacity_litres, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(
+                    b["ward"], b.get("location"), b["latitude"], b["longitude"],
+                    b.get("capacity_litres", 240), b.get("status", "Active")
+                ) for b in bins]
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error inserting bins: {e}")
+            return False
+
+    @staticmethod
+    def count():
+        """Count all community bins"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM bins")
+            total = cursor.fetchone()[0]
+            conn.close()
+            return total
+        except Exception as e:
+            print(f"Error counting bins: {e}")
+            return 0
+
+    @staticmethod
+    def get_in_bbox(min_lat, min_lon, max_lat, max_lon, limit=1000):
+        """Get bins inside a bounding box using the bin_rtree index"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT {', '.join('b.' + column for column in BIN_COLUMNS)}
+                FROM bin_rtree r JOIN bins b ON b.id = r.id
+                WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+                LIMIT ?
+                """,
+                (min_lat, max_lat, min_lon, max_lon, limit)
+            )
+            rows = [dict(zip(BIN_COLUMNS, row)) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Error getting bins in area: {e}")
+            return []
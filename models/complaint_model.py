@@ -0,0 +1,438 @@
+from models.db import get_connection
+from utils.instrumentation import timed_methods
+
+# Open complaints, written exactly as in the idx_complaints_open_due partial index
+OPEN_STATUS_SQL = "status IN ('Pending', 'In Progress')"
+
+# Priority escalates as the SLA deadline (due_at) of an open complaint approaches; resolved and
+# closed complaints are Low whatever their deadline. It is derived when a complaint is read,
+# so nothing has to rescan open complaints to escalate them.
+PRIORITY_WINDOWS_SQL = {
+    "High": f"{OPEN_STATUS_SQL} AND due_at < datetime('now', 'localtime', '+24 hours')",
+    "Medium": f"{OPEN_STATUS_SQL} AND due_at >= datetime('now', 'localtime', '+24 hours') "
+              "AND due_at < datetime('now', 'localtime', '+72 hours')",
+    "Low": f"NOT ({OPEN_STATUS_SQL}) OR due_at IS NULL OR due_at >= datetime('now', 'localtime', '+72 hours')"
+}
+
+PRIORITY_SQL = f"""
+    CASE WHEN NOT ({OPEN_STATUS_SQL}) THEN 'Low'
+         WHEN due_at < datetime('now', 'localtime', '+24 hours') THEN 'High'
+         WHEN due_at < datetime('now', 'localtime', '+72 hours') THEN 'Medium'
+         ELSE 'Low' END
+"""
+
+# Columns returned for complaint listings (age, priority and SLA time left are computed at query time)
+COMPLAINT_COLUMNS = f"""
+    id, ward, type, location, status, {PRIORITY_SQL} AS priority, votes, date_reported,
+    CAST(julianday('now', 'localtime', 'start of day') - julianday(date_reported) AS INTEGER) AS age_days,
+    due_at,
+    ROUND((julianday(due_at) - julianday('now', 'localtime')) * 24, 1) AS hours_remaining,
+    photo_hash
+"""
+
+@timed_methods
+class Complaint:
+    @staticmethod
+    def _build_filters(ward, statuses=None, priorities=None, types=None):
+        """Build the WHERE clause and parameters for a filtered complaint query"""
+        clauses = ["ward = ?"]
+        params = [ward]
+        for column, values in (("status", statuses), ("type", types)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+        # Priority filters become due_at ranges over open complaints, which idx_complaints_open_due serves
+        if priorities:
+            windows = [PRIORITY_WINDOWS_SQL[p] for p in priorities if p in PRIORITY_WINDOWS_SQL]
+            clauses.append("(" + " OR ".join(f"({w})" for w in windows) + ")" if windows else "0")
+        return " AND ".join(clauses), params
+
+    @staticmethod
+    def _row_to_dict(row):
+        return {
+            "id": row[0],
+            "ward": row[1],
+            "type": row[2],
+            "location": row[3],
+            "status": row[4],
+            "priority": row[5],
+            "votes": row[6],
+            "date_reported": row[7],
+            "age_days": row[8],
+            "due_at": row[9],
+            "hours_remaining": row[10],
+            "overdue": row[10] is not None and row[10] < 0,
+            "photo_hash": row[11]
+        }
+
+    @staticmethod
+    def insert_many(complaints):
+        """Insert complaints in a single transaction, ignoring IDs that already exist"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT OR IGNORE INTO complaints
+                    (id, ward, type, location, description, status, priority, votes, date_reported, due_at,
+                     latitude, longitude, cell_key, location_key, photo_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(
+                    c["id"], c["ward"], c["type"], c.get("location"), c.get("description"),
+                    c.get("status", "Pending"), c.get("priority", "Low"), c.get("votes", 0),
+                    c["date_reported"], c["due_at"],
+                    c.get("latitude"), c.get("longitude"), c.get("cell_key"), c.get("location_key"),
+                    c.get("photo_hash")
+                ) for c in complaints]
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error inserting complaints: {e}")
+            return False
+
+    @staticmethod
+    def count(ward, statuses=None, priorities=None, types=None):
+        """Count complaints in a ward matching the given filters"""
+        try:
+            where, params = Complaint._build_filters(ward, statuses, priorities, types)
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM complaints WHERE {where}", params)
+            total = cursor.fetchone()[0]
+            conn.close()
+            return total
+        except Exception as e:
+            print(f"Error counting complaints: {e}")
+            return 0
+
+    @staticmethod
+    def get_page(ward, statuses=None, priorities=None, types=None, limit=20, offset=0):
+        """Get one page of complaints in a ward, newest first"""
+        try:
+            where, params = Complaint._build_filters(ward, statuses, priorities, types)
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT {COMPLAINT_COLUMNS} FROM complaints
+                WHERE {where}
+                ORDER BY date_reported DESC, id
+                LIMIT ? OFFSET ?
+                """,
+                params + [limit, offset]
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return [Complaint._row_to_dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting complaints: {e}")
+            return []
+
+    @staticmethod
+    def get_most_urgent(ward, limit=10):
+        """Get the open complaints in a ward with the nearest SLA deadlines"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT {COMPLAINT_COLUMNS} FROM complaints
+                WHERE ward = ? AND {OPEN_STATUS_SQL}
+                ORDER BY due_at
+                LIMIT ?
+                """,
+                (ward, limit)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return [Complaint._row_to_dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting urgent complaints: {e}")
+            return []
+
+    @staticmethod
+    def find_duplicate_candidates(complaint_type, since, cell_keys=None, ward=None, location_key=None):
+        """
+        Get open complaints of the same type reported since a date, either in the given
+        grid cells or (for reports without coordinates) at the same normalized address
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            if cell_keys:
+                cursor.execute(
+                    f"""
+                    SELECT id, latitude, longitude, votes FROM complaints
+                    WHERE cell_key IN ({', '.join('?' for _ in cell_keys)})
+                      AND type = ? AND date_reported >= ? AND {OPEN_STATUS_SQL}
+                    """,
+                    list(cell_keys) + [complaint_type, since]
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT id, latitude, longitude, votes FROM complaints
+                    WHERE ward = ? AND location_key = ?
+                      AND type = ? AND date_reported >= ? AND {OPEN_STATUS_SQL}
+                    """,
+                    (ward, location_key, complaint_type, since)
+                )
+            rows = cursor.fetchall()
+            conn.close()
+            return [{"id": row[0], "latitude": row[1], "longitude": row[2], "votes": row[3]} for row in rows]
+        except Exception as e:
+            print(f"Error finding duplicate complaints: {e}")
+            return []
+
+    @staticmethod
+    def get_open_points(ward):
+        """Get the geotagged open complaints in a ward"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT id, type, location, latitude, longitude FROM complaints
+                WHERE ward = ? AND {OPEN_STATUS_SQL}
+                  AND latitude IS NOT NULL AND longitude IS NOT NULL
+                """,
+                (ward,)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return [
+                {"id": row[0], "type": row[1], "location": row[2], "latitude": row[3], "longitude": row[4]}
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error getting complaint locations: {e}")
+            return []
+
+    @staticmethod
+    def get_points_by_type(ward, types):
+        """Get the coordinates and votes of every geotagged complaint of the given types in a ward"""
+        if not types:
+            return []
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT latitude, longitude, votes FROM complaints
+                WHERE ward = ? AND type IN ({', '.join('?' for _ in types)})
+                  AND latitude IS NOT NULL AND longitude IS NOT NULL
+                """,
+                [ward] + list(types)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Error getting complaint points: {e}")
+            return []
+
+    @staticmethod
+    def count_open_geotagged():
+        """Count open complaints that have coordinates"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT COUNT(*) FROM complaints WHERE {OPEN_STATUS_SQL} AND latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+            total = cursor.fetchone()[0]
+            conn.close()
+            return total
+        except Exception as e:
+            print(f"Error counting geotagged complaints: {e}")
+            return 0
+
+    @staticmethod
+    def get_in_bbox(min_lat, min_lon, max_lat, max_lon, limit=1000):
+        """Get open complaints inside a bounding box using the complaint_rtree index"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT c.id, c.ward, c.type, c.status, c.latitude, c.longitude
+                FROM complaint_rtree r JOIN complaints c ON c.rtree_id = r.id
+                WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+                  AND c.{OPEN_STATUS_SQL}
+                LIMIT ?
+                """,
+                (min_lat, max_lat, min_lon, max_lon, limit)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return [
+                {"id": row[0], "ward": row[1], "type": row[2], "status": row[3],
+                 "latitude": row[4], "longitude": row[5]}
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error getting complaints in area: {e}")
+            return []
+
+    @staticmethod
+    def attach_photo(complaint_id, photo_hash):
+        """Attach a photo to a complaint that does not have one yet"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE complaints SET photo_hash = ? WHERE id = ? AND photo_hash IS NULL",
+                (photo_hash, complaint_id)
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error attaching photo: {e}")
+            return False
+
+    @staticmethod
+    def add_votes(complaint_id, count=1):
+        """Add votes to a complaint"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE complaints SET votes = votes + ? WHERE id = ?", (count, complaint_id))
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error adding votes: {e}")
+            return False
+
+    @staticmethod
+    def get_voted_ids(user_id, complaint_ids):
+        """Get which of the given complaints a user has already voted for"""
+        if not complaint_ids:
+            return set()
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT complaint_id FROM complaint_votes
+                WHERE user_id = ? AND complaint_id IN ({', '.join('?' for _ in complaint_ids)})
+                """,
+                [user_id] + list(complaint_ids)
+            )
+            voted = {row[0] for row in cursor.fetchall()}
+            conn.close()
+            return voted
+        except Exception as e:
+            print(f"Error getting user votes: {e}")
+            return set()
+
+    @staticmethod
+    def apply_votes(votes_by_complaint, created_at, on_commit=None):
+        """
+        Record a batch of votes in one transaction
+        votes_by_complaint maps complaint ID -> set of user IDs. Votes already in
+        complaint_votes are ignored, and each complaint's counter is bumped only by
+        the number of new rows. on_commit, if given, is called as soon as the
+        transaction has committed.
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for complaint_id, user_ids in votes_by_complaint.items():
+                before = conn.total_changes
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO complaint_votes (complaint_id, user_id, created_at) VALUES (?, ?, ?)",
+                    [(complaint_id, user_id, created_at) for user_id in user_ids]
+                )
+                added = conn.total_changes - before
+                if added:
+                    cursor.execute("UPDATE complaints SET votes = votes + ? WHERE id = ?", (added, complaint_id))
+            conn.commit()
+            if on_commit is not None:
+                on_commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error applying votes: {e}")
+            return False
+
+    @staticmethod
+    def get_types(ward):
+        """Get the distinct complaint types reported in a ward"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT type FROM complaints WHERE ward = ? ORDER BY type", (ward,))
+            types = [row[0] for row in cursor.fetchall()]
+            conn.close()
+            return types
+        except Exception as e:
+            print(f"Error getting complaint types: {e}")
+            return []
+
+    @staticmethod
+    def get_summary(ward):
+        """Get complaint counts for a ward aggregated by status and priority"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT COUNT(*),
+                       SUM(status = 'Pending'),
+                       SUM(status = 'In Progress'),
+                       SUM(status = 'Resolved'),
+                       SUM({PRIORITY_WINDOWS_SQL['High']})
+                FROM complaints WHERE ward = ?
+                """,
+                (ward,)
+            )
+            row = cursor.fetchone()
+            conn.close()
+            return {
+                "total": row[0] or 0,
+                "pending": row[1] or 0,
+                "in_progress": row[2] or 0,
+                "resolved": row[3] or 0,
+                "high_priority": row[4] or 0
+            }
+        except Exception as e:
+            print(f"Error getting complaint summary: {e}")
+            return {"total": 0, "pending": 0, "in_progress": 0, "resolved": 0, "high_priority": 0}
+
+    @staticmethod
+    def get_density(resolution, ward=None):
+        """
+        Get pre-aggregated complaint counts per grid cell at a resolution level,
+        for one ward or (ward=None) the whole city
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            if ward is None:
+                cursor.execute(
+                    """
+                    SELECT cell_row, cell_col, SUM(count) FROM complaint_density
+                    WHERE resolution = ? AND count > 0
+                    GROUP BY cell_row, cell_col
+                    """,
+                    (resolution,)
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT cell_row, cell_col, count FROM complaint_density
+                    WHERE resolution = ? AND ward = ? AND count > 0
+                    """,
+                    (resolution, ward)
+                )
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Error getting complaint density: {e}")
+            return []
@@ -0,0 +1,22 @@
+from models.db import get_connection
+from utils.instrumentation import timed_methods
+
+
+@timed_methods
+class DataVersion:
+    @staticmethod
+    def get(name):
+        """
+        Change counter of a table ("complaints" or "bins"), bumped by triggers on every insert,
+        delete and relevant update; None if it could not be read
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM data_versions WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            conn.close()
+            return row[0] if row else 0
+        except Exception as e:
+            print(f"Error getting data version of {name}: {e}")
+            return None
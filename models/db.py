@@ -0,0 +1,345 @@
+import sqlite3
+import os
+import threading
+
+from models.query_trace import TracingConnection
+
+# Path to the SQLite database (can be overridden, e.g. to point at a test database)
+DB_PATH = os.environ.get(
+    "SWACHIT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "database.db")
+)
+
+# Tables and indexes created on demand by the models
+SCHEMA = [
+    # Accounts and reward points, as first created by data/init_db.py
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE,
+        password TEXT,
+        status TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rewards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        points INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_rewards_user ON rewards (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS complaints (
+        id TEXT PRIMARY KEY,
+        ward TEXT NOT NULL,
+        type TEXT NOT NULL,
+        location TEXT,
+        description TEXT,
+        status TEXT NOT NULL DEFAULT 'Pending',
+        priority TEXT NOT NULL DEFAULT 'Low',
+        votes INTEGER NOT NULL DEFAULT 0,
+        date_reported TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_complaints_ward_status ON complaints (ward, status, date_reported)",
+    # Displayed priority is derived from due_at, so the old priority index is no longer used
+    "DROP INDEX IF EXISTS idx_complaints_ward_priority",
+    # One row per (complaint, user) vote; the primary key deduplicates repeat votes
+    """
+    CREATE TABLE IF NOT EXISTS complaint_votes (
+        complaint_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (complaint_id, user_id)
+    ) WITHOUT ROWID
+    """,
+    # Daily per-ward rollup of waste metrics; city-wide KPIs aggregate over it
+    """
+    CREATE TABLE IF NOT EXISTS ward_daily_stats (
+        date TEXT NOT NULL,
+        ward TEXT NOT NULL,
+        waste_generated REAL NOT NULL,
+        segregation_rate REAL NOT NULL,
+        collection_efficiency REAL NOT NULL,
+        processing_rate REAL NOT NULL,
+        recycling_rate REAL NOT NULL,
+        PRIMARY KEY (date, ward)
+    ) WITHOUT ROWID
+    """,
+    # Running EWMA mean/variance per ward, metric and weekday for streaming anomaly detection
+    """
+    CREATE TABLE IF NOT EXISTS anomaly_state (
+        ward TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        weekday INTEGER NOT NULL,
+        last_date TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        mean REAL NOT NULL,
+        variance REAL NOT NULL,
+        PRIMARY KEY (ward, metric, weekday)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ward TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        date TEXT NOT NULL,
+        value REAL NOT NULL,
+        expected REAL NOT NULL,
+        z_score REAL NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_alerts_ward_date ON alerts (ward, date)",
+    """
+    CREATE TABLE IF NOT EXISTS bins (
+        id INTEGER PRIMARY KEY,
+        ward TEXT NOT NULL,
+        location TEXT,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        capacity_litres INTEGER NOT NULL DEFAULT 240,
+        status TEXT NOT NULL DEFAULT 'Active'
+    )
+    """,
+    # R*Tree over bin coordinates for map viewport (bounding-box) queries, kept in sync by triggers
+    "CREATE VIRTUAL TABLE IF NOT EXISTS bin_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    """
+    CREATE TRIGGER IF NOT EXISTS bins_rtree_insert AFTER INSERT ON bins BEGIN
+        INSERT OR REPLACE INTO bin_rtree VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bins_rtree_update AFTER UPDATE OF latitude, longitude ON bins BEGIN
+        INSERT OR REPLACE INTO bin_rtree VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS bins_rtree_delete AFTER DELETE ON bins BEGIN
+        DELETE FROM bin_rtree WHERE id = OLD.id;
+    END
+    """,
+]
+
+# Columns added after a table was first created: (table, column, definition, backfill SQL)
+MIGRATIONS = [
+    (
+        "complaints", "due_at", "TEXT",
+        "UPDATE complaints SET due_at = datetime(date_reported, '+72 hours') WHERE due_at IS NULL"
+    ),
+    ("complaints", "latitude", "REAL", None),
+    ("complaints", "longitude", "REAL", None),
+    # Spatial grid bucket (see utils.geo.cell_key) and normalized address used for duplicate detection
+    ("complaints", "cell_key", "TEXT", None),
+    ("complaints", "location_key", "TEXT", None),
+    # SHA-256 of the attached photo (see controllers.photo_controller)
+    ("complaints", "photo_hash", "TEXT", None),
+    # Stable key of the complaint in complaint_rtree; numbered by POST_MIGRATION_SCHEMA and an insert trigger
+    ("complaints", "rtree_id", "INTEGER", None),
+]
+
+# Grid cell sizes (degrees, ~110 m, ~550 m and ~2.2 km) at which complaint counts are pre-aggregated;
+# the position in the list is the resolution level stored in complaint_density
+DENSITY_RESOLUTIONS = [0.001, 0.005, 0.02]
+
+
+def _cell_sql(value, cell_deg):
+    """SQL for floor(value / cell_deg) that does not rely on SQLite's optional math functions"""
+    scaled = f"({value} / {cell_deg!r})"
+    return f"(CAST({scaled} AS INTEGER) - ({scaled} < CAST({scaled} AS INTEGER)))"
+
+
+def _density_increment_sql(row):
+    return "\n".join(
+        f"""
+        INSERT INTO complaint_density (resolution, ward, cell_row, cell_col, count)
+        SELECT {level}, {row}.ward, {_cell_sql(row + '.latitude', deg)}, {_cell_sql(row + '.longitude', deg)}, 1
+        WHERE {row}.latitude IS NOT NULL AND {row}.longitude IS NOT NULL
+        ON CONFLICT (resolution, ward, cell_row, cell_col) DO UPDATE SET count = count + 1;
+        """
+        for level, deg in enumerate(DENSITY_RESOLUTIONS)
+    )
+
+
+def _density_decrement_sql(row):
+    return "\n".join(
+        f"""
+        UPDATE complaint_density SET count = count - 1
+        WHERE resolution = {level} AND ward = {row}.ward
+          AND cell_row = {_cell_sql(row + '.latitude', deg)} AND cell_col = {_cell_sql(row + '.longitude', deg)};
+        """
+        for level, deg in enumerate(DENSITY_RESOLUTIONS)
+    )
+
+
+def _version_bump_sql(name):
+    return f"""
+        INSERT INTO data_versions (name, version) VALUES ('{name}', 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1;
+    """
+
+
+# Indexes on migrated columns, created once the columns exist
+POST_MIGRATION_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_complaints_ward_due ON complaints (ward, due_at)",
+    # Partial index over open complaints: the officer queue is a seek plus a short ordered scan
+    """
+    CREATE INDEX IF NOT EXISTS idx_complaints_open_due ON complaints (ward, due_at)
+    WHERE status IN ('Pending', 'In Progress')
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_complaints_cell_type ON complaints (cell_key, type, date_reported)",
+    "CREATE INDEX IF NOT EXISTS idx_complaints_location_type ON complaints (ward, location_key, type, date_reported)",
+    # R*Tree over geotagged complaints, keyed by complaints.rtree_id and kept in sync by triggers.
+    # complaints has a TEXT primary key, so its implicit rowid is not stable (VACUUM may renumber it)
+    "CREATE VIRTUAL TABLE IF NOT EXISTS complaint_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    # Earlier triggers keyed the R*Tree by rowid; rtree_id is backfilled from rowid, so existing entries stay valid
+    "DROP TRIGGER IF EXISTS complaints_rtree_insert",
+    "DROP TRIGGER IF EXISTS complaints_rtree_update",
+    "DROP TRIGGER IF EXISTS complaints_rtree_delete",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_complaints_rtree_id ON complaints (rtree_id)",
+    # Number complaints inserted before rtree_id existed (or bulk loaded without it) after any already numbered
+    """
+    UPDATE complaints SET rtree_id = rowid + (SELECT COALESCE(MAX(rtree_id), 0) FROM complaints)
+    WHERE rtree_id IS NULL
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_rtree_id_insert AFTER INSERT ON complaints BEGIN
+        UPDATE complaints SET rtree_id = (SELECT COALESCE(MAX(rtree_id), 0) + 1 FROM complaints)
+        WHERE rowid = NEW.rowid AND rtree_id IS NULL;
+        INSERT OR REPLACE INTO complaint_rtree
+        SELECT rtree_id, latitude, latitude, longitude, longitude FROM complaints
+        WHERE rowid = NEW.rowid AND latitude IS NOT NULL AND longitude IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_rtree_id_update AFTER UPDATE OF latitude, longitude ON complaints BEGIN
+        DELETE FROM complaint_rtree WHERE id = OLD.rtree_id;
+        INSERT INTO complaint_rtree
+        SELECT NEW.rtree_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+        WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS complaints_rtree_id_delete AFTER DELETE ON complaints BEGIN
+        DELETE FROM complaint_rtree WHERE id = OLD.rtree_id;
+    END
+    """,
+    # Index complaints geotagged before the R*Tree existed
+    """
+    INSERT INTO complaint_rtree
+    SELECT rtree_id, latitude, latitude, longitude, longitude FROM complaints
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+      AND rtree_id NOT IN (SELECT id FROM complaint_rtree)
+    """,
+    # Complaint counts per ward and grid cell at each DENSITY_RESOLUTIONS level, maintained by triggers
+    """
+    CREATE TABLE IF NOT EXISTS complaint_density (
+        resolution INTEGER NOT NULL,
+        ward TEXT NOT NULL,
+        cell_row INTEGER NOT NULL,
+        cell_col INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (resolution, ward, cell_row, cell_col)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaints_density_insert AFTER INSERT ON complaints BEGIN
+        {_density_increment_sql("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaints_density_update AFTER UPDATE OF ward, latitude, longitude ON complaints BEGIN
+        {_density_decrement_sql("OLD")}
+        {_density_increment_sql("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS complaints_density_delete AFTER DELETE ON complaints BEGIN
+        {_density_decrement_sql("OLD")}
+    END
+    """,
+    # Change counter per table, bumped by triggers, so caches of derived data (map clusters, route
+    # plans) can tell when their source rows changed even if the row count did not
+    """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_version_{event.split()[0].lower()} AFTER {event} ON {table} BEGIN
+        {_version_bump_sql(table)}
+    END
+    """
+    for table, events in (
+        ("complaints", ["INSERT", "DELETE", "UPDATE OF ward, status, latitude, longitude"]),
+        ("bins", ["INSERT", "DELETE", "UPDATE OF ward, latitude, longitude, capacity_litres, status"]),
+    )
+    for event in events
+] + [
+    # Aggregate complaints geotagged before the density table existed
+    f"""
+    INSERT INTO complaint_density (resolution, ward, cell_row, cell_col, count)
+    SELECT {level}, ward, {_cell_sql('latitude', deg)} AS cell_row, {_cell_sql('longitude', deg)} AS cell_col, COUNT(*)
+    FROM complaints
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM complaint_density WHERE resolution = {level})
+    GROUP BY ward, cell_row, cell_col
+    """
+    for level, deg in enumerate(DENSITY_RESOLUTIONS)
+]
+
+# Databases whose schema has already been checked in this process
+_schema_ready = set()
+# Sessions connecting at the same time must not run the migrations twice
+_schema_lock = threading.Lock()
+
+
+def ensure_schema(conn):
+    """Create any missing tables and indexes"""
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    for table, column, definition, backfill in MIGRATIONS:
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            if backfill:
+                cursor.execute(backfill)
+    for statement in POST_MIGRATION_SCHEMA:
+        cursor.execute(statement)
+    conn.commit()
+
+
+def create_tables(conn):
+    """
+    Create every table, with its migrated columns, but none of the indexes, triggers or backfills
+    Used for bulk loading: insert the rows first, then ensure_schema() builds the rest in one pass.
+    """
+    cursor = conn.cursor()
+    for statement in SCHEMA + POST_MIGRATION_SCHEMA:
+        if statement.lstrip().startswith("CREATE TABLE"):
+            cursor.execute(statement)
+    for table, column, definition, _ in MIGRATIONS:
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    conn.commit()
+
+
+def get_connection():
+    """
+    Open a connection to the app database, creating the schema on first use
+    Statements run through its cursors are traced (see models/query_trace.py).
+    """
+    conn = sqlite3.connect(DB_PATH, factory=TracingConnection)
+    if DB_PATH not in _schema_ready:
+        with _schema_lock:
+            if DB_PATH not in _schema_ready:
+                ensure_schema(conn)
+                _schema_ready.add(DB_PATH)
+    return conn
@@ -0,0 +1,225 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from utils.instrumentation import count
+
+# Queries slower than this (execute plus fetch) are written to the slow-query log
+SLOW_QUERY_MS = float(os.environ.get("SWACHIT_SLOW_QUERY_MS", "50"))
+SLOW_QUERY_LOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "logs", "slow_queries.log"
+)
+SLOW_QUERY_LOG_BYTES = 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+
+# Calling sites kept per query
+MAX_SITES_PER_QUERY = 5
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_queries = {}
+_slow_logger = None
+
+# Frames from these files are skipped when looking for the code that issued a query
+_INTERNAL_FILES = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), "db.py")}
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals so that queries differing only in values group together"""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\s+", " ", sql).strip()
+    # IN lists of any length become one shape
+    return re.sub(r"IN \(\?(?:, \?)*\)", "IN (...)", sql)
+
+
+def _calling_site():
+    """file:line function of the first frame outside the database layer"""
+    frame = sys._getframe(2)
+    while frame is not None and os.path.abspath(frame.f_code.co_filename) in _INTERNAL_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+
+
+def _get_slow_logger():
+    global _slow_logger
+    if _slow_logger is None:
+        os.makedirs(os.path.dirname(SLOW_QUERY_LOG_PATH), exist_ok=True)
+        handler = RotatingFileHandler(
+            SLOW_QUERY_LOG_PATH, maxBytes=SLOW_QUERY_LOG_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_logger = logging.getLogger(f"{__name__}.slow")
+        slow_logger.addHandler(handler)
+        slow_logger.setLevel(logging.INFO)
+        slow_logger.propagate = False
+        _slow_logger = slow_logger
+    return _slow_logger
+
+
+def record_query(sql, params, site, seconds, rows, error=None):
+    """Add one executed query to the per-statement statistics"""
+    normalized = normalize_sql(sql)
+    ms = seconds * 1000
+    with _lock:
+        stats = _queries.get(normalized)
+        if stats is None:
+            stats = _queries[normalized] = {
+                "sql": normalized, "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "rows": 0, "sites": [], "last_sql": sql, "last_params": None
+            }
+        stats["calls"] += 1
+        stats["errors"] += error is not None
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["rows"] += rows
+        stats["last_sql"] = sql
+        stats["last_params"] = params
+        if site not in stats["sites"] and len(stats["sites"]) < MAX_SITES_PER_QUERY:
+            stats["sites"].append(site)
+
+    if error is not None:
+        logger.error("Query failed at %s: %s [%s]", site, error, normalized)
+    elif ms >= SLOW_QUERY_MS:
+        _get_slow_logger().info("%.1f ms rows=%d site=%s sql=%s", ms, rows, site, normalized)
+
+
+class TracingCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement, including fetching its rows, and records it
+    with its calling site; a statement is recorded when the next one starts or the
+    cursor or its connection is closed
+    """
+
+    def execute(self, sql, parameters=()):
+        self._finish_trace()
+        return self._traced(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish_trace()
+        return self._traced(super().executemany, sql, seq_of_parameters, None)
+
+    def _traced(self, method, sql, arguments, params):
+        site = _calling_site()
+        start = time.perf_counter()
+        try:
+            result = method(sql, arguments)
+        except Exception as e:
+            record_query(sql, params, site, time.perf_counter() - start, 0, error=e)
+            raise
+        self._trace = [sql, params, site, time.perf_counter() - start, None]
+        return result
+
+    def _fetched(self, start, rows):
+        trace = getattr(self, "_trace", None)
+        if trace is not None:
+            trace[3] += time.perf_counter() - start
+            trace[4] = (trace[4] or 0) + rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def _finish_trace(self):
+        trace = getattr(self, "_trace", None)
+        if trace is None:
+            return
+        self._trace = None
+        sql, params, site, seconds, rows = trace
+        # Statements that return no rows report the rows they changed
+        record_query(sql, params, site, seconds, rows if rows is not None else max(self.rowcount, 0))
+
+    def close(self):
+        self._finish_trace()
+        super().close()
+
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors are TracingCursors, counted as it is opened and closed"""
+
+    def __init__(self, *args, **kwargs):
+        # Not counted as open (nor later as closed) if connecting fails
+        self._closed = True
+        super().__init__(*args, **kwargs)
+        self._closed = False
+        count("db_connections_opened")
+
+    def cursor(self, factory=TracingCursor):
+        cursor = super().cursor(factory)
+        if not hasattr(self, "_cursors"):
+            self._cursors = []
+        self._cursors.append(cursor)
+        return cursor
+
+    # sqlite3's shortcuts open a plain cursor, so route them through cursor() to be traced too
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        for cursor in getattr(self, "_cursors", []):
+            if isinstance(cursor, TracingCursor):
+                cursor._finish_trace()
+        self._cursors = []
+        super().close()
+        if not self._closed:
+            self._closed = True
+            count("db_connections_closed")
+
+    def __del__(self):
+        # Connections dropped without close() (e.g. on an error path) are closed by sqlite3 when freed;
+        # count them here so the open-connections gauge comes back down
+        if not getattr(self, "_closed", True):
+            self._closed = True
+            count("db_connections_closed")
+
+
+def get_query_stats():
+    """Per-statement statistics, most total time first"""
+    with _lock:
+        stats = [dict(s, sites=list(s["sites"])) for s in _queries.values()]
+    return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+def reset_query_stats():
+    with _lock:
+        _queries.clear()
+
+
+def is_explainable(sql):
+    return sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def explain_query(conn, sql, params=None):
+    """EXPLAIN QUERY PLAN rows (id, parent, detail) for a recorded SELECT, using its last parameters"""
+    if not is_explainable(sql):
+        return []
+    # A plain cursor, so explaining a query does not show up in the statistics
+    cursor = sqlite3.Cursor(conn)
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+    return [(row[0], row[1], row[3]) for row in cursor.fetchall()]
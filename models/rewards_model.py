@@ -1,12 +1,12 @@
-import sqlite3
-import os
+from models.db import get_connection
+from utils.instrumentation import timed_methods
 
+@timed_methods
 class Rewards:
     @staticmethod
     def get_rewards(user_id):
         try:
-            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "database.db")
-            conn = sqlite3.connect(db_path)
+            conn = get_connection()
             cursor = conn.cursor()
             cursor.execute("SELECT points FROM rewards WHERE user_id = ?", (user_id,))
             result = cursor.fetchone()
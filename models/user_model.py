@@ -1,12 +1,12 @@
-import sqlite3
-import os
+from models.db import get_connection
+from utils.instrumentation import timed_methods
 
+@timed_methods
 class User:
     @staticmethod
     def get_user(username):
         try:
-            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "database.db")
-            conn = sqlite3.connect(db_path)
+            conn = get_connection()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
             user = cursor.fetchone()
@@ -26,8 +26,7 @@ class User:
     @staticmethod
     def update_status(user_id, status):
         try:
-            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "database.db")
-            conn = sqlite3.connect(db_path)
+            conn = get_connection()
             cursor = conn.cursor()
             cursor.execute("UPDATE users SET status = ? WHERE id = ?", (status, user_id))
             conn.commit()
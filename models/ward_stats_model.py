@@ -0,0 +1,175 @@
+from models.db import get_connection
+from utils.instrumentation import timed_methods
+
+ROLLUP_COLUMNS = [
+    "date", "ward", "waste_generated", "segregation_rate",
+    "collection_efficiency", "processing_rate", "recycling_rate"
+]
+
+
+@timed_methods
+class WardStats:
+    @staticmethod
+    def upsert_many(rows):
+        """Insert or replace daily ward rollup rows in a single transaction"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                f"""
+                INSERT OR REPLACE INTO ward_daily_stats ({', '.join(ROLLUP_COLUMNS)})
+                VALUES ({', '.join('?' for _ in ROLLUP_COLUMNS)})
+                """,
+                [tuple(row[column] for column in ROLLUP_COLUMNS) for row in rows]
+            )
+            conn.commit()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error saving ward rollups: {e}")
+            return False
+
+    @staticmethod
+    def get_date_range():
+        """(earliest, latest) dates with rollup rows, or (None, None)"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(date), MAX(date) FROM ward_daily_stats")
+            date_range = cursor.fetchone()
+            conn.close()
+            return date_range
+        except Exception as e:
+            print(f"Error getting rollup date range: {e}")
+            return None, None
+
+    @staticmethod
+    def get_rows_since(since):
+        """All rollup rows after a date, oldest first"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM ward_daily_stats WHERE date > ? ORDER BY date, ward",
+                (since,)
+            )
+            rows = [dict(zip(ROLLUP_COLUMNS, row)) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Error getting ward rollups: {e}")
+            return []
+
+    @staticmethod
+    def get_ward_averages(wards, since):
+        """Average segregation rate and collection efficiency per ward after a date"""
+        if not wards:
+            return {}
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT ward, AVG(segregation_rate), AVG(collection_efficiency)
+                FROM ward_daily_stats
+                WHERE date > ? AND ward IN ({', '.join('?' for _ in wards)})
+                GROUP BY ward
+                """,
+                [since] + list(wards)
+            )
+            averages = {
+                row[0]: {"segregation_rate": row[1], "collection_efficiency": row[2]}
+                for row in cursor.fetchall()
+            }
+            conn.close()
+            return averages
+        except Exception as e:
+            print(f"Error getting ward averages: {e}")
+            return {}
+
+    @staticmethod
+    def get_daily_series(metric, start, end):
+        """Daily (date, ward, value) rows for one rollup metric between two dates"""
+        if metric not in ROLLUP_COLUMNS[2:]:
+            raise ValueError(f"Unknown rollup metric: {metric}")
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT date, ward, {metric} FROM ward_daily_stats
+                WHERE date >= ? AND date <= ?
+                ORDER BY date, ward
+                """,
+                (start, end)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Error getting daily ward series: {e}")
+            return []
+
+    @staticmethod
+    def get_monthly_totals(start, end):
+        """Tonnes generated per (ward, month) between two dates, with the number of days covered"""
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT ward, substr(date, 1, 7) AS month, SUM(waste_generated), COUNT(*)
+                FROM ward_daily_stats
+                WHERE date >= ? AND date <= ?
+                GROUP BY ward, month
+                ORDER BY ward, month
+                """,
+                (start, end)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            return [{"ward": row[0], "month": row[1], "waste_generated": row[2], "days": row[3]} for row in rows]
+        except Exception as e:
+            print(f"Error getting monthly ward totals: {e}")
+            return []
+
+    @staticmethod
+    def get_period_kpis(previous_start, current_start, end):
+        """
+        City-wide KPIs for the current period [current_start, end] and the previous
+        period [previous_start, current_start) in one pass over the rollups.
+        Rates are weighted by the tonnage each ward generated.
+        """
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            periods = []
+            for condition in ("date >= :current_start", "date < :current_start"):
+                periods.append(f"""
+                    SUM(CASE WHEN {condition} THEN waste_generated END)
+                        / COUNT(DISTINCT CASE WHEN {condition} THEN date END),
+                    SUM(CASE WHEN {condition} THEN waste_generated * segregation_rate END)
+                        / SUM(CASE WHEN {condition} THEN waste_generated END),
+                    SUM(CASE WHEN {condition} THEN waste_generated * processing_rate END)
+                        / SUM(CASE WHEN {condition} THEN waste_generated END),
+                    SUM(CASE WHEN {condition} THEN waste_generated * collection_efficiency * processing_rate / 100 END)
+                        / SUM(CASE WHEN {condition} THEN waste_generated END)
+                """)
+            cursor.execute(
+                f"""
+                SELECT {', '.join(periods)}
+                FROM ward_daily_stats
+                WHERE date >= :previous_start AND date <= :end
+                """,
+                {"previous_start": previous_start, "current_start": current_start, "end": end}
+            )
+            row = cursor.fetchone()
+            conn.close()
+            keys = ["daily_waste", "segregation_rate", "processing_rate", "landfill_diversion"]
+            return {
+                "current": dict(zip(keys, row[:4])),
+                "previous": dict(zip(keys, row[4:]))
+            }
+        except Exception as e:
+            print(f"Error getting city KPIs: {e}")
+            return None
@@ -0,0 +1,38 @@
+import math
+import re
+
+# Side of a grid cell in degrees (~110 m at Bengaluru's latitude)
+DEFAULT_CELL_DEG = 0.001
+
+EARTH_RADIUS_M = 6371000
+
+
+def grid_cell(lat, lon, cell_deg=DEFAULT_CELL_DEG):
+    """Integer (row, col) of the grid cell containing a coordinate"""
+    return int(math.floor(lat / cell_deg)), int(math.floor(lon / cell_deg))
+
+
+def cell_key(lat, lon, cell_deg=DEFAULT_CELL_DEG):
+    """String key of the grid cell containing a coordinate, suitable for an indexed column"""
+    row, col = grid_cell(lat, lon, cell_deg)
+    return f"{row}:{col}"
+
+
+def neighbor_cell_keys(lat, lon, cell_deg=DEFAULT_CELL_DEG):
+    """Keys of the cell containing a coordinate and its eight neighbours"""
+    row, col = grid_cell(lat, lon, cell_deg)
+    return [f"{row + dr}:{col + dc}" for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def normalize_location(text):
+    """Normalize a free-text address so that trivially different spellings match"""
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9 ]", " ", (text or "").lower())).strip()
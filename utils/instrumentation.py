@@ -0,0 +1,153 @@
+import functools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Recent samples kept per timer for percentiles; older samples only count towards the totals
+SAMPLES_PER_TIMER = 2048
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+
+
+class _TimerStats:
+    __slots__ = ("count", "errors", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_TIMER)
+
+
+def record(name, seconds, error=False):
+    """Record one timed call"""
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = _TimerStats()
+        stats.count += 1
+        stats.errors += error
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        stats.samples.append(seconds)
+
+
+class timed:
+    """
+    Time a block or a function and record it under a name
+    Use as a context manager (with timed("dashboard_view.overview"): ...) or as a
+    decorator (@timed() names the timer after the function's module and qualified name).
+    Exceptions are counted as errors; Streamlit's rerun/stop signals are not exceptions
+    in that sense and are recorded as normal calls.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.start,
+               error=exc_type is not None and issubclass(exc_type, Exception))
+        return False
+
+    def __call__(self, func):
+        name = self.name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                record(name, time.perf_counter() - start, error)
+        return wrapper
+
+
+def timed_methods(cls):
+    """Class decorator that times every public static method of a model class"""
+    for attribute, value in list(vars(cls).items()):
+        if isinstance(value, staticmethod) and not attribute.startswith("_"):
+            setattr(cls, attribute, staticmethod(timed(f"{cls.__name__}.{attribute}")(value.__func__)))
+    return cls
+
+
+class Counter:
+    """
+    Monotonic event counter that is incremented without taking a lock
+    Each thread adds to its own tally, so no increment can be lost; reading sums the tallies.
+    Tallies are keyed by thread ident, which is unique among live threads and reused once a
+    thread exits, so a reused tally keeps its count and only ever has one writer.
+    """
+    __slots__ = ("_tallies",)
+
+    def __init__(self):
+        self._tallies = {}
+
+    def inc(self):
+        tally = self._tallies.get(threading.get_ident())
+        if tally is None:
+            tally = self._tallies.setdefault(threading.get_ident(), [0])
+        tally[0] += 1
+
+    @property
+    def value(self):
+        return sum(tally[0] for tally in list(self._tallies.values()))
+
+
+def count(name, **labels):
+    """Count one event, e.g. count("cache_requests", cache="kpis", result="hit")"""
+    key = (name, tuple(sorted(labels.items())))
+    counter = _counters.get(key)
+    if counter is None:
+        with _lock:
+            counter = _counters.setdefault(key, Counter())
+    counter.inc()
+
+
+def get_counters():
+    """(name, labels, value) for every counter, sorted by name and labels"""
+    return [(name, dict(labels), counter.value) for (name, labels), counter in sorted(list(_counters.items()))]
+
+
+def get_timings():
+    """
+    Snapshot of every timer: name, calls, errors, p50/p95/p99/max and total time in milliseconds,
+    slowest total first
+    """
+    with _lock:
+        snapshot = [
+            (name, stats.count, stats.errors, stats.total, stats.max, list(stats.samples))
+            for name, stats in _timers.items()
+        ]
+    timings = []
+    for name, count, errors, total, longest, samples in snapshot:
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        timings.append({
+            "name": name,
+            "calls": count,
+            "errors": errors,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": longest * 1000,
+            "total_ms": total * 1000
+        })
+    return sorted(timings, key=lambda t: t["total_ms"], reverse=True)
+
+
+def reset_timings():
+    with _lock:
+        _timers.clear()
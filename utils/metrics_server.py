@@ -0,0 +1,202 @@
+"""
+Serve the app's performance counters in Prometheus text format
+
+    curl http://127.0.0.1:9464/metrics
+
+app.py starts the server once per process on a daemon thread. It exposes
+request latency per page, the other instrumented timers, cache hit ratios,
+database connection and statement counters, and session counts. Each replica
+needs its own port. Set SWACHIT_METRICS_PORT to choose it, or to 0 to turn
+the endpoint off.
+"""
+import logging
+import math
+import numbers
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.instrumentation import get_counters, get_timings
+from utils.session_memory import get_eviction_counts, get_session_sizes
+from models.query_trace import get_query_stats
+
+METRICS_HOST = os.environ.get("SWACHIT_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("SWACHIT_METRICS_PORT", "9464"))
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Sessions that reran within this many seconds count as active
+ACTIVE_SESSION_SECONDS = 5 * 60
+# Timers named render.<page> time whole page renders, i.e. requests
+REQUEST_TIMER_PREFIX = "render."
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_server = None
+_bind_failed = False
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    """Integers exactly, floats with every significant digit, so large counters are not rounded"""
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class _Exposition:
+    """Builds the text format, one HELP/TYPE header per metric family"""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f"{name}{_labels(labels)} {_format_value(value)}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def _add_timers(out, timings, family, label):
+    out.family(family, "summary", "Seconds spent, quantiles over the recent samples of each timer")
+    for timing in timings:
+        labels = {label: timing["name"]}
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+            out.sample(family, timing[key] / 1000, **labels, quantile=quantile)
+        out.sample(f"{family}_sum", timing["total_ms"] / 1000, **labels)
+        out.sample(f"{family}_count", timing["calls"], **labels)
+    out.family(f"{family}_errors_total", "counter", "Calls that raised an exception")
+    for timing in timings:
+        out.sample(f"{family}_errors_total", timing["errors"], **{label: timing["name"]})
+
+
+def render_metrics():
+    """Current counters in Prometheus text exposition format"""
+    out = _Exposition()
+
+    timings = get_timings()
+    requests = [
+        dict(t, name=t["name"][len(REQUEST_TIMER_PREFIX):]) for t in timings if t["name"].startswith(REQUEST_TIMER_PREFIX)
+    ]
+    _add_timers(out, requests, "swachit_request_seconds", "page")
+    _add_timers(out, [t for t in timings if not t["name"].startswith(REQUEST_TIMER_PREFIX)],
+                "swachit_timer_seconds", "timer")
+
+    counters = {}
+    for name, labels, value in get_counters():
+        counters.setdefault(name, []).append((labels, value))
+
+    cache_requests = counters.get("cache_requests", [])
+    out.family("swachit_cache_requests_total", "counter", "Cache lookups by cache and result (hit or miss)")
+    for labels, value in cache_requests:
+        out.sample("swachit_cache_requests_total", value, **labels)
+    lookups = {}
+    for labels, value in cache_requests:
+        hits_and_total = lookups.setdefault(labels["cache"], [0, 0])
+        hits_and_total[0] += value if labels["result"] == "hit" else 0
+        hits_and_total[1] += value
+    out.family("swachit_cache_hit_ratio", "gauge", "Share of cache lookups served from the cache")
+    for cache, (hits, total) in sorted(lookups.items()):
+        out.sample("swachit_cache_hit_ratio", hits / total, cache=cache)
+    out.family("swachit_session_cache_evictions_total", "counter", "Per-session cached results evicted, by reason")
+    for reason, value in sorted(get_eviction_counts().items()):
+        out.sample("swachit_session_cache_evictions_total", value, reason=reason)
+
+    opened = sum(value for _, value in counters.get("db_connections_opened", []))
+    closed = sum(value for _, value in counters.get("db_connections_closed", []))
+    out.family("swachit_db_connections_opened_total", "counter", "Database connections opened")
+    out.sample("swachit_db_connections_opened_total", opened)
+    out.family("swachit_db_connections_closed_total", "counter", "Database connections closed")
+    out.sample("swachit_db_connections_closed_total", closed)
+    out.family("swachit_db_connections_open", "gauge", "Database connections neither closed nor garbage collected yet")
+    out.sample("swachit_db_connections_open", opened - closed)
+    queries = get_query_stats()
+    out.family("swachit_db_statements_total", "counter", "SQL statements executed")
+    out.sample("swachit_db_statements_total", sum(q["calls"] for q in queries))
+    out.family("swachit_db_statement_errors_total", "counter", "SQL statements that failed")
+    out.sample("swachit_db_statement_errors_total", sum(q["errors"] for q in queries))
+    out.family("swachit_db_statement_seconds_total", "counter", "Seconds spent executing and fetching SQL statements")
+    out.sample("swachit_db_statement_seconds_total", sum(q["total_ms"] for q in queries) / 1000)
+    out.family("swachit_db_distinct_statements", "gauge", "Distinct normalized SQL statements seen")
+    out.sample("swachit_db_distinct_statements", len(queries))
+
+    sessions = get_session_sizes()
+    out.family("swachit_active_sessions", "gauge", f"Sessions that reran in the last {ACTIVE_SESSION_SECONDS} seconds")
+    out.sample("swachit_active_sessions", sum(s["idle_s"] < ACTIVE_SESSION_SECONDS for s in sessions))
+    out.family("swachit_tracked_sessions", "gauge", "Sessions seen recently enough to be tracked")
+    out.sample("swachit_tracked_sessions", len(sessions))
+    out.family("swachit_session_state_bytes", "gauge", "Approximate session state held by tracked sessions")
+    out.sample("swachit_session_state_bytes", sum(s["bytes"] for s in sessions))
+    return out.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404, f"Metrics are served at {METRICS_PATH}")
+            return
+        try:
+            body = render_metrics().encode("utf-8")
+        except Exception as e:
+            logger.exception("Could not render metrics")
+            self.send_error(500, f"Could not render metrics: {e}")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """
+    Start serving metrics on a daemon thread unless already started in this process
+    Safe to call on every rerun. Returns the server, or None if the port is 0 or in use.
+    """
+    global _server, _bind_failed
+    if _server is not None or _bind_failed or not port:
+        return _server
+    with _lock:
+        if _server is None and not _bind_failed:
+            try:
+                server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning("Metrics endpoint not started on %s:%s: %s", host, port, e)
+                # Don't retry the bind on every rerun
+                _bind_failed = True
+                return None
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("Serving metrics at http://%s:%s%s", host, server.server_port, METRICS_PATH)
+            _server = server
+    return _server
+
+
+def stop_metrics_server():
+    global _server
+    with _lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
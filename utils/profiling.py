@@ -0,0 +1,77 @@
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profiles")
+# Older profiles are deleted once there are more than this many
+MAX_PROFILES = 20
+TOP_FUNCTIONS = 30
+
+# cProfile can only have one active profiler per process
+_profile_lock = threading.Lock()
+
+
+class profiled:
+    """
+    Profile a block with cProfile and save the stats to PROFILES_DIR
+    The saved path is available as .path after the block exits. If another
+    session is already being profiled the block runs unprofiled and .path stays None.
+    """
+
+    def __init__(self, name):
+        self.name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        self.path = None
+        self._profiler = None
+
+    def __enter__(self):
+        if _profile_lock.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return False
+        try:
+            self._profiler.disable()
+            os.makedirs(PROFILES_DIR, exist_ok=True)
+            self.path = os.path.join(PROFILES_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.name}.pstats")
+            self._profiler.dump_stats(self.path)
+            _prune_profiles()
+        finally:
+            self._profiler = None
+            _profile_lock.release()
+        return False
+
+
+def _prune_profiles():
+    for path in list_profiles()[MAX_PROFILES:]:
+        os.remove(path)
+
+
+def list_profiles():
+    """Saved profiles, newest first"""
+    if not os.path.isdir(PROFILES_DIR):
+        return []
+    paths = [os.path.join(PROFILES_DIR, f) for f in os.listdir(PROFILES_DIR) if f.endswith(".pstats")]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def top_functions(path, limit=TOP_FUNCTIONS, sort="cumulative"):
+    """The functions of a saved profile with the most cumulative (or own) time"""
+    stats = pstats.Stats(path)
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{function} ({os.path.basename(filename)}:{line})" if line else function,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "own_ms": own * 1000,
+            "cumulative_ms": cumulative * 1000,
+            "path": filename
+        })
+    key = "cumulative_ms" if sort == "cumulative" else "own_ms"
+    return sorted(rows, key=lambda r: r[key], reverse=True)[:limit], stats.total_tt * 1000
@@ -0,0 +1,227 @@
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import FunctionType, ModuleType
+
+from utils.instrumentation import count
+
+# Session-state key holding per-session cached results (see session_cached)
+SESSION_CACHE_KEY = "session_cache"
+# Cached results older than this are recomputed and evicted
+CACHE_TTL_SECONDS = 300
+# Largest cached result kept per name; larger results are returned but not kept
+DEFAULT_KEY_BUDGET = 256 * 1024
+KEY_BUDGETS = {
+    "notifications": 64 * 1024,
+    "bin_sites": 1024 * 1024,
+}
+# Cached results kept per session, oldest evicted first
+SESSION_CACHE_BUDGET = 2 * 1024 * 1024
+# Sessions not seen for this long are dropped from the report
+SESSION_IDLE_SECONDS = 30 * 60
+# A session's deep size is re-measured at most this often; reruns in between only mark it as seen
+SESSION_MEASURE_SECONDS = 30
+# Frames kept per allocation while tracemalloc is tracing
+TRACEMALLOC_FRAMES = 5
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_sessions = {}
+_evictions = {"stale": 0, "over_budget": 0, "session_budget": 0}
+_last_snapshot = None
+
+
+def deep_sizeof(obj):
+    """Approximate bytes held by an object and everything it references"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(item))
+        # DataFrames and Series know their own deep size
+        memory_usage = getattr(item, "memory_usage", None)
+        if callable(memory_usage) and hasattr(item, "index") and hasattr(item, "dtypes"):
+            usage = memory_usage(deep=True)
+            total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, complex, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        for slot in getattr(type(item), "__slots__", ()):
+            if hasattr(item, slot):
+                stack.append(getattr(item, slot))
+    return total
+
+
+def budget_for(name):
+    return KEY_BUDGETS.get(name, DEFAULT_KEY_BUDGET)
+
+
+def session_cached(session_state, name, params, compute, ttl=CACHE_TTL_SECONDS):
+    """
+    Return compute() for params, reusing this session's last result for name while
+    params are unchanged and it is fresher than ttl
+    Results over the name's size budget are not kept. Cached values are shared
+    between reruns and must not be mutated by the caller.
+    """
+    cache = session_state.setdefault(SESSION_CACHE_KEY, {})
+    entry = cache.get(name)
+    now = time.time()
+    if entry is not None and entry["params"] == params and now - entry["stored_at"] < ttl:
+        entry["hits"] += 1
+        count("cache_requests", cache=name, result="hit")
+        return entry["value"]
+
+    count("cache_requests", cache=name, result="miss")
+    value = compute()
+    size = deep_sizeof(value)
+    if size > budget_for(name):
+        cache.pop(name, None)
+        with _lock:
+            _evictions["over_budget"] += 1
+        logger.info("Not caching %s: %d bytes is over its %d byte budget", name, size, budget_for(name))
+    else:
+        cache[name] = {"params": params, "value": value, "size": size, "stored_at": now, "ttl": ttl, "hits": 0}
+    return value
+
+
+def enforce_budgets(session_state, now=None):
+    """Evict this session's stale cached results, then the oldest until it is within SESSION_CACHE_BUDGET"""
+    cache = session_state.get(SESSION_CACHE_KEY)
+    if not cache:
+        return []
+    now = now or time.time()
+    evicted = []
+    for name, entry in list(cache.items()):
+        if now - entry["stored_at"] >= entry["ttl"]:
+            del cache[name]
+            evicted.append((name, "stale"))
+
+    total = sum(entry["size"] for entry in cache.values())
+    for name, entry in sorted(cache.items(), key=lambda item: item[1]["stored_at"]):
+        if total <= SESSION_CACHE_BUDGET:
+            break
+        del cache[name]
+        total -= entry["size"]
+        evicted.append((name, "session_budget"))
+
+    with _lock:
+        for _, reason in evicted:
+            _evictions[reason] += 1
+    return evicted
+
+
+def session_report(session_state):
+    """Deep size of each key in a session, cached results listed per name"""
+    rows = []
+    for key, value in session_state.items():
+        if key == SESSION_CACHE_KEY:
+            for name, entry in value.items():
+                rows.append({
+                    "key": f"{SESSION_CACHE_KEY}.{name}", "kind": "cache", "bytes": entry["size"],
+                    "budget": budget_for(name), "age_s": time.time() - entry["stored_at"], "hits": entry["hits"]
+                })
+            continue
+        budget = KEY_BUDGETS.get(key)
+        rows.append({
+            "key": key, "kind": "state", "bytes": deep_sizeof(value),
+            "budget": budget, "age_s": None, "hits": None
+        })
+    for row in rows:
+        row["over_budget"] = row["budget"] is not None and row["bytes"] > row["budget"]
+    return sorted(rows, key=lambda r: r["bytes"], reverse=True)
+
+
+def record_session(session_id, session_state):
+    """
+    Note a session's current deep size so sizes can be compared across sessions
+    Walking the whole session state is costly, so it is done at most once per
+    SESSION_MEASURE_SECONDS for each session.
+    """
+    now = time.time()
+    with _lock:
+        info = _sessions.get(session_id)
+        if info is not None and now - info["measured"] < SESSION_MEASURE_SECONDS:
+            info["seen"] = now
+            return
+    size = deep_sizeof(dict(session_state.items()))
+    with _lock:
+        _sessions[session_id] = {"bytes": size, "keys": len(session_state), "seen": now, "measured": now}
+        for stale_id in [s for s, info in _sessions.items() if now - info["seen"] > SESSION_IDLE_SECONDS]:
+            del _sessions[stale_id]
+
+
+def get_session_sizes():
+    """Recently active sessions, largest first"""
+    now = time.time()
+    with _lock:
+        sessions = [
+            {"session": session_id, "bytes": info["bytes"], "keys": info["keys"], "idle_s": now - info["seen"]}
+            for session_id, info in _sessions.items()
+        ]
+    return sorted(sessions, key=lambda s: s["bytes"], reverse=True)
+
+
+def get_eviction_counts():
+    with _lock:
+        return dict(_evictions)
+
+
+def is_tracing():
+    return tracemalloc.is_tracing()
+
+
+def start_tracing():
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        _last_snapshot = None
+
+
+def stop_tracing():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+
+
+def take_snapshot(limit=25):
+    """
+    Largest allocation sites by line, with the change since the previous snapshot,
+    and the traced current and peak memory
+    """
+    global _last_snapshot
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    if _last_snapshot is not None:
+        stats = snapshot.compare_to(_last_snapshot, "lineno")
+    else:
+        stats = snapshot.statistics("lineno")
+    _last_snapshot = snapshot
+
+    rows = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        rows.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "kib": stat.size / 1024,
+            "change_kib": getattr(stat, "size_diff", 0) / 1024,
+            "blocks": stat.count
+        })
+    current, peak = tracemalloc.get_traced_memory()
+    return rows, current, peak
@@ -0,0 +1,228 @@
+import heapq
+import math
+
+import numpy as np
+
+METRES_PER_DEGREE = 111320.0
+
+
+def project_to_plane(lats, lons, origin_lat):
+    """
+    Project coordinates to metres on a local plane (equirectangular around origin_lat)
+    Euclidean distances on the plane are accurate at city scale.
+    """
+    x = np.asarray(lons, dtype=float) * METRES_PER_DEGREE * math.cos(math.radians(origin_lat))
+    y = np.asarray(lats, dtype=float) * METRES_PER_DEGREE
+    return np.column_stack([x, y])
+
+
+class KDTree:
+    """Static 2-d tree over a set of points for k-nearest-neighbour queries"""
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.root = self._build(np.arange(len(self.points)), 0)
+
+    def _build(self, indices, depth):
+        """Recursively split on the median along alternating axes; nodes are (index, axis, left, right)"""
+        if len(indices) == 0:
+            return None
+        axis = depth % self.points.shape[1]
+        order = indices[np.argsort(self.points[indices, axis], kind="stable")]
+        middle = len(order) // 2
+        return (
+            int(order[middle]),
+            axis,
+            self._build(order[:middle], depth + 1),
+            self._build(order[middle + 1:], depth + 1)
+        )
+
+    def query(self, point, k=1):
+        """Indices of the k points nearest to point, nearest first, with their distances"""
+        point = np.asarray(point, dtype=float)
+        best = []  # max-heap of (-distance, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            distance = float(np.hypot(*(self.points[index] - point)))
+            if len(best) < k:
+                heapq.heappush(best, (-distance, index))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, index))
+
+            offset = point[axis] - self.points[index, axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            # The far side can only hold closer points if the splitting plane is within reach
+            if len(best) < k or abs(offset) < -best[0][0]:
+                visit(far)
+
+        visit(self.root)
+        ranked = sorted((-negative, index) for negative, index in best)
+        return [index for _, index in ranked], [distance for distance, _ in ranked]
+
+
+def point_in_polygon(x, y, ring):
+    """Ray-casting test for a point against a polygon ring [(x, y), ...]"""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def points_in_polygon(xs, ys, ring):
+    """Vectorized ray-casting test of many points against one polygon ring"""
+    inside = np.zeros(len(xs), dtype=bool)
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        crosses = (y1 > ys) != (y2 > ys)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at_y = (x2 - x1) * (ys - y1) / (y2 - y1) + x1
+        inside ^= crosses & (xs < x_at_y)
+        x1, y1 = x2, y2
+    return inside
+
+
+def point_in_rings(x, y, rings):
+    """
+    Even-odd test against every ring of a shape, so holes are excluded and the parts
+    of a multi-polygon are all included
+    """
+    inside = False
+    for ring in rings:
+        inside ^= point_in_polygon(x, y, ring)
+    return inside
+
+
+def points_in_rings(xs, ys, rings):
+    """Vectorized point_in_rings"""
+    inside = np.zeros(len(xs), dtype=bool)
+    for ring in rings:
+        inside ^= points_in_polygon(xs, ys, ring)
+    return inside
+
+
+def _clip_half_plane(ring, a, b, c):
+    """Clip a convex ring to the half-plane a*x + b*y <= c (Sutherland-Hodgman)"""
+    clipped = []
+    for i, current in enumerate(ring):
+        previous = ring[i - 1]
+        current_in = a * current[0] + b * current[1] <= c
+        previous_in = a * previous[0] + b * previous[1] <= c
+        if current_in != previous_in:
+            t = (c - a * previous[0] - b * previous[1]) / (
+                a * (current[0] - previous[0]) + b * (current[1] - previous[1])
+            )
+            clipped.append((
+                previous[0] + t * (current[0] - previous[0]),
+                previous[1] + t * (current[1] - previous[1])
+            ))
+        if current_in:
+            clipped.append(current)
+    return clipped
+
+
+def voronoi_cells(points, bbox):
+    """
+    Voronoi cell of each (x, y) site clipped to bbox (min_x, min_y, max_x, max_y),
+    as polygon rings; used when real boundary polygons are not available
+    """
+    min_x, min_y, max_x, max_y = bbox
+    cells = []
+    for i, (xi, yi) in enumerate(points):
+        ring = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+        for j, (xj, yj) in enumerate(points):
+            if i == j or not ring:
+                continue
+            # Points closer to site i than site j: the half-plane on i's side of the bisector
+            a, b = xj - xi, yj - yi
+            c = (xj ** 2 + yj ** 2 - xi ** 2 - yi ** 2) / 2
+            ring = _clip_half_plane(ring, a, b, c)
+        cells.append(ring)
+    return cells
+
+
+class PolygonIndex:
+    """
+    Grid-bucketed point-in-polygon index
+    Each grid cell lists the polygons whose bounding boxes overlap it, so a lookup
+    tests only a handful of candidate polygons.
+    """
+
+    def __init__(self, polygons, cell_size):
+        """
+        polygons maps a name to the rings [[(x, y), ...], ...] of its shape: outer boundaries
+        and holes alike, as tested by point_in_rings
+        """
+        self.names = list(polygons)
+        self.shapes = [[list(ring) for ring in polygons[name]] for name in self.names]
+        self.cell_size = cell_size
+        bounds = np.array([
+            [
+                min(x for ring in rings for x, _ in ring), min(y for ring in rings for _, y in ring),
+                max(x for ring in rings for x, _ in ring), max(y for ring in rings for _, y in ring)
+            ]
+            for rings in self.shapes
+        ])
+        self.min_x, self.min_y = bounds[:, 0].min(), bounds[:, 1].min()
+        self.columns = int((bounds[:, 2].max() - self.min_x) // cell_size) + 1
+        self.rows = int((bounds[:, 3].max() - self.min_y) // cell_size) + 1
+
+        self.buckets = {}
+        self.cells_by_polygon = []
+        for index, (x1, y1, x2, y2) in enumerate(bounds):
+            c1, r1 = self._cell(x1, y1)
+            c2, r2 = self._cell(x2, y2)
+            cells = [row * self.columns + column for row in range(r1, r2 + 1) for column in range(c1, c2 + 1)]
+            for cell in cells:
+                self.buckets.setdefault(cell, []).append(index)
+            self.cells_by_polygon.append(cells)
+
+    def _cell(self, x, y):
+        return int((x - self.min_x) // self.cell_size), int((y - self.min_y) // self.cell_size)
+
+    def find(self, x, y):
+        """Name of the polygon containing the point, or None"""
+        column, row = self._cell(x, y)
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+        for index in self.buckets.get(row * self.columns + column, ()):
+            if point_in_rings(x, y, self.shapes[index]):
+                return self.names[index]
+        return None
+
+    def find_many(self, xs, ys):
+        """
+        Polygon index containing each point (-1 where none), for bulk assignment
+        Points are grouped by grid cell once (one sort); each polygon is then tested
+        only against the points in the cells it overlaps.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        result = np.full(len(xs), -1, dtype=np.int64)
+        columns = np.floor((xs - self.min_x) / self.cell_size).astype(np.int64)
+        rows = np.floor((ys - self.min_y) / self.cell_size).astype(np.int64)
+        valid = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        cells = np.where(valid, rows * self.columns + columns, -1)
+
+        order = np.argsort(cells, kind="stable")
+        unique_cells, starts, counts = np.unique(cells[order], return_index=True, return_counts=True)
+        points_by_cell = {
+            int(cell): order[start:start + count]
+            for cell, start, count in zip(unique_cells, starts, counts) if cell >= 0
+        }
+        for index, polygon_cells in enumerate(self.cells_by_polygon):
+            groups = [points_by_cell[cell] for cell in polygon_cells if cell in points_by_cell]
+            if not groups:
+                continue
+            candidates = np.concatenate(groups)
+            candidates = candidates[result[candidates] < 0]
+            if len(candidates):
+                inside = points_in_rings(xs[candidates], ys[candidates], self.shapes[index])
+                result[candidates[inside]] = index
+        return result
@@ -0,0 +1,276 @@
+import streamlit as st
+import pandas as pd
+import os
+
+from utils.instrumentation import get_timings, reset_timings, SAMPLES_PER_TIMER
+from utils.profiling import list_profiles, top_functions
+from utils.session_memory import (
+    session_report, get_session_sizes, get_eviction_counts, is_tracing, start_tracing, stop_tracing, take_snapshot,
+    SESSION_CACHE_BUDGET, SESSION_MEASURE_SECONDS
+)
+from controllers.admin_controller import (
+    get_query_report, get_top_offenders, explain_statement, get_slow_query_settings, reset_query_report
+)
+
+
+TIMER_KINDS = ["view", "controller", "model"]
+
+
+def is_admin(user):
+    return user is not None and user.get("status") == "admin"
+
+
+def timer_kind(name):
+    """Layer a timer belongs to, from its name"""
+    if "_view." in name or name.startswith("render."):
+        return "view"
+    if "_controller." in name:
+        return "controller"
+    return "model"
+
+
+def render():
+    user = st.session_state.get("user")
+    if not is_admin(user):
+        st.error("This page is only available to administrators.")
+        return
+
+    render_timings()
+    render_queries()
+    render_profiles()
+    render_session_memory()
+
+
+def render_timings():
+    import plotly.express as px
+
+    st.markdown("## Performance Timings")
+    st.caption(
+        "Latency of instrumented view sections, controllers and model calls since the server started. "
+        f"Percentiles cover the last {SAMPLES_PER_TIMER} calls of each timer."
+    )
+
+    timings = get_timings()
+    if not timings:
+        st.info("No timings recorded yet. Open the Dashboard or Metrics pages to collect some.")
+        return
+
+    df_timings = pd.DataFrame(timings)
+    df_timings['kind'] = df_timings['name'].map(timer_kind)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Timers", len(df_timings))
+    with col2:
+        st.metric("Calls", int(df_timings['calls'].sum()))
+    with col3:
+        st.metric("Errors", int(df_timings['errors'].sum()))
+
+    kind_filter = st.multiselect("Show", TIMER_KINDS, default=TIMER_KINDS, key="admin_timing_kinds")
+    df_shown = df_timings[df_timings['kind'].isin(kind_filter)]
+
+    st.dataframe(
+        df_shown[['name', 'kind', 'calls', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            column: st.column_config.NumberColumn(column.replace("_ms", " (ms)"), format="%.1f")
+            for column in ['p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms']
+        }
+    )
+
+    slowest = df_shown.nlargest(15, 'p95_ms')
+    if not slowest.empty:
+        fig = px.bar(
+            slowest.melt(id_vars='name', value_vars=['p50_ms', 'p95_ms', 'p99_ms'], var_name='percentile', value_name='ms'),
+            x='ms',
+            y='name',
+            color='percentile',
+            barmode='group',
+            orientation='h',
+            title="Slowest timers by p95 latency",
+            labels={'ms': 'Latency (ms)', 'name': ''}
+        )
+        fig.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig, use_container_width=True)
+
+    if st.button("Reset timings", key="admin_reset_timings"):
+        reset_timings()
+        st.rerun()
+
+
+def render_queries():
+    st.markdown("## Database Queries")
+    settings = get_slow_query_settings()
+    st.caption(
+        "Statements run through the models, grouped by their SQL with literals removed. "
+        f"Statements slower than {settings['threshold_ms']:.0f} ms are also written to "
+        f"`{os.path.relpath(settings['log_path'])}`."
+    )
+
+    report = get_query_report()
+    if not report:
+        st.info("No queries recorded yet.")
+        return
+
+    df_queries = pd.DataFrame(report)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Statements", len(df_queries))
+    with col2:
+        st.metric("Executions", int(df_queries['calls'].sum()))
+    with col3:
+        st.metric("Failed", int(df_queries['errors'].sum()))
+
+    st.dataframe(
+        df_queries[['sql', 'calls', 'errors', 'mean_ms', 'max_ms', 'total_ms', 'rows_per_call', 'sites']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'sql': st.column_config.TextColumn("SQL", width="large"),
+            'rows_per_call': st.column_config.NumberColumn("rows / call", format="%.1f"),
+            **{
+                column: st.column_config.NumberColumn(column.replace("_ms", " (ms)"), format="%.2f")
+                for column in ['mean_ms', 'max_ms', 'total_ms']
+            }
+        }
+    )
+
+    statement = st.selectbox("Explain a top offender", get_top_offenders(), key="admin_explain_sql")
+    if statement and st.button("Explain query plan", key="admin_explain"):
+        plan = explain_statement(statement)
+        if plan:
+            st.code("\n".join(detail for _, _, detail in plan), language="text")
+        else:
+            st.info("No query plan available for this statement.")
+
+    if st.button("Reset query statistics", key="admin_reset_queries"):
+        reset_query_report()
+        st.rerun()
+
+
+def _request_profile():
+    st.session_state["profile_next_render"] = True
+
+
+def _profile_table(path, sort="cumulative"):
+    rows, total_ms = top_functions(path, sort=sort)
+    st.caption(f"{total_ms:.0f} ms profiled in total.")
+    st.dataframe(
+        pd.DataFrame(rows)[['function', 'calls', 'own_ms', 'cumulative_ms']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'function': st.column_config.TextColumn("Function", width="large"),
+            'own_ms': st.column_config.NumberColumn("own (ms)", format="%.1f"),
+            'cumulative_ms': st.column_config.NumberColumn("cumulative (ms)", format="%.1f")
+        }
+    )
+
+
+def render_profile_summary(path):
+    """Top functions of a render that was just profiled, shown below the page"""
+    with st.expander(f"Profile of this render ({os.path.basename(path)})", expanded=True):
+        _profile_table(path)
+
+
+def render_profiles():
+    st.markdown("## Render Profiles")
+    st.caption(
+        "Profile one render of a page with cProfile. Add `?profile=1` to the URL, or use the button "
+        "below and then open the page to profile. Other renders are not profiled."
+    )
+    if st.session_state.get("profile_next_render"):
+        st.info("The next page you open will be profiled.")
+    else:
+        st.button("Profile the next page render", key="admin_profile_next", on_click=_request_profile)
+
+    profiles = list_profiles()
+    if not profiles:
+        st.info("No profiles saved yet.")
+        return
+
+    path = st.selectbox("Saved profile", profiles, format_func=os.path.basename, key="admin_profile_path")
+    sort = st.radio("Sort by", ["cumulative", "own"], horizontal=True, key="admin_profile_sort")
+    _profile_table(path, sort=sort)
+    with open(path, "rb") as f:
+        st.download_button("Download pstats", f.read(), file_name=os.path.basename(path), key="admin_profile_download")
+
+
+def render_session_memory():
+    st.markdown("## Session Memory")
+    st.caption(
+        f"Deep size of session state, re-measured at most every {SESSION_MEASURE_SECONDS} s per session. Cached "
+        f"results are evicted when stale or when a session holds more than {SESSION_CACHE_BUDGET // 1024} KiB of them."
+    )
+
+    sessions = get_session_sizes()
+    evictions = get_eviction_counts()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Active Sessions", len(sessions))
+    with col2:
+        st.metric("Largest Session", f"{sessions[0]['bytes'] / 1024:.0f} KiB" if sessions else "-")
+    with col3:
+        st.metric("Total Session State", f"{sum(s['bytes'] for s in sessions) / 1024:.0f} KiB")
+    with col4:
+        st.metric("Evicted Results", sum(evictions.values()))
+
+    st.markdown("#### This Session")
+    df_keys = pd.DataFrame(session_report(st.session_state))
+    df_keys['kib'] = df_keys['bytes'] / 1024
+    df_keys['budget_kib'] = df_keys['budget'] / 1024
+    st.dataframe(
+        df_keys[['key', 'kind', 'kib', 'budget_kib', 'over_budget', 'age_s', 'hits']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'kib': st.column_config.NumberColumn("size (KiB)", format="%.1f"),
+            'budget_kib': st.column_config.NumberColumn("budget (KiB)", format="%.0f"),
+            'age_s': st.column_config.NumberColumn("age (s)", format="%.0f")
+        }
+    )
+
+    st.markdown("#### All Sessions")
+    df_sessions = pd.DataFrame(sessions)
+    df_sessions['session'] = df_sessions['session'].str[:8]
+    df_sessions['kib'] = df_sessions['bytes'] / 1024
+    st.dataframe(
+        df_sessions[['session', 'kib', 'keys', 'idle_s']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'kib': st.column_config.NumberColumn("size (KiB)", format="%.1f"),
+            'idle_s': st.column_config.NumberColumn("idle (s)", format="%.0f")
+        }
+    )
+
+    st.markdown("#### Allocations")
+    if not is_tracing():
+        st.caption("Start tracing, use the app, then take snapshots to see where memory is allocated.")
+        if st.button("Start tracemalloc", key="admin_tracemalloc_start"):
+            start_tracing()
+            st.rerun()
+        return
+
+    snap_col, stop_col = st.columns(2)
+    with stop_col:
+        if st.button("Stop tracemalloc", key="admin_tracemalloc_stop"):
+            stop_tracing()
+            st.rerun()
+    with snap_col:
+        snapshot = st.button("Take snapshot", key="admin_tracemalloc_snapshot")
+    if snapshot:
+        rows, current, peak = take_snapshot()
+        st.caption(f"Traced memory: {current / 1024 ** 2:.1f} MiB now, {peak / 1024 ** 2:.1f} MiB peak. "
+                   "Changes are relative to the previous snapshot.")
+        st.dataframe(
+            pd.DataFrame(rows),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'location': st.column_config.TextColumn("Allocated at", width="large"),
+                'kib': st.column_config.NumberColumn("size (KiB)", format="%.1f"),
+                'change_kib': st.column_config.NumberColumn("change (KiB)", format="%+.1f")
+            }
+        )
@@ -1,20 +1,37 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import sys
-import os
 import base64
 import random
 import plotly.io as pio
-import plotly.figure_factory as ff
-import plotly.io as pio
-pio.templates.default = "plotly"
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from controllers.waste_controller import get_waste_stats, get_active_complaints, get_ward_cleanliness_scores
+from controllers.waste_controller import get_waste_stats, get_ward_cleanliness_scores, get_ward_map_data, assign_ward
+from controllers.complaint_controller import (
+    COMPLAINT_STATUSES, COMPLAINT_PRIORITIES, count_complaints, get_complaints_page, get_page_count,
+    get_complaint_types, get_complaint_summary, get_complaint_density, get_urgent_complaints,
+    submit_complaint, get_complaints_version
+)
+from controllers.upvote_controller import upvote_complaint, get_voted_complaint_ids
+from controllers.photo_controller import get_thumbnail_path
+from controllers.forecast_controller import forecast_ward
+from controllers.anomaly_controller import get_ward_alerts
+from controllers.route_controller import plan_ward_routes, get_planned_routes
+from controllers.bin_controller import suggest_bin_sites, SERVICE_RADIUS_M
+from controllers.map_controller import get_viewport_points, MIN_DETAIL_ZOOM
+from components.folium_map import render_cluster_map
+from utils.instrumentation import timed
+from utils.session_memory import session_cached
+
+
+def format_sla(complaint):
+    """Describe the time left on a complaint's SLA deadline"""
+    hours = complaint.get('hours_remaining')
+    if hours is None:
+        return "Not set"
+    if hours < 0:
+        return f"{complaint['due_at']} (overdue by {-hours:.0f}h)"
+    return f"{complaint['due_at']} ({hours:.0f}h left)"
 
 
 def render():
@@ -24,6 +41,12 @@ def render():
         st.session_state["page"] = "login"
         return
     
+    # plotly.express and the chart template are slow to load, so they are loaded on first use rather than
+    # at app startup; every session lands here after login, before any other page draws a chart
+    import plotly.express as px
+    if pio.templates.default != "plotly":
+        pio.templates.default = "plotly"
+    
     user = st.session_state["user"]
     user_id = user.get("id", hash(user["username"]))
     user_ward = user.get("ward", "Koramangala")
@@ -59,69 +82,7 @@ def render():
     # Create tabs for different dashboard sections
     tab1, tab2, tab3 = st.tabs(["Overview", "Waste Analytics", "Community Issues"])
     
-    def get_ward_map_data():
-        """
-        Generate geospatial data for ward-level waste management performance
-        In a real app, this would use actual GIS data for BBMP wards
-        """
-        # For demo purposes, we'll create mock lat/long coordinates for Bangalore wards
-        bengaluru_center = [12.9716, 77.5946]  # Lat/Long for Bangalore
-        
-        wards = [
-            "Koramangala", "Indiranagar", "Jayanagar", "JP Nagar", "HSR Layout", 
-            "Malleswaram", "Shivajinagar", "Hebbal", "Yelahanka", "Mahadevpura",
-            "Whitefield", "Electronic City"
-        ]
-        
-        # Generate pseudo-random but consistent coordinates around Bangalore
-        random.seed(42)  # For consistent results
-        
-        ward_data = []
-        for i, ward in enumerate(wards):
-            # Generate coordinates in a roughly circular pattern around Bangalore center
-            angle = (i / len(wards)) * 2 * np.pi
-            radius = random.uniform(0.01, 0.08)  # ~1-8km in degrees
-            
-            lat = bengaluru_center[0] + radius * np.sin(angle)
-            lon = bengaluru_center[1] + radius * np.cos(angle)
-            
-            # Generate a realistic score between 40-95
-            score = random.randint(40, 95)
-            
-            # Determine category based on score
-            if score >= 80:
-                category = "Excellent"
-                color = "#2ecc71"
-            elif score >= 60:
-                category = "Good"
-                color = "#3498db"
-            elif score >= 40:
-                category = "Average"
-                color = "#f39c12"
-            else:
-                category = "Needs Improvement"
-                color = "#e74c3c"
-                
-            # Generate waste data
-            waste_collected = random.uniform(5, 15)  # tonnes per day
-            segregation_rate = random.uniform(50, 95)  # percentage
-            collection_efficiency = random.uniform(70, 99)  # percentage
-            
-            ward_data.append({
-                "ward": ward,
-                "latitude": lat,
-                "longitude": lon,
-                "score": score,
-                "category": category,
-                "color": color,
-                "waste_collected": round(waste_collected, 1),
-                "segregation_rate": round(segregation_rate, 1),
-                "collection_efficiency": round(collection_efficiency, 1)
-            })
-        
-        return ward_data
-    
-    with tab1:
+    with tab1, timed("dashboard_view.overview"):
         # Display key metrics in a grid
         st.markdown("### Key Performance Indicators")
         col1, col2, col3, col4 = st.columns(4)
@@ -153,6 +114,19 @@ def render():
                 delta=f"{random.randint(-3, 7)}"
             )
         
+        # Surface recent anomalies flagged by the streaming detectors
+        ward_alerts = get_ward_alerts(user_ward)
+        if ward_alerts:
+            metric_labels = {"waste_generated": "Waste generated", "segregation_rate": "Segregation rate"}
+            with st.expander(f"⚠️ {len(ward_alerts)} unusual reading(s) in {user_ward} in the last 14 days"):
+                for alert in ward_alerts:
+                    direction = "above" if alert['z_score'] > 0 else "below"
+                    st.markdown(
+                        f"**{alert['date']}** – {metric_labels.get(alert['metric'], alert['metric'])} was "
+                        f"{alert['value']:.1f}, well {direction} the expected {alert['expected']:.1f} "
+                        f"(z = {alert['z_score']:+.1f})"
+                    )
+        
         # Display ward ranking
         st.markdown("### Ward Cleanliness Ranking")
         
@@ -220,77 +194,123 @@ def render():
             
             # Get ward map data
             ward_map_data = get_ward_map_data()
+            map_backend = st.radio(
+                "Map view", ["Plotly", "Folium (clustered)"], horizontal=True, key="ward_map_backend",
+                help="The Folium view clusters bins and complaints on the server, so dense areas stay responsive"
+            )
             
-            # Create map visualization
-            try:
-                # Convert to DataFrame for Plotly
-                df_map = pd.DataFrame(ward_map_data)
-                
-                # Create a hover text column
-                df_map['hover_text'] = df_map.apply(
-                    lambda row: f"<b>{row['ward']}</b><br>" + 
-                            f"Score: {row['score']}/100<br>" +
-                            f"Category: {row['category']}<br>" +
-                            f"Waste: {row['waste_collected']} tonnes/day<br>" +
-                            f"Segregation: {row['segregation_rate']}%",
-                    axis=1
+            if map_backend == "Folium (clustered)":
+                user_ward_data = next((w for w in ward_map_data if w['ward'] == user_ward), ward_map_data[0])
+                render_cluster_map(
+                    ward_map_data, (user_ward_data['latitude'], user_ward_data['longitude']), key="ward_cluster_map"
                 )
-                
-                # Create the map with Mapbox token (important for display)
-                fig = px.scatter_mapbox(
-                    df_map,
-                    lat="latitude",
-                    lon="longitude",
-                    hover_name="ward",
-                    hover_data={"latitude": False, "longitude": False},
-                    custom_data=["hover_text"],
-                    color="score",
-                    size="waste_collected",
-                    size_max=15,
-                    zoom=11,
-                    mapbox_style="open-street-map",  # Changed to open-street-map which doesn't require a token
-                    color_continuous_scale=[(0, "#e74c3c"), (0.5, "#f39c12"), (0.75, "#3498db"), (1, "#2ecc71")],
-                    range_color=[30, 100]
+            else:
+                map_zoom = st.select_slider(
+                    "Map zoom", options=list(range(11, 17)), value=11, key="ward_map_zoom",
+                    help=f"Zoom to {MIN_DETAIL_ZOOM} or closer to see open complaints and bins around your ward"
                 )
+            
+                # Create map visualization
+                try:
+                    # Convert to DataFrame for Plotly
+                    df_map = pd.DataFrame(ward_map_data)
                 
-                # Set hover template
-                fig.update_traces(
-                    hovertemplate="%{customdata[0]}<extra></extra>"
-                )
+                    # Create a hover text column
+                    df_map['hover_text'] = df_map.apply(
+                        lambda row: f"<b>{row['ward']}</b><br>" + 
+                                f"Score: {row['score']}/100<br>" +
+                                f"Category: {row['category']}<br>" +
+                                f"Waste: {row['waste_collected']} tonnes/day<br>" +
+                                f"Segregation: {row['segregation_rate']}%",
+                        axis=1
+                    )
                 
-                # Update layout
-                fig.update_layout(
-                    height=350,
-                    margin={"r":0,"t":0,"l":0,"b":0},
-                    coloraxis_colorbar=dict(
-                        title="Score",
-                        tickvals=[40, 60, 80],
-                        ticktext=["Poor", "Average", "Good"]
+                    # Create the map with Mapbox token (important for display)
+                    fig = px.scatter_mapbox(
+                        df_map,
+                        lat="latitude",
+                        lon="longitude",
+                        hover_name="ward",
+                        hover_data={"latitude": False, "longitude": False},
+                        custom_data=["hover_text"],
+                        color="score",
+                        size="waste_collected",
+                        size_max=15,
+                        zoom=map_zoom,
+                        mapbox_style="open-street-map",  # Changed to open-street-map which doesn't require a token
+                        color_continuous_scale=[(0, "#e74c3c"), (0.5, "#f39c12"), (0.75, "#3498db"), (1, "#2ecc71")],
+                        range_color=[30, 100]
                     )
-                )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                    # Set hover template
+                    fig.update_traces(
+                        hovertemplate="%{customdata[0]}<extra></extra>"
+                    )
                 
-            except Exception as e:
-                # Display more specific error for debugging
-                st.error(f"Map error: {str(e)}")
+                    # Update layout
+                    fig.update_layout(
+                        height=350,
+                        margin={"r":0,"t":0,"l":0,"b":0},
+                        coloraxis_colorbar=dict(
+                            title="Score",
+                            tickvals=[40, 60, 80],
+                            ticktext=["Poor", "Average", "Good"]
+                        )
+                    )
                 
-                # Fallback to simple visualization
-                st.markdown("#### Ward Cleanliness Scores")
+                    # When zoomed in, centre on the user's ward and draw only what is inside the viewport
+                    if map_zoom >= MIN_DETAIL_ZOOM:
+                        centre = df_map[df_map['ward'] == user_ward]
+                        if not centre.empty:
+                            centre_lat = float(centre['latitude'].iloc[0])
+                            centre_lon = float(centre['longitude'].iloc[0])
+                            viewport = get_viewport_points(centre_lat, centre_lon, map_zoom, height_px=350)
+                            if viewport['bins']:
+                                fig.add_trace(go.Scattermapbox(
+                                    lat=[b['latitude'] for b in viewport['bins']],
+                                    lon=[b['longitude'] for b in viewport['bins']],
+                                    mode="markers",
+                                    marker=dict(size=6, color="#2c3e50"),
+                                    text=[f"{b['location']} ({b['capacity_litres']} L)" for b in viewport['bins']],
+                                    hovertemplate="%{text}<extra></extra>",
+                                    name="Bins"
+                                ))
+                            if viewport['complaints']:
+                                fig.add_trace(go.Scattermapbox(
+                                    lat=[c['latitude'] for c in viewport['complaints']],
+                                    lon=[c['longitude'] for c in viewport['complaints']],
+                                    mode="markers",
+                                    marker=dict(size=9, color="#e74c3c"),
+                                    text=[f"{c['type']} ({c['status']})" for c in viewport['complaints']],
+                                    hovertemplate="%{text}<extra></extra>",
+                                    name="Open complaints"
+                                ))
+                            fig.update_layout(mapbox_center={"lat": centre_lat, "lon": centre_lon}, showlegend=False)
+                            if viewport['truncated']:
+                                st.caption("Showing a sample of points in this area. Zoom in further to see all of them.")
                 
-                # Create simple colored bar chart as fallback
-                fig = px.bar(
-                    ward_scores, 
-                    x='ward', 
-                    y='score',
-                    color='score',
-                    color_continuous_scale=[(0, 'red'), (0.4, 'yellow'), (0.6, 'blue'), (1, 'green')],
-                    labels={'ward': 'Ward', 'score': 'Cleanliness Score'},
-                    title='Ward Cleanliness Scores'
-                )
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                fig.update_layout(height=350)
-                st.plotly_chart(fig, use_container_width=True)
+                except Exception as e:
+                    # Display more specific error for debugging
+                    st.error(f"Map error: {str(e)}")
+                
+                    # Fallback to simple visualization
+                    st.markdown("#### Ward Cleanliness Scores")
+                
+                    # Create simple colored bar chart as fallback
+                    fig = px.bar(
+                        ward_scores, 
+                        x='ward', 
+                        y='score',
+                        color='score',
+                        color_continuous_scale=[(0, 'red'), (0.4, 'yellow'), (0.6, 'blue'), (1, 'green')],
+                        labels={'ward': 'Ward', 'score': 'Cleanliness Score'},
+                        title='Ward Cleanliness Scores'
+                    )
+                
+                    fig.update_layout(height=350)
+                    st.plotly_chart(fig, use_container_width=True)
         
         
         # Quick tips section
@@ -335,7 +355,7 @@ def render():
             </div>
             """, unsafe_allow_html=True)
     
-    with tab2:
+    with tab2, timed("dashboard_view.waste_analytics"):
         st.markdown("### Your Waste Analytics")
         
         # Create waste type breakdown - safely handle missing keys
@@ -463,7 +483,45 @@ def render():
                     
                     st.plotly_chart(fig, use_container_width=True)
                     
-                    st.info("💡 **Insight:** Weekends typically show higher waste generation. Consider additional collection services on these days.")
+                    # Ward-level forecast from the seasonal model fitted across all wards
+                    st.markdown("### Ward Waste Forecast")
+                    
+                    horizon = st.slider("Forecast horizon (days)", min_value=7, max_value=30, value=14, key="forecast_horizon")
+                    df_forecast = forecast_ward(user_ward, horizon)
+                    
+                    if df_forecast.empty:
+                        st.info("Not enough history to forecast waste generation for this ward yet.")
+                    else:
+                        fig = go.Figure()
+                        fig.add_trace(go.Scatter(
+                            x=pd.concat([df_forecast['date'], df_forecast['date'][::-1]]),
+                            y=pd.concat([df_forecast['upper'], df_forecast['lower'][::-1]]),
+                            fill='toself',
+                            fillcolor='rgba(52, 152, 219, 0.2)',
+                            line=dict(color='rgba(0, 0, 0, 0)'),
+                            name='95% interval'
+                        ))
+                        fig.add_trace(go.Scatter(
+                            x=df_forecast['date'],
+                            y=df_forecast['forecast'],
+                            mode='lines+markers',
+                            name='Forecast',
+                            line=dict(color='#0078D7', width=3)
+                        ))
+                        fig.update_layout(
+                            title=f'Forecast Waste Generation in {user_ward} (Next {horizon} Days)',
+                            xaxis_title='Date',
+                            yaxis_title='Waste (tonnes/day)'
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                        
+                        # Derive the collection insight from the forecast instead of a fixed message
+                        by_day = df_forecast.groupby(df_forecast['date'].dt.day_name())['forecast'].mean()
+                        peak_day = by_day.idxmax()
+                        uplift = (by_day.max() / by_day.mean() - 1) * 100
+                        st.info(f"💡 **Insight:** {peak_day}s are forecast to generate the most waste in {user_ward} "
+                                f"({by_day.max():.1f} tonnes, {uplift:.0f}% above the daily average). "
+                                f"Consider additional collection services on these days.")
                     
                 except Exception as e:
                     st.warning(f"Could not generate time series visualizations: {str(e)}")
@@ -472,92 +530,150 @@ def render():
         else:
             st.warning("Detailed waste type data is not available for this user or ward.")
     
-    with tab3:
+    with tab3, timed("dashboard_view.community_issues"):
         st.markdown("### Community Waste Issues")
         
-        # Active complaints in the ward
-        complaints = get_active_complaints(user_ward)
-        
         # Create tabs for viewing and reporting
-        issue_tab1, issue_tab2 = st.tabs(["View Active Issues", "Report New Issue"])
+        issue_tab1, issue_tab2, issue_tab3, issue_tab4, issue_tab5 = st.tabs(
+            ["View Active Issues", "Report New Issue", "Officer Queue", "Collection Routes", "Bin Placement"]
+        )
         
-        with issue_tab1:
+        with issue_tab1, timed("dashboard_view.active_issues"):
             st.markdown(f"#### Active Complaints in {user_ward}")
             
+            # Filters are applied in the database query, not on the rendered list
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                status_filter = st.multiselect("Status", COMPLAINT_STATUSES, key="complaint_status_filter")
+            with col2:
+                priority_filter = st.multiselect("Priority", COMPLAINT_PRIORITIES, key="complaint_priority_filter")
+            with col3:
+                type_filter = st.multiselect("Type", get_complaint_types(user_ward), key="complaint_type_filter")
+            
+            total_matching = count_complaints(user_ward, status_filter, priority_filter, type_filter)
+            
+            col1, col2, col3 = st.columns([1, 1, 2])
+            with col1:
+                page_size = st.selectbox("Per page", [10, 25, 50, 100], key="complaint_page_size")
+            total_pages = get_page_count(total_matching, page_size)
+            # Reset the page when the filters shrink the result set
+            if st.session_state.get("complaint_page", 1) > total_pages:
+                st.session_state["complaint_page"] = 1
+            with col2:
+                page_number = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key="complaint_page")
+            with col3:
+                compact_view = st.toggle("Compact table view", key="complaint_compact_view")
+            
+            complaints = get_complaints_page(
+                user_ward, status_filter, priority_filter, type_filter,
+                page=page_number, page_size=page_size
+            )
+            
             if not complaints:
-                st.info("No active complaints in your ward currently.")
+                st.info("No complaints match the selected filters.")
             else:
-                # Create expandable list of complaints
-                for i, complaint in enumerate(complaints):
-                    with st.expander(f"{complaint['type']} at {complaint['location']} ({complaint['status']})"):
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            st.markdown(f"**ID:** {complaint['id']}")
-                            reported_date = datetime.strptime(complaint.get('date_reported', datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d')
-                            days_open = complaint.get('age_days', 0)
-                            st.markdown(f"**Reported:** {reported_date.strftime('%d %b %Y')} ({days_open} days ago)")
-                            st.markdown(f"**Status:** {complaint['status']}")
-                            st.markdown(f"**Priority:** {complaint['priority']}")
-                            st.markdown(f"**Community Votes:** {complaint.get('votes', random.randint(0, 15))}")                        
-                        with col2:
-                            # Show action buttons
-                            st.button(f"👍 Upvote", key=f"upvote_{i}")
-                            st.button(f"📝 Add Comment", key=f"comment_{i}")
-                            if complaint['status'] in ['Pending', 'In Progress']:
-                                st.button(f"📞 Follow Up", key=f"follow_{i}")
+                st.caption(f"Showing {len(complaints)} of {total_matching} complaints (page {page_number} of {total_pages})")
                 
-                # Add summary metrics
+                if compact_view:
+                    st.dataframe(
+                        pd.DataFrame(complaints)[['id', 'type', 'location', 'status', 'priority', 'votes', 'date_reported', 'age_days']],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    voted_ids = get_voted_complaint_ids(user_id, [c['id'] for c in complaints])
+                    
+                    # Create expandable list of complaints, keyed by complaint ID so keys survive list changes
+                    for complaint in complaints:
+                        complaint_key = complaint['id']
+                        with st.expander(f"{complaint['type']} at {complaint['location']} ({complaint['status']})"):
+                            col1, col2 = st.columns([3, 1])
+                            
+                            with col1:
+                                st.markdown(f"**ID:** {complaint['id']}")
+                                reported_date = datetime.strptime(complaint['date_reported'], '%Y-%m-%d')
+                                st.markdown(f"**Reported:** {reported_date.strftime('%d %b %Y')} ({complaint['age_days']} days ago)")
+                                st.markdown(f"**Status:** {complaint['status']}")
+                                st.markdown(f"**Priority:** {complaint['priority']}")
+                                st.markdown(f"**SLA Due:** {format_sla(complaint)}")
+                                st.markdown(f"**Community Votes:** {complaint['votes']}")
+                                # Only the small thumbnail is sent to the browser
+                                thumbnail = get_thumbnail_path(complaint.get('photo_hash'))
+                                if thumbnail:
+                                    st.image(thumbnail, width=160)
+                                elif complaint.get('photo_hash'):
+                                    st.caption("Photo is being processed")
+                            with col2:
+                                # Show action buttons
+                                # Votes are buffered and written in batches; counts include this user's pending vote
+                                st.button(
+                                    f"👍 Upvote",
+                                    key=f"upvote_{complaint_key}",
+                                    disabled=complaint_key in voted_ids,
+                                    on_click=upvote_complaint,
+                                    args=(user_id, complaint_key)
+                                )
+                                st.button(f"📝 Add Comment", key=f"comment_{complaint_key}")
+                                if complaint['status'] in ['Pending', 'In Progress']:
+                                    st.button(f"📞 Follow Up", key=f"follow_{complaint_key}")
+            
+            # Add summary metrics (aggregated in the database over the whole ward)
+            summary = get_complaint_summary(user_ward)
+            total_issues = summary['total']
+            
+            if total_issues:
                 st.markdown("#### Issue Summary")
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                # Calculate issue stats
-                total_issues = len(complaints)
-                pending_issues = sum(1 for c in complaints if c['status'] == 'Pending')
-                resolved_issues = sum(1 for c in complaints if c['status'] == 'Resolved')
-                high_priority = sum(1 for c in complaints if c['priority'] == 'High')
+                pending_issues = summary['pending']
+                resolved_issues = summary['resolved']
+                high_priority = summary['high_priority']
                 
                 col1.metric("Total Issues", total_issues)
                 col2.metric("Pending", pending_issues, f"{pending_issues/total_issues*100:.0f}%")
                 col3.metric("Resolved", resolved_issues, f"{resolved_issues/total_issues*100:.0f}%")
                 col4.metric("High Priority", high_priority, f"{high_priority/total_issues*100:.0f}%")
                 
-                # Create issue heatmap by location
+                # Issue heatmap from complaint counts pre-aggregated per grid cell
                 st.markdown("#### Issue Distribution")
                 
+                density_col1, density_col2 = st.columns([3, 1])
+                with density_col1:
+                    density_resolution = st.select_slider(
+                        "Grid size",
+                        options=[0, 1, 2],
+                        format_func=lambda level: ["Street (~110 m)", "Neighbourhood (~550 m)", "District (~2 km)"][level],
+                        key="density_resolution"
+                    )
+                with density_col2:
+                    citywide = st.toggle("Whole city", key="density_citywide")
+                
                 try:
-                    # Group complaints by location
-                    location_count = {}
-                    for complaint in complaints:
-                        loc = complaint['location'].split(',')[0].strip()  # Get first part before comma
-                        if loc in location_count:
-                            location_count[loc] += 1
-                        else:
-                            location_count[loc] = 1
-                    
-                    # Convert to DataFrame for visualization
-                    df_loc = pd.DataFrame({
-                        'location': list(location_count.keys()),
-                        'count': list(location_count.values())
-                    }).sort_values('count', ascending=False)
-                    
-                    # Create bar chart
-                    fig = px.bar(
-                        df_loc,
-                        x='location',
-                        y='count',
-                        title=f'Issue Distribution by Location in {user_ward}',
-                        color='count',
-                        color_continuous_scale=[(0, '#3498db'), (1, '#e74c3c')],
+                    df_density = pd.DataFrame(
+                        get_complaint_density(None if citywide else user_ward, density_resolution)
                     )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    if df_density.empty:
+                        st.info("No geotagged complaints to map yet.")
+                    else:
+                        fig = px.density_mapbox(
+                            df_density,
+                            lat='latitude',
+                            lon='longitude',
+                            z='count',
+                            radius=[25, 40, 60][density_resolution],
+                            zoom=11 if citywide else 13,
+                            mapbox_style="open-street-map",
+                            color_continuous_scale=[(0, '#3498db'), (1, '#e74c3c')]
+                        )
+                        fig.update_layout(height=400, margin={"r": 0, "t": 0, "l": 0, "b": 0})
+                        st.plotly_chart(fig, use_container_width=True)
+                        st.caption(f"{int(df_density['count'].sum())} geotagged complaints in {len(df_density)} grid cells.")
                     
                 except Exception as e:
                     st.warning(f"Could not generate location distribution chart: {str(e)}")
         
-        with issue_tab2:
+        with issue_tab2, timed("dashboard_view.report_issue"):
             st.markdown("#### Report a New Waste Management Issue")
             
             # Create form for reporting
@@ -580,10 +696,22 @@ def render():
                 with col1:
                     location = st.text_input("Specific Location (address/landmark)")
                 with col2:
-                    ward = st.selectbox("Ward", ["Koramangala", "Indiranagar", "Jayanagar", "Other"], index=0)
+                    ward_options = [w['ward'] for w in get_ward_map_data()] + ["Other"]
+                    ward = st.selectbox(
+                        "Ward", ward_options,
+                        index=ward_options.index(user_ward) if user_ward in ward_options else 0,
+                        help="Detected automatically when coordinates are given"
+                    )
                 
                 description = st.text_area("Detailed Description", height=100)
                 
+                # Coordinates let nearby reports of the same issue be merged
+                col1, col2 = st.columns(2)
+                with col1:
+                    latitude = st.number_input("Latitude (optional)", value=None, min_value=-90.0, max_value=90.0, format="%.6f")
+                with col2:
+                    longitude = st.number_input("Longitude (optional)", value=None, min_value=-180.0, max_value=180.0, format="%.6f")
+                
                 col1, col2 = st.columns(2)
                 with col1:
                     contact = st.text_input("Contact Number (optional)")
@@ -596,17 +724,152 @@ def render():
                 
                 if submit_button:
                     if location and description:
-                        # In a real app, this would call an API
-                        st.success(f"""
-                        Complaint registered successfully!
-                        
-                        Tracking ID: BBMP-{random.randint(1000, 9999)}
-                        
-                        A BBMP official will respond within 24-48 hours.
-                        """)
+                        if latitude is not None and longitude is not None:
+                            detected_ward = assign_ward(latitude, longitude)
+                            if detected_ward and detected_ward != ward:
+                                st.info(f"Assigned to {detected_ward} ward based on the coordinates.")
+                                ward = detected_ward
+                        complaint_id, merged = submit_complaint(
+                            ward, issue_type, location, description, priority,
+                            latitude=latitude, longitude=longitude, user_id=user_id, photo=photo
+                        )
+                        if complaint_id is None:
+                            st.error("Could not register your complaint. Please try again.")
+                        elif merged:
+                            st.success(f"""
+                            This issue has already been reported nearby.
+                            
+                            Your report was added as a vote to complaint {complaint_id}.
+                            
+                            A BBMP official will respond within 24-48 hours.
+                            """)
+                        else:
+                            st.success(f"""
+                            Complaint registered successfully!
+                            
+                            Tracking ID: {complaint_id}
+                            
+                            A BBMP official will respond within 24-48 hours.
+                            """)
                     else:
                         st.error("Please provide location and description to submit a complaint.")
     
+        with issue_tab3, timed("dashboard_view.officer_queue"):
+            st.markdown(f"#### Most Urgent Open Complaints in {user_ward}")
+            st.caption("Ordered by SLA deadline. Priority escalates automatically as deadlines approach.")
+            
+            queue_size = st.slider("Complaints to show", min_value=5, max_value=50, value=10, step=5, key="officer_queue_size")
+            urgent = get_urgent_complaints(user_ward, queue_size)
+            
+            if not urgent:
+                st.success("No open complaints in your ward.")
+            else:
+                df_queue = pd.DataFrame(urgent)
+                df_queue['sla'] = df_queue.apply(format_sla, axis=1)
+                st.dataframe(
+                    df_queue[['id', 'type', 'location', 'status', 'priority', 'sla', 'votes']],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"sla": "SLA Due"}
+                )
+                overdue = int(df_queue['overdue'].sum())
+                if overdue:
+                    st.error(f"{overdue} of these complaints are past their SLA deadline.")
+
+        with issue_tab4, timed("dashboard_view.collection_routes"):
+            st.markdown(f"#### Collection Routes for {user_ward}")
+            st.caption("Routes start and end at the ward centre and cover every open geotagged complaint.")
+            
+            capacity = st.number_input(
+                "Vehicle capacity (bin lifts)", min_value=5, max_value=200, value=20, step=5, key="route_capacity"
+            )
+            # Tabs all run on every rerun, so the solver only runs on request; plans are shared across sessions
+            routes = get_planned_routes(user_ward, capacity)
+            if st.button("Plan routes" if routes is None else "Replan routes", key="plan_routes"):
+                with st.spinner("Planning routes..."):
+                    routes = plan_ward_routes(user_ward, capacity)
+            
+            if routes is None:
+                st.info("Press Plan routes to plan collection routes for the current open complaints.")
+            elif not routes:
+                st.info("No open geotagged complaints to collect.")
+            else:
+                route_col1, route_col2, route_col3 = st.columns(3)
+                with route_col1:
+                    st.metric("Vehicles Needed", len(routes))
+                with route_col2:
+                    st.metric("Pickup Points", sum(len(r['stop_ids']) for r in routes))
+                with route_col3:
+                    st.metric("Total Distance", f"{sum(r['distance_km'] for r in routes):.1f} km")
+                
+                fig = go.Figure()
+                for route in routes:
+                    fig.add_trace(go.Scattermapbox(
+                        lat=[point[0] for point in route['path']],
+                        lon=[point[1] for point in route['path']],
+                        mode="lines+markers",
+                        marker=dict(size=7),
+                        name=f"Route {route['route']}"
+                    ))
+                depot = routes[0]['path'][0]
+                fig.add_trace(go.Scattermapbox(
+                    lat=[depot[0]], lon=[depot[1]], mode="markers",
+                    marker=dict(size=14, color="black"), name="Depot"
+                ))
+                fig.update_layout(
+                    mapbox=dict(style="open-street-map", center=dict(lat=depot[0], lon=depot[1]), zoom=13),
+                    height=450,
+                    margin={"r": 0, "t": 0, "l": 0, "b": 0}
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.dataframe(
+                    pd.DataFrame([{
+                        "Route": r['route'],
+                        "Stops": len(r['stop_ids']),
+                        "Load": r['load'],
+                        "Distance (km)": round(r['distance_km'], 2)
+                    } for r in routes]),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+        with issue_tab5, timed("dashboard_view.bin_placement"):
+            st.markdown(f"#### Suggested Community Bin Sites in {user_ward}")
+            st.caption("Sites are clustered from every geotagged missing or overflowing bin report, weighted by votes.")
+            
+            # Keyed on the complaints data version too, so new bin reports show up without waiting for the TTL
+            placement = session_cached(
+                st.session_state, "bin_sites", (user_ward, get_complaints_version()),
+                lambda: suggest_bin_sites(user_ward)
+            )
+            if not placement:
+                st.info("No geotagged bin complaints in your ward yet.")
+            else:
+                bin_col1, bin_col2, bin_col3 = st.columns(3)
+                with bin_col1:
+                    st.metric("Suggested Sites", len(placement['sites']))
+                with bin_col2:
+                    st.metric(f"Demand Within {SERVICE_RADIUS_M} m", f"{placement['coverage']:.0f}%")
+                with bin_col3:
+                    st.metric("Average Walk to Bin", f"{placement['mean_distance_m']:.0f} m")
+                
+                df_sites = pd.DataFrame(placement['sites'])
+                fig = px.scatter_mapbox(
+                    df_sites,
+                    lat="latitude",
+                    lon="longitude",
+                    size="demand",
+                    size_max=20,
+                    zoom=13,
+                    mapbox_style="open-street-map",
+                    color_discrete_sequence=["#2ecc71"]
+                )
+                fig.update_layout(height=400, margin={"r": 0, "t": 0, "l": 0, "b": 0})
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"Based on {placement['reports']} reports. "
+                           f"Farthest report from a suggested site: {placement['max_distance_m']:.0f} m.")
+    
     # Footer with BBMP branding
     st.markdown("---")
     st.markdown("""
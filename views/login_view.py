@@ -1,9 +1,5 @@
 import streamlit as st
-import sys
-import os
 
-# Use direct relative import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from controllers.user_controller import login
 
 def render():
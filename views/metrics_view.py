@@ -1,18 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import random
 from datetime import datetime, timedelta
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from controllers.waste_controller import get_waste_stats, get_ward_cleanliness_scores
+from controllers.metrics_controller import get_city_kpis, get_ward_comparison
+from controllers.impact_controller import get_impact_report, HEALTH_METRICS
+from utils.instrumentation import timed
 
 def render():
+    import plotly.express as px
+    from plotly.subplots import make_subplots
+
     if "user" not in st.session_state:
         st.warning("Please login to view metrics")
         st.session_state["page"] = "login"
@@ -45,40 +46,50 @@ def render():
         "Environmental Impact"
     ])
     
-    with tab1:
+    with tab1, timed("metrics_view.city_overview"):
         st.markdown("### Bengaluru Waste Management Overview")
         
-        # Key city metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                "Daily Waste Generated",
-                "5,800 tonnes",
-                "2.3%",
-                delta_color="inverse"
-            )
+        # Key city metrics, aggregated from the ward rollups (cached per day)
+        city_kpis = get_city_kpis()
         
-        with col2:
-            st.metric(
-                "Segregation Compliance",
-                "83%",
-                "4.5%"
-            )
+        if city_kpis is None:
+            st.warning("City-wide metrics are not available yet.")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
             
-        with col3:
-            st.metric(
-                "Processing Efficiency",
-                "77%",
-                "5.2%"
-            )
+            def format_delta(kpi, unit):
+                return None if kpi['delta'] is None else f"{kpi['delta']:+.1f}{unit}"
             
-        with col4:
-            st.metric(
-                "Landfill Diversion",
-                "65%",
-                "8.7%"
-            )
+            with col1:
+                st.metric(
+                    "Daily Waste Generated",
+                    f"{city_kpis['daily_waste']['value']:,.1f} tonnes",
+                    format_delta(city_kpis['daily_waste'], "%"),
+                    delta_color="inverse"
+                )
+            
+            with col2:
+                st.metric(
+                    "Segregation Compliance",
+                    f"{city_kpis['segregation_rate']['value']:.0f}%",
+                    format_delta(city_kpis['segregation_rate'], " pts")
+                )
+                
+            with col3:
+                st.metric(
+                    "Processing Efficiency",
+                    f"{city_kpis['processing_rate']['value']:.0f}%",
+                    format_delta(city_kpis['processing_rate'], " pts")
+                )
+                
+            with col4:
+                st.metric(
+                    "Landfill Diversion",
+                    f"{city_kpis['landfill_diversion']['value']:.0f}%",
+                    format_delta(city_kpis['landfill_diversion'], " pts")
+                )
+            
+            st.caption("Last 7 days across all wards, compared with the previous 7 days.")
             
         # City map with ward performance
                 
@@ -285,7 +296,7 @@ def render():
             - **Waste-to-Energy Plant**: 300 TPD capacity plant under construction
             """)
     
-    with tab2:
+    with tab2, timed("metrics_view.ward_performance"):
         st.markdown(f"### {user_ward} Ward Performance Analytics")
         
         # Get ward data
@@ -481,33 +492,10 @@ def render():
         # Area comparative analysis
         st.markdown("### Ward Comparative Analysis")
         
-        # Get neighboring wards (just using random selection for demo)
-        all_wards = [w['ward'] for w in get_ward_cleanliness_scores()]
-        neighboring_wards = random.sample([w for w in all_wards if w != user_ward], 3) + [user_ward]
-        
-        # Create comparison metrics
-        comparison_metrics = ['Cleanliness Score', 'Segregation Rate', 'Collection Efficiency', 'Complaint Resolution']
-        ward_comparison_data = []
-        
-        for ward in neighboring_wards:
-            is_user_ward = ward == user_ward
-            for metric in comparison_metrics:
-                # Generate appropriate values based on metric
-                if metric == 'Cleanliness Score':
-                    value = next((w['score'] for w in get_ward_cleanliness_scores() if w['ward'] == ward), 70)
-                elif metric == 'Segregation Rate':
-                    value = random.uniform(70, 95)
-                elif metric == 'Collection Efficiency':
-                    value = random.uniform(85, 98)
-                else:  # Complaint Resolution
-                    value = random.uniform(75, 95)
-                    
-                ward_comparison_data.append({
-                    'ward': ward,
-                    'metric': metric,
-                    'value': value,
-                    'is_user_ward': is_user_ward
-                })
+        # Nearest wards by distance between ward centres
+        neighboring_wards, ward_comparison_data = get_ward_comparison(user_ward)
+        for row in ward_comparison_data:
+            row['is_user_ward'] = row['ward'] == user_ward
                 
         df_comparison = pd.DataFrame(ward_comparison_data)
         
@@ -603,7 +591,7 @@ def render():
                 for i, rec in enumerate(long_term):
                     st.markdown(f"**{i+1}.** {rec}")
     
-    with tab3:
+    with tab3, timed("metrics_view.waste_segregation"):
         st.markdown("### Waste Segregation Analytics")
         
         # Key metrics for segregation
@@ -926,7 +914,7 @@ def render():
             6. **Participate in Drives**: Join local cleanliness drives and awareness campaigns
             """)
             
-    with tab4:
+    with tab4, timed("metrics_view.environmental_impact"):
         st.markdown("### Environmental Impact Analytics")
         
         # Environmental impact overview
@@ -937,189 +925,142 @@ def render():
         </div>
         """, unsafe_allow_html=True)
         
-        # Key environmental metrics
-        col1, col2, col3, col4 = st.columns(4)
+        # Impacts for the year so far, from the emission-factor tables (cached per day)
+        impact = get_impact_report()
         
-        with col1:
-            st.metric(
-                "Carbon Reduction",
-                f"{random.randint(120000, 150000)} tonnes",
-                f"{random.uniform(5, 15):.1f}%"
-            )
-            st.caption("CO₂ equivalent emissions avoided")
-        
-        with col2:
-            st.metric(
-                "Landfill Space Saved",
-                f"{random.randint(15, 25)} acres",
-                f"{random.uniform(10, 20):.1f}%"
-            )
-            st.caption("Land preserved through diversion")
+        if impact is None:
+            st.warning("Environmental impact data is not available yet.")
+        else:
+            monthly = impact['monthly']
             
-        with col3:
-            st.metric(
-                "Groundwater Protected",
-                f"{random.randint(400, 600)} km²",
-                f"{random.uniform(8, 18):.1f}%"
-            )
-            st.caption("Area with reduced leachate risk")
+            def month_delta(values):
+                # Daily rate in the latest (possibly partial) month compared with the month before
+                rates = values / np.maximum(impact['days_per_month'], 1)
+                if len(rates) < 2 or rates[-2] == 0:
+                    return None
+                return f"{(rates[-1] - rates[-2]) / rates[-2] * 100:+.1f}%"
             
-        with col4:
-            st.metric(
-                "Trees Saved",
-                f"{random.randint(80000, 120000)}",
-                f"{random.uniform(12, 22):.1f}%"
-            )
-            st.caption("Through paper recycling")
+            # Key environmental metrics
+            col1, col2, col3, col4 = st.columns(4)
             
-        # Carbon footprint reduction
-        st.markdown("### Carbon Footprint Reduction")
-        
-        # Generate monthly carbon reduction data
-        carbon_data = []
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        current_month = datetime.now().month
-        
-        # Baseline - what would have been without interventions
-        baseline = [random.uniform(12000, 14000) for _ in range(current_month)]
-        
-        # Actual emissions with interventions (lower)
-        actual = [baseline[i] * random.uniform(0.65, 0.85) for i in range(current_month)]
-        
-        for i, month in enumerate(months[:current_month]):
-            carbon_data.append({
-                'month': month,
-                'Baseline Emissions': baseline[i],
-                'Actual Emissions': actual[i],
-                'Reduction': baseline[i] - actual[i]
-            })
+            with col1:
+                st.metric(
+                    "Carbon Reduction",
+                    f"{monthly['avoided_carbon'].sum():,.0f} tonnes",
+                    month_delta(monthly['avoided_carbon'])
+                )
+                st.caption("CO₂ equivalent emissions avoided")
             
-        df_carbon = pd.DataFrame(carbon_data)
-        
-        # Create stacked bar chart
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=df_carbon['month'],
-            y=df_carbon['Actual Emissions'],
-            name='Actual Emissions',
-            marker_color='#e74c3c'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=df_carbon['month'],
-            y=df_carbon['Reduction'],
-            name='Emissions Avoided',
-            marker_color='#2ecc71'
-        ))
-        
-        fig.update_layout(
-            title='Monthly Carbon Footprint Reduction (Tonnes CO₂e)',
-            xaxis_title='Month',
-            yaxis_title='Carbon Emissions (Tonnes CO₂e)',
-            barmode='stack',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Environmental benefits by waste management practice
-        st.markdown("### Environmental Benefits by Waste Management Practice")
-        
-        # Generate data for different practices
-        practices = [
-            'Organic Waste Composting',
-            'Plastic Recycling',
-            'Paper Recycling',
-            'Metal Recycling',
-            'Glass Recycling',
-            'E-waste Processing',
-            'Waste-to-Energy'
-        ]
-        
-        practice_data = []
-        
-        for practice in practices:
-            # Different environmental metrics for different practices
-            if practice == 'Organic Waste Composting':
-                carbon = random.uniform(20, 30)
-                water = random.uniform(15, 25)
-                land = random.uniform(15, 25)
-            elif practice == 'Plastic Recycling':
-                carbon = random.uniform(15, 25)
-                water = random.uniform(10, 20)
-                land = random.uniform(30, 40)
-            elif practice == 'Paper Recycling':
-                carbon = random.uniform(10, 20)
-                water = random.uniform(30, 40)
-                land = random.uniform(20, 30)
-            elif practice == 'Metal Recycling':
-                carbon = random.uniform(30, 40)
-                water = random.uniform(20, 30)
-                land = random.uniform(5, 15)
-            elif practice == 'Glass Recycling':
-                carbon = random.uniform(5, 15)
-                water = random.uniform(5, 15)
-                land = random.uniform(10, 20)
-            elif practice == 'E-waste Processing':
-                carbon = random.uniform(25, 35)
-                water = random.uniform(5, 15)
-                land = random.uniform(35, 45)
-            else:  # Waste-to-Energy
-                carbon = random.uniform(35, 45)
-                water = random.uniform(5, 10)
-                land = random.uniform(25, 35)
+            with col2:
+                st.metric(
+                    "Landfill Space Saved",
+                    f"{monthly['landfill_saved_acres'].sum():,.2f} acres",
+                    month_delta(monthly['landfill_saved_acres'])
+                )
+                st.caption("Land preserved through diversion")
                 
-            practice_data.append({
-                'practice': practice,
-                'Carbon Reduction': carbon,
-                'Water Conservation': water,
-                'Land Preservation': land
-            })
-            
-        df_practices = pd.DataFrame(practice_data)
-        
-        # Create radar chart
-        categories = list(df_practices['practice'])
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatterpolar(
-            r=df_practices['Carbon Reduction'],
-            theta=categories,
-            fill='toself',
-            name='Carbon Reduction',
-            line=dict(color='#3498db')
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=df_practices['Water Conservation'],
-            theta=categories,
-            fill='toself',
-            name='Water Conservation',
-            line=dict(color='#2ecc71')
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=df_practices['Land Preservation'],
-            theta=categories,
-            fill='toself',
-            name='Land Preservation',
-            line=dict(color='#e67e22')
-        ))
-        
-        fig.update_layout(
-            title="Environmental Benefits Comparison (% Improvement)",
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 50]
+            with col3:
+                st.metric(
+                    "Water Saved",
+                    f"{monthly['water_saved_kl'].sum():,.0f} kL",
+                    month_delta(monthly['water_saved_kl'])
                 )
-            ),
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+                st.caption("Through recycling and composting")
+                
+            with col4:
+                st.metric(
+                    "Trees Saved",
+                    f"{monthly['trees_saved'].sum():,.0f}",
+                    month_delta(monthly['trees_saved'])
+                )
+                st.caption("Through paper recycling")
+                
+            # Carbon footprint reduction
+            st.markdown("### Carbon Footprint Reduction")
+            
+            month_labels = [datetime.strptime(m, "%Y-%m").strftime("%b") for m in impact['months']]
+            
+            # Create stacked bar chart
+            fig = go.Figure()
+            
+            fig.add_trace(go.Bar(
+                x=month_labels,
+                y=monthly['actual_carbon'],
+                name='Actual Emissions',
+                marker_color='#e74c3c'
+            ))
+            
+            fig.add_trace(go.Bar(
+                x=month_labels,
+                y=monthly['avoided_carbon'],
+                name='Emissions Avoided',
+                marker_color='#2ecc71'
+            ))
+            
+            fig.update_layout(
+                title='Monthly Carbon Footprint Reduction (Tonnes CO₂e)',
+                xaxis_title='Month',
+                yaxis_title='Carbon Emissions (Tonnes CO₂e)',
+                barmode='stack',
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Environmental benefits by waste management practice
+            st.markdown("### Environmental Benefits by Waste Management Practice")
+            
+            df_practices = pd.DataFrame([
+                {
+                    'practice': practice,
+                    'Carbon Reduction': share['carbon'],
+                    'Water Conservation': share['water'],
+                    'Land Preservation': share['land']
+                }
+                for practice, share in impact['practice_share'].items()
+            ])
+            
+            # Create radar chart
+            categories = list(df_practices['practice'])
+            
+            fig = go.Figure()
+            
+            fig.add_trace(go.Scatterpolar(
+                r=df_practices['Carbon Reduction'],
+                theta=categories,
+                fill='toself',
+                name='Carbon Reduction',
+                line=dict(color='#3498db')
+            ))
+            
+            fig.add_trace(go.Scatterpolar(
+                r=df_practices['Water Conservation'],
+                theta=categories,
+                fill='toself',
+                name='Water Conservation',
+                line=dict(color='#2ecc71')
+            ))
+            
+            fig.add_trace(go.Scatterpolar(
+                r=df_practices['Land Preservation'],
+                theta=categories,
+                fill='toself',
+                name='Land Preservation',
+                line=dict(color='#e67e22')
+            ))
+            
+            fig.update_layout(
+                title="Share of Environmental Benefit by Practice (%)",
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, max(10, df_practices[['Carbon Reduction', 'Water Conservation', 'Land Preservation']].values.max() * 1.1)]
+                    )
+                ),
+                showlegend=True
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
         
         # SDG alignment
         st.markdown("### Alignment with Sustainable Development Goals (SDGs)")
@@ -1184,14 +1125,8 @@ def render():
         # Community health impacts
         st.markdown("### Community Health Benefits")
         
-        # Generate health impact data
-        health_metrics = {
-            'Respiratory Conditions': random.uniform(15, 25),
-            'Vector-borne Diseases': random.uniform(20, 35),
-            'Water-borne Diseases': random.uniform(10, 30),
-            'Allergic Reactions': random.uniform(5, 15),
-            'Quality of Life Index': random.uniform(25, 40)
-        }
+        # Health improvements estimated from the share of achievable benefit realised
+        health_metrics = impact['health'] if impact else {metric: 0.0 for metric in HEALTH_METRICS}
         
         # Convert to DataFrame
         df_health = pd.DataFrame([
@@ -1217,7 +1152,7 @@ def render():
         )
         
         fig.update_layout(
-            xaxis_range=[0, max(health_metrics.values()) * 1.2]
+            xaxis_range=[0, max(1, max(health_metrics.values())) * 1.2]
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -1,14 +1,9 @@
 import streamlit as st
-import sys
-import os
 import random
 import pandas as pd
-import plotly.express as px
 from datetime import datetime, timedelta
 import numpy as np
 
-# Use direct relative import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from components.calendar_widget import render_calendar_widget
 
 def generate_reward_data(user_id):
@@ -60,6 +55,8 @@ def generate_reward_data(user_id):
     }
 
 def render():
+    import plotly.express as px
+
     if "user" not in st.session_state:
         st.warning("Please login to view your rewards")
         st.session_state["page"] = "login"